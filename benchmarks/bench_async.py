@@ -0,0 +1,68 @@
+"""
+Event loop responsiveness while parsing lockfiles: from_file in a coroutine versus afrom_file.
+
+A ticker task measures how late the event loop wakes it up while several lockfiles are
+parsed concurrently.
+
+Run from the repository root, with pyarn installed (see `make devel`):
+
+    python benchmarks/bench_async.py [PACKAGES] [FILES]
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+from synthetic import lockfile
+
+from pyarn.lockfile import Lockfile
+
+
+async def ticker(stop, interval=0.001):
+    """Return the longest delay between two ticks of the event loop."""
+    worst = 0.0
+    while not stop.is_set():
+        before = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - before - interval)
+    return worst
+
+
+async def blocking(path):
+    return Lockfile.from_file(path, backend="direct")
+
+
+async def measure(load, paths):
+    stop = asyncio.Event()
+    tick = asyncio.ensure_future(ticker(stop))
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    locks = await asyncio.gather(*(load(path) for path in paths))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    return locks, elapsed, await tick
+
+
+def main():
+    packages = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    files = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = []
+        for i in range(files):
+            paths.append(os.path.join(directory, f"{i}.lock"))
+            with open(paths[-1], "w") as f:
+                f.write(lockfile(packages))
+
+        expected = None
+        for label, load in (("from_file", blocking), ("afrom_file", Lockfile.afrom_file)):
+            locks, elapsed, worst = asyncio.run(measure(load, paths))
+            if expected is None:
+                expected = locks[0].data
+            assert all(lock.data == expected for lock in locks)
+            print(f"{label:<12} {elapsed:7.3f} s, longest event loop stall {worst * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Parsing throughput (MB/s) of the PLY and direct backends on small to very large lockfiles.
+
+Run from the repository root, with pyarn installed (see `make devel`):
+
+    python benchmarks/bench_backends.py [PACKAGES_IN_LARGE_LOCKFILE]
+"""
+import sys
+import time
+from pathlib import Path
+
+from synthetic import lockfile
+
+from pyarn.lockfile import Lockfile
+
+DATA_DIR = Path(__file__).parent.parent / "tests" / "data"
+
+BACKENDS = [
+    ("ply", {"backend": "ply"}),
+    ("ply + scanner", {"backend": "ply", "tokenizer": "scanner"}),
+    ("direct", {"backend": "direct"}),
+]
+
+
+def throughput(content, repeat, **kwargs):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        Lockfile.from_str(content, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return len(content.encode()) / 1e6 / best
+
+
+def main():
+    large = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    inputs = [
+        ("small", (DATA_DIR / "sample.lock").read_text(), 50),
+        ("medium", (DATA_DIR / "full.lock").read_text(), 5),
+        ("large", lockfile(large), 1),
+    ]
+    # Build the shared engine outside of the measurements
+    Lockfile.parser()
+
+    print(f"{'':<8}" + "".join(f"{name:>16}" for name, _ in BACKENDS))
+    for label, content, repeat in inputs:
+        results = [throughput(content, repeat, **kwargs) for _, kwargs in BACKENDS]
+        print(f"{label:<8}" + "".join(f"{mbps:>11.2f} MB/s" for mbps in results))
+
+
+if __name__ == "__main__":
+    main()
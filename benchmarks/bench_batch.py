@@ -0,0 +1,45 @@
+"""
+Parsing many lockfiles serially versus with pyarn.batch.parse_many.
+
+Run from the repository root, with pyarn installed (see `make devel`):
+
+    python benchmarks/bench_batch.py [FILES] [PACKAGES]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from synthetic import lockfile
+
+from pyarn.batch import parse_many
+from pyarn.lockfile import Lockfile
+
+
+def timed(label, func):
+    start = time.perf_counter()
+    func()
+    print(f"{label:<32} {time.perf_counter() - start:8.3f} s")
+
+
+def main():
+    files = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    packages = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        paths = [os.path.join(tmp_dir, f"{i}.lock") for i in range(files)]
+        content = lockfile(packages)
+        for path in paths:
+            with open(path, "w") as f:
+                f.write(content)
+
+        for backend in ("ply", "direct"):
+            timed(
+                f"serial, {backend}",
+                lambda: [Lockfile.from_file(path, backend=backend) for path in paths],
+            )
+            timed(f"parse_many, {backend}", lambda: list(parse_many(paths, backend=backend)))
+    print(f"{files} files of {packages} packages, {os.cpu_count()} CPUs")
+
+
+if __name__ == "__main__":
+    main()
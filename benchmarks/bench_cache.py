@@ -0,0 +1,42 @@
+"""
+Lockfile.from_file with and without a ParseCache, on a large lockfile.
+
+Run from the repository root, with pyarn installed (see `make devel`):
+
+    python benchmarks/bench_cache.py [PACKAGES]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from synthetic import lockfile
+
+from pyarn.cache import ParseCache
+from pyarn.lockfile import Lockfile
+
+
+def timed(label, func):
+    start = time.perf_counter()
+    func()
+    print(f"{label:<32} {time.perf_counter() - start:8.3f} s")
+
+
+def main():
+    packages = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "yarn.lock")
+        with open(path, "w") as f:
+            f.write(lockfile(packages))
+        cache = ParseCache(os.path.join(tmp_dir, "cache"))
+
+        for backend in ("ply", "direct"):
+            timed(f"no cache, {backend}", lambda: Lockfile.from_file(path, backend=backend))
+        timed("cache miss", lambda: Lockfile.from_file(path, cache=cache))
+        timed("cache hit", lambda: Lockfile.from_file(path, cache=cache))
+        os.utime(path)
+        timed("cache hit, touched file", lambda: Lockfile.from_file(path, cache=cache))
+
+
+if __name__ == "__main__":
+    main()
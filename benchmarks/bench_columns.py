@@ -0,0 +1,97 @@
+"""
+Analytics over the packages of a lockfile: Package objects versus Lockfile.to_columns().
+
+Both representations are built once, then queried: count packages by registry host, find
+all the versions of a package and count the dependencies.
+
+Run from the repository root, with pyarn installed (see `make devel`):
+
+    python benchmarks/bench_columns.py [PACKAGES]
+"""
+import sys
+import timeit
+from collections import Counter
+from urllib.parse import urlsplit
+
+from synthetic import lockfile
+
+from pyarn.lockfile import Lockfile
+
+NAME = "pkg-1"
+
+
+def objects_queries(packages):
+    return {
+        "count by host": lambda: Counter(urlsplit(p.url).hostname for p in packages),
+        "versions of a package": lambda: sorted({p.version for p in packages if p.name == NAME}),
+        "count dependencies": lambda: sum(len(p.dependencies) for p in packages),
+    }
+
+
+def columns_queries(columns):
+    def hosts():
+        # Parse every distinct URL once, then count by code
+        counts = Counter()
+        for code, count in Counter(columns.url.codes).items():
+            counts[urlsplit(columns.url.values[code]).hostname] += count
+        return counts
+
+    def versions():
+        name = columns.name.code(NAME)
+        codes = {v for n, v in zip(columns.name.codes, columns.version.codes) if n == name}
+        return sorted(columns.version.values[code] for code in codes)
+
+    return {
+        "count by host": hosts,
+        "versions of a package": versions,
+        "count dependencies": lambda: columns.dependency_offsets[-1],
+    }
+
+
+def numpy_queries(columns):
+    import numpy as np
+
+    def hosts():
+        codes, counts = np.unique(columns.url.codes, return_counts=True)
+        result = Counter()
+        for url, count in zip(columns.url.values[codes], counts.tolist()):
+            result[urlsplit(url).hostname] += count
+        return result
+
+    def versions():
+        selected = columns.version.codes[columns.name.codes == columns.name.code(NAME)]
+        return sorted(columns.version.values[np.unique(selected)])
+
+    return {
+        "count by host": hosts,
+        "versions of a package": versions,
+        "count dependencies": lambda: int(columns.dependency_offsets[-1]),
+    }
+
+
+def main():
+    packages = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    lock = Lockfile.from_str(lockfile(packages), backend="direct")
+
+    runs = [
+        ("Package objects", lock.packages, objects_queries),
+        ("to_columns()", lock.to_columns, columns_queries),
+    ]
+    try:
+        import numpy  # noqa: F401
+
+        runs.append(("to_columns(numpy=True)", lambda: lock.to_columns(numpy=True), numpy_queries))
+    except ImportError:
+        pass
+
+    expected = {label: query() for label, query in objects_queries(lock.packages()).items()}
+    for label, build, queries in runs:
+        print(f"{label}: build {min(timeit.repeat(build, number=1, repeat=3)):.3f} s")
+        for query_label, query in queries(build()).items():
+            assert query() == expected[query_label]
+            best = min(timeit.repeat(query, number=1, repeat=3))
+            print(f"    {query_label:<24} {best * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Comparing two large lockfiles: summaries of all their packages versus pyarn.diff.
+
+Run from the repository root, with pyarn installed (see `make devel`):
+
+    python benchmarks/bench_diff.py [PACKAGES]
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from synthetic import lockfile
+
+from pyarn.diff import diff, diff_files
+from pyarn.lockfile import Lockfile
+
+
+def naive_diff(old, new):
+    def summaries(lock):
+        return {(p.name, p.version, p.url, p.checksum) for p in lock.packages()}
+
+    old_summaries = summaries(old)
+    new_summaries = summaries(new)
+    return old_summaries - new_summaries, new_summaries - old_summaries
+
+
+def timed(label, func):
+    start = time.perf_counter()
+    result = func()
+    print(f"{label:<32} {time.perf_counter() - start:8.3f} s")
+    return result
+
+
+def peak_memory(label, func):
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<32} {peak / 2**20:8.1f} MB peak")
+
+
+def compare_parsed(old_path, new_path):
+    old = Lockfile.from_file(old_path, backend="direct")
+    new = Lockfile.from_file(new_path, backend="direct")
+    removed, added = timed("summaries of all packages", lambda: naive_diff(old, new))
+    result = timed("diff()", lambda: diff(old, new))
+    assert len(result.changed) == len(removed) == len(added)
+
+
+def main():
+    packages = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    old_content = lockfile(packages)
+    # Bump the patch version of about 1% of the packages
+    new_content = old_content.replace('version "1.1.3"', 'version "1.1.4"')
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        old_path = os.path.join(tmp_dir, "old.lock")
+        new_path = os.path.join(tmp_dir, "new.lock")
+        for path, content in ((old_path, old_content), (new_path, new_content)):
+            with open(path, "w") as f:
+                f.write(content)
+
+        compare_parsed(old_path, new_path)
+        result = timed("diff_files()", lambda: diff_files(old_path, new_path))
+        print(f"{len(result.changed)} changed packages out of {packages}")
+
+        peak_memory(
+            "parse both files",
+            lambda: [Lockfile.from_file(p, backend="direct") for p in (old_path, new_path)],
+        )
+        peak_memory("diff_files()", lambda: diff_files(old_path, new_path))
+
+
+if __name__ == "__main__":
+    main()
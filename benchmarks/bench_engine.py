@@ -0,0 +1,52 @@
+"""
+Per-call overhead of Lockfile.from_str with and without a reused parser engine.
+
+Run from the repository root, with pyarn installed (see `make devel`):
+
+    python benchmarks/bench_engine.py
+"""
+import timeit
+from pathlib import Path
+
+from ply import lex, yacc
+
+from pyarn import lexer, parser
+from pyarn.lexer_wrapper import Wrapper
+from pyarn.lockfile import Lockfile
+
+DATA_DIR = Path(__file__).parent.parent / "tests" / "data"
+
+
+def parse_rebuilding(lockfile_str):
+    # What Lockfile.from_str used to do on every call, where parsetab.py cannot be written
+    # (e.g. a read-only site-packages): the tables are generated again every time. No tables
+    # are read (the module does not exist) nor written, a pyarn/parsetab.py left in the
+    # source tree would be loaded by the default engine without checking it against the
+    # grammar.
+    pyarn_lexer = Wrapper(lex.lex(module=lexer))
+    lockfile_parser = yacc.yacc(
+        module=parser,
+        tabmodule="bench_no_parsetab",
+        write_tables=False,
+        optimize=False,
+        debug=False,
+    )
+    return lockfile_parser.parse(lockfile_str, lexer=pyarn_lexer)
+
+
+def parse_with_engine(lockfile_str):
+    return Lockfile.parser().parse(lockfile_str)
+
+
+def main():
+    for name in ("single.lock", "sample.lock"):
+        content = (DATA_DIR / name).read_text()
+        assert parse_rebuilding(content) == parse_with_engine(content)
+        for func in (parse_rebuilding, parse_with_engine):
+            number = 200
+            best = min(timeit.repeat(lambda: func(content), number=number, repeat=5))
+            print(f"{name:<12} {func.__name__:<18} {best / number * 1e6:10.1f} us/call")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Dependency graph queries on a large lockfile, versus resolving every edge on each hop.
+
+Run from the repository root, with pyarn installed (see `make devel`):
+
+    python benchmarks/bench_graph.py [PACKAGES]
+"""
+import sys
+import time
+
+from synthetic import lockfile
+
+from pyarn.lockfile import Lockfile
+
+
+def closure_by_resolving(lock, key):
+    """Transitive dependencies of an entry, resolving dependency ranges on each hop."""
+    seen = {key}
+    stack = [key]
+    while stack:
+        entry = lock.data[stack.pop()]
+        for name, version_range in entry.get("dependencies", {}).items():
+            dependency = lock.key_for(name, version_range)
+            if dependency is not None and dependency not in seen:
+                seen.add(dependency)
+                stack.append(dependency)
+    return len(seen) - 1
+
+
+def timed(label, func):
+    start = time.perf_counter()
+    result = func()
+    print(f"{label:<32} {time.perf_counter() - start:8.3f} s")
+    return result
+
+
+def main():
+    packages = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    lock = Lockfile.from_str(lockfile(packages, acyclic=True), backend="direct")
+    roots = list(lock.data)[-100:]
+    lock.key_for("", "")  # build the specifier index outside of the measurements
+
+    graph = timed("graph()", lock.graph)
+    print(f"{len(graph)} nodes, {len(graph.targets)} edges")
+    expected = timed(
+        "closure x100, resolving", lambda: [closure_by_resolving(lock, key) for key in roots]
+    )
+    result = timed(
+        "closure x100, graph",
+        lambda: [len(graph.transitive_dependencies(graph.node(key))) for key in roots],
+    )
+    assert result == expected
+    timed("dependents of every node", lambda: [graph.dependents(n) for n in range(len(graph))])
+    timed("topological_order()", graph.topological_order)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+Saving a large lockfile after changing one entry: to_file versus save_incremental.
+
+Run from the repository root, with pyarn installed (see `make devel`):
+
+    python benchmarks/bench_incremental.py [PACKAGES]
+"""
+import os
+import sys
+import tempfile
+import timeit
+
+from synthetic import lockfile
+
+from pyarn.lockfile import Lockfile
+
+
+def main():
+    packages = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "yarn.lock")
+        with open(path, "w") as f:
+            f.write(lockfile(packages))
+        with open(path) as f:
+            lines = sum(1 for _ in f)
+
+        lock = Lockfile.from_file(path, keep_source=True)
+        key = next(reversed(lock.data))
+
+        def bump():
+            lock.data[key]["version"] += ".1"
+
+        for label, save in (("to_file", lock.to_file), ("save_incremental", lock.save_incremental)):
+            best = min(timeit.repeat(lambda: (bump(), save(path)), number=1, repeat=5))
+            print(f"{label:<20} {best * 1000:8.1f} ms")
+        print(f"{packages} packages, {lines} lines")
+
+
+if __name__ == "__main__":
+    main()
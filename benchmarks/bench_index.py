@@ -0,0 +1,44 @@
+"""
+Loading a single entry of a large lockfile: full parse versus a saved LockfileIndex.
+
+Run from the repository root, with pyarn installed (see `make devel`):
+
+    python benchmarks/bench_index.py [PACKAGES]
+"""
+import os
+import sys
+import tempfile
+import timeit
+
+from synthetic import lockfile
+
+from pyarn.index import LockfileIndex
+from pyarn.lockfile import Lockfile
+
+
+def main():
+    packages = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    i = packages // 2 | 1
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "yarn.lock")
+        with open(path, "w") as f:
+            f.write(lockfile(packages))
+        key = LockfileIndex.build(path).key_for(f"pkg-{i}", f"^{i % 9}.0.0")
+
+        def full():
+            return Lockfile.from_file(path, backend="direct").data[key]
+
+        def indexed():
+            return LockfileIndex.open(path).get(key)
+
+        build = min(timeit.repeat(lambda: LockfileIndex.build(path), number=1, repeat=3))
+        print(f"{'build index':<20} {build:7.3f} s")
+        assert full() == indexed()
+        for label, func in (("full parse, direct", full), ("saved index", indexed)):
+            best = min(timeit.repeat(func, number=1, repeat=3))
+            print(f"{label:<20} {best:7.3f} s")
+
+
+if __name__ == "__main__":
+    main()
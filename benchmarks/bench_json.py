@@ -0,0 +1,44 @@
+"""
+Writing a large lockfile as JSON: to_json() versus to_json_file(), peak memory and speed.
+
+Throughput is given relative to the size of the to_json() document.
+
+Run from the repository root, with pyarn installed (see `make devel`):
+
+    python benchmarks/bench_json.py [PACKAGES]
+"""
+import os
+import sys
+import timeit
+import tracemalloc
+
+from synthetic import lockfile
+
+from pyarn.lockfile import Lockfile
+
+
+def main():
+    packages = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    lock = Lockfile.from_str(lockfile(packages), backend="direct")
+    size = len(lock.to_json()) / 1024 / 1024
+
+    with open(os.devnull, "w") as devnull:
+        runs = (
+            ("to_json()", lambda: devnull.write(lock.to_json())),
+            ("to_json_file()", lambda: lock.to_json_file(devnull)),
+            ("to_json_file(compact)", lambda: lock.to_json_file(devnull, compact=True)),
+        )
+        for label, func in runs:
+            tracemalloc.start()
+            func()
+            peak = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+            tracemalloc.stop()
+            best = min(timeit.repeat(func, number=1, repeat=3))
+            print(
+                f"{label:<22} {best:7.3f} s ({size / best:6.1f} MiB/s), "
+                f"peak memory {peak:7.1f} MiB"
+            )
+
+
+if __name__ == "__main__":
+    main()
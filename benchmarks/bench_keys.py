@@ -0,0 +1,30 @@
+"""
+Cost of Package.from_dict for each shape of lockfile key.
+
+Run from the repository root, with pyarn installed (see `make devel`):
+
+    python benchmarks/bench_keys.py
+"""
+import timeit
+
+from pyarn.lockfile import Package
+
+KEYS = {
+    "plain": "lodash@^4.17.21",
+    "scoped": "@babel/core@^7.12.3",
+    "multiple": "lodash@^4.17.15, lodash@^4.17.20, lodash@^4.17.21",
+    "npm alias": "lodash@npm:@elastic/lodash@3.10.1-kibana1",
+    "path": "breakfast@file:some/relative/path",
+}
+ENTRY = {"version": "1.0.0", "resolved": "https://example.org/foo.tgz", "integrity": "sha1-x"}
+
+
+def main():
+    for shape, key in KEYS.items():
+        number = 100_000
+        best = min(timeit.repeat(lambda: Package.from_dict(key, ENTRY), number=number, repeat=5))
+        print(f"{shape:<10} {best / number * 1e9:8.0f} ns/key")
+
+
+if __name__ == "__main__":
+    main()
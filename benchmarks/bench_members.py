@@ -0,0 +1,27 @@
+"""
+Parse time of blocks with many members, which should scale linearly with the block size.
+
+Run from the repository root, with pyarn installed (see `make devel`):
+
+    python benchmarks/bench_members.py
+"""
+import time
+
+from synthetic import wide_block
+
+from pyarn.lockfile import Lockfile
+
+
+def main():
+    engine = Lockfile.parser()
+    for dependencies in (1_000, 5_000, 10_000, 20_000, 50_000):
+        content = wide_block(dependencies)
+        start = time.perf_counter()
+        engine.parse(content)
+        elapsed = time.perf_counter() - start
+        per_entry = elapsed / dependencies * 1e6
+        print(f"{dependencies:>6} dependencies: {elapsed:8.3f} s ({per_entry:.2f} us/entry)")
+
+
+if __name__ == "__main__":
+    main()
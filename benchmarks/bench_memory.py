@@ -0,0 +1,41 @@
+"""
+Memory used by the parsed data and the Package objects of a large lockfile (tracemalloc).
+
+Run from the repository root, with pyarn installed (see `make devel`):
+
+    python benchmarks/bench_memory.py [PACKAGES]
+"""
+import sys
+import tracemalloc
+
+from synthetic import lockfile
+
+from pyarn.lockfile import Lockfile
+
+
+def allocated(func):
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    result = func()
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, after - before
+
+
+def main():
+    packages = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    content = lockfile(packages, dependencies=8)
+
+    for backend in ("ply", "direct"):
+        lock, data_bytes = allocated(lambda: Lockfile.from_str(content, backend=backend))
+        pkgs, pkg_bytes = allocated(lock.packages)
+        print(
+            f"{backend:<8} data {data_bytes / len(pkgs):8.0f} bytes/entry, "
+            f"packages {pkg_bytes / len(pkgs):8.0f} bytes/package"
+        )
+        # Do not share (interned) strings with the next measurement
+        del lock, pkgs
+
+
+if __name__ == "__main__":
+    main()
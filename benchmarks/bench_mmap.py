@@ -0,0 +1,54 @@
+"""
+Peak memory of Lockfile.from_file with and without mmap, on a large lockfile.
+
+Every mode runs in a fresh process, to measure its peak RSS. Run from the repository root,
+with pyarn installed (see `make devel`):
+
+    python benchmarks/bench_mmap.py [PACKAGES]
+"""
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+
+from synthetic import lockfile
+
+MODES = {
+    "read, ply": dict(backend="ply", tokenizer="scanner"),
+    "mmap, ply": dict(backend="ply", mmap=True),
+    "read, direct": dict(backend="direct"),
+    "mmap, direct": dict(backend="direct", mmap=True),
+}
+
+
+def run(path, mode):
+    import tracemalloc
+
+    from pyarn.lockfile import Lockfile
+
+    tracemalloc.start()
+    lock = Lockfile.from_file(path, **MODES[mode])
+    _, peak = tracemalloc.get_traced_memory()
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"{mode:<16} peak traced {peak / 2**20:7.1f} MB  max RSS {rss:7.1f} MB")
+    return lock
+
+
+def main():
+    if sys.argv[1:2] == ["--run"]:
+        run(sys.argv[2], sys.argv[3])
+        return
+
+    packages = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "yarn.lock")
+        with open(path, "w") as f:
+            f.write(lockfile(packages))
+        print(f"{packages} packages, {os.path.getsize(path) / 2**20:.1f} MB")
+        for mode in MODES:
+            subprocess.run([sys.executable, __file__, "--run", path, mode], check=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""
+Looking up a few packages in a large lockfile: full parse versus from_str(only=...).
+
+Run from the repository root, with pyarn installed (see `make devel`):
+
+    python benchmarks/bench_only.py [PACKAGES]
+"""
+import sys
+import timeit
+
+from synthetic import lockfile
+
+from pyarn.lockfile import Lockfile
+
+
+def main():
+    packages = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    content = lockfile(packages)
+    only = {"pkg-1", "@scope-0/pkg-35", f"pkg-{packages - 1}"}
+
+    def full():
+        lock = Lockfile.from_str(content, backend="direct")
+        return {key: value for key, value in lock.data.items() if key.split("@^")[0] in only}
+
+    def partial():
+        return Lockfile.from_str(content, only=only).data
+
+    assert full() == partial()
+    for label, func in (("full parse, direct", full), ("only", partial)):
+        best = min(timeit.repeat(func, number=1, repeat=3))
+        print(f"{label:<20} {best:7.3f} s")
+
+
+if __name__ == "__main__":
+    main()
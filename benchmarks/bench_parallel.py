@@ -0,0 +1,41 @@
+"""
+Parsing one huge lockfile: serial direct backend versus from_file(jobs=N).
+
+Run from the repository root, with pyarn installed (see `make devel`):
+
+    python benchmarks/bench_parallel.py [PACKAGES] [JOBS]
+"""
+import os
+import sys
+import tempfile
+import timeit
+
+from synthetic import lockfile
+
+from pyarn.lockfile import Lockfile
+
+
+def main():
+    packages = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    jobs = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "yarn.lock")
+        with open(path, "w") as f:
+            f.write(lockfile(packages))
+        print(f"{os.path.getsize(path) / 1024 / 1024:.1f} MiB, {jobs} jobs")
+
+        def serial():
+            return Lockfile.from_file(path, backend="direct").data
+
+        def parallel():
+            return Lockfile.from_file(path, jobs=jobs).data
+
+        assert serial() == parallel()
+        for label, func in (("serial, direct", serial), (f"jobs={jobs}", parallel)):
+            best = min(timeit.repeat(func, number=1, repeat=3))
+            print(f"{label:<20} {best:7.3f} s")
+
+
+if __name__ == "__main__":
+    main()
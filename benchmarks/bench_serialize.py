@@ -0,0 +1,69 @@
+"""
+Throughput of Lockfile.to_str versus the previous write-per-token serializer.
+
+Run from the repository root, with pyarn installed (see `make devel`):
+
+    python benchmarks/bench_serialize.py [PACKAGES]
+"""
+import io
+import json
+import sys
+import timeit
+from pathlib import Path
+
+from synthetic import lockfile
+
+from pyarn.lockfile import V1_VERSION_COMMENT, Lockfile, _quote_key_if_needed
+
+
+def legacy_dump(lock, outfile):
+    """The serializer of pyarn 0.3.0, which wrote every token separately."""
+    outfile.write(V1_VERSION_COMMENT)
+    outfile.write("\n")
+    for key, val in lock.data.items():
+        outfile.write("\n")
+        legacy_dump_keyval(key, val, outfile, 0)
+
+
+def legacy_dump_keyval(key, value, outfile, indent_level):
+    outfile.write(" " * indent_level * 2)
+    outfile.write(_quote_key_if_needed(key))
+    if isinstance(value, dict):
+        outfile.write(":\n")
+        for k, v in value.items():
+            legacy_dump_keyval(k, v, outfile, indent_level + 1)
+    else:
+        outfile.write(" ")
+        if isinstance(value, str):
+            outfile.write(f'"{value}"')
+        else:
+            json.dump(value, outfile)
+        outfile.write("\n")
+
+
+def legacy_to_str(lock):
+    buffer = io.StringIO()
+    legacy_dump(lock, buffer)
+    return buffer.getvalue()
+
+
+def main():
+    packages = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+
+    test_data = Path(__file__).parent.parent / "tests" / "data"
+    for test_file in test_data.iterdir():
+        lock = Lockfile.from_file(test_file)
+        assert lock.to_str() == legacy_to_str(lock), test_file
+
+    lock = Lockfile.from_str(lockfile(packages), backend="direct")
+    content = lock.to_str()
+    assert content == legacy_to_str(lock)
+    size = len(content.encode()) / 2**20
+
+    for label, to_str in (("legacy _dump", legacy_to_str), ("to_str", Lockfile.to_str)):
+        best = min(timeit.repeat(lambda: to_str(lock), number=1, repeat=5))
+        print(f"{label:<16} {best:7.3f} s  {size / best:7.1f} MB/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Loading a large lockfile: parsing the text versus marshal versus a binary snapshot.
+
+Run from the repository root, with pyarn installed (see `make devel`):
+
+    python benchmarks/bench_snapshot.py [PACKAGES]
+"""
+import marshal
+import os
+import sys
+import tempfile
+import timeit
+
+from synthetic import lockfile
+
+from pyarn.lockfile import Lockfile
+from pyarn.snapshot import Snapshot
+
+
+def main():
+    packages = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+
+    with tempfile.TemporaryDirectory() as directory:
+        text_path = os.path.join(directory, "yarn.lock")
+        marshal_path = os.path.join(directory, "yarn.lock.marshal")
+        snapshot_path = os.path.join(directory, "yarn.lock.snapshot")
+        with open(text_path, "w") as f:
+            f.write(lockfile(packages))
+        lock = Lockfile.from_file(text_path, backend="direct")
+        with open(marshal_path, "wb") as f:
+            marshal.dump(dict(lock.data), f)
+        lock.dump_snapshot(snapshot_path)
+        key = list(lock.data)[packages // 2]
+
+        def parse():
+            return Lockfile.from_file(text_path, backend="direct").data
+
+        def load_marshal():
+            with open(marshal_path, "rb") as f:
+                return marshal.load(f)
+
+        def load_snapshot():
+            return Lockfile.load_snapshot(snapshot_path).data
+
+        def one_entry():
+            with Snapshot(snapshot_path) as snapshot:
+                return snapshot[key]
+
+        assert parse() == load_marshal() == load_snapshot()
+        assert one_entry() == lock.data[key]
+        for label, func, path in (
+            ("parse, direct", parse, text_path),
+            ("marshal", load_marshal, marshal_path),
+            ("load_snapshot", load_snapshot, snapshot_path),
+            ("Snapshot, one entry", one_entry, snapshot_path),
+        ):
+            best = min(timeit.repeat(func, number=1, repeat=3))
+            size = os.path.getsize(path) / 1024 / 1024
+            print(f"{label:<20} {best:7.3f} s, file {size:6.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
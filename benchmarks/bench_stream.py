@@ -0,0 +1,47 @@
+"""
+Peak memory of iter_entries versus Lockfile.from_file on a large lockfile.
+
+Run from the repository root, with pyarn installed (see `make devel`):
+
+    python benchmarks/bench_stream.py [PACKAGES]
+"""
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from synthetic import lockfile
+
+from pyarn.lockfile import Lockfile
+from pyarn.stream import Entry, iter_entries
+
+
+def count_from_file(path):
+    return len(Lockfile.from_file(path, backend="direct").data)
+
+
+def count_streamed(path):
+    return sum(1 for event in iter_entries(path) if isinstance(event, Entry))
+
+
+def main():
+    packages = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir, "yarn.lock")
+        path.write_text(lockfile(packages))
+        size_mb = path.stat().st_size / 1e6
+        print(f"{packages} packages, {size_mb:.1f} MB")
+
+        for func in (count_from_file, count_streamed):
+            tracemalloc.start()
+            start = time.perf_counter()
+            count = func(path)
+            elapsed = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f"{func.__name__:<16} {count} entries {elapsed:6.2f} s peak {peak / 1e6:8.2f} MB")
+
+
+if __name__ == "__main__":
+    main()
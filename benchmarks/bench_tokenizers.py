@@ -0,0 +1,54 @@
+"""
+Tokenizing and parsing throughput of the PLY lexer versus pyarn.scanner.
+
+Run from the repository root, with pyarn installed (see `make devel`):
+
+    python benchmarks/bench_tokenizers.py
+"""
+import time
+
+from ply import lex
+from synthetic import lockfile
+
+from pyarn import lexer
+from pyarn.lexer_wrapper import Wrapper
+from pyarn.lockfile import Lockfile
+from pyarn.scanner import Scanner
+
+
+def tokenize_ply(content):
+    ply_lexer = Wrapper(lex.lex(module=lexer))
+    ply_lexer.input(content)
+    return sum(1 for _ in ply_lexer)
+
+
+def tokenize_scanner(content):
+    scanner = Scanner()
+    scanner.input(content)
+    return sum(1 for _ in scanner)
+
+
+def measure(func, *args, **kwargs):
+    start = time.perf_counter()
+    func(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+def main():
+    content = lockfile(10_000)
+    size_mb = len(content.encode()) / 1e6
+    print(f"{len(content.splitlines())} lines, {size_mb:.1f} MB")
+
+    for func in (tokenize_ply, tokenize_scanner):
+        elapsed = measure(func, content)
+        print(f"{func.__name__:<24} {elapsed:6.3f} s {size_mb / elapsed:6.2f} MB/s")
+
+    engine = Lockfile.parser()
+    for tokenizer in ("ply", "scanner"):
+        elapsed = measure(engine.parse, content, tokenizer=tokenizer)
+        name = f"parse ({tokenizer})"
+        print(f"{name:<24} {elapsed:6.3f} s {size_mb / elapsed:6.2f} MB/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Verifying a mirror of package tarballs: serial hashlib loop versus pyarn.verify.verify_mirror.
+
+Run from the repository root, with pyarn installed (see `make devel`):
+
+    python benchmarks/bench_verify.py [FILES] [KIB_PER_FILE]
+"""
+import base64
+import hashlib
+import os
+import sys
+import tempfile
+import time
+
+from pyarn.lockfile import Package
+from pyarn.verify import mirror_filename, verify_mirror
+
+
+def serial(packages, directory):
+    """The straightforward loop: read every tarball at once and compare its sha512."""
+    failures = 0
+    for package in packages:
+        with open(os.path.join(directory, mirror_filename(package)), "rb") as f:
+            digest = hashlib.sha512(f.read()).digest()
+        if package.checksum != "sha512-" + base64.b64encode(digest).decode():
+            failures += 1
+    return failures
+
+
+def main():
+    files = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    size = (int(sys.argv[2]) if len(sys.argv) > 2 else 256) * 1024
+
+    with tempfile.TemporaryDirectory() as directory:
+        packages = []
+        for i in range(files):
+            content = os.urandom(size)
+            with open(os.path.join(directory, f"pkg-{i}-1.0.0.tgz"), "wb") as f:
+                f.write(content)
+            checksum = "sha512-" + base64.b64encode(hashlib.sha512(content).digest()).decode()
+            url = f"https://registry.yarnpkg.com/pkg-{i}/-/pkg-{i}-1.0.0.tgz"
+            packages.append(Package(f"pkg-{i}", "1.0.0", url=url, checksum=checksum))
+
+        start = time.perf_counter()
+        assert serial(packages, directory) == 0
+        elapsed = time.perf_counter() - start
+        mib = files * size / 1024 / 1024
+        print(f"{'serial':<14} {elapsed:7.3f} s ({mib / elapsed:.1f} MiB/s)")
+
+        start = time.perf_counter()
+        report = verify_mirror(packages, directory)
+        elapsed = time.perf_counter() - start
+        assert report.ok and len(report.verified) == files
+        print(f"{'verify_mirror':<14} {elapsed:7.3f} s ({report.summary()})")
+
+
+if __name__ == "__main__":
+    main()
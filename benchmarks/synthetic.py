@@ -0,0 +1,42 @@
+"""Generators for synthetic yarn.lock content used by the benchmarks."""
+
+V1_HEADER = "# THIS IS AN AUTOGENERATED FILE. DO NOT EDIT THIS FILE DIRECTLY.\n# yarn lockfile v1\n"
+
+
+def entry(i, dependencies=3, packages=None, acyclic=False):
+    """
+    Return one top-level block for package number i.
+
+    If acyclic, the package only depends on packages with a lower number.
+    """
+    name = f"pkg-{i}" if i % 5 else f"@scope-{i % 7}/pkg-{i}"
+    lines = [
+        f'"{name}@^{i % 9}.0.0", "{name}@^{i % 9}.1.0":',
+        f'  version "{i % 9}.1.{i % 13}"',
+        f'  resolved "https://registry.yarnpkg.com/{name}/-/pkg-{i}-{i % 9}.1.{i % 13}.tgz'
+        f'#{i:040x}"',
+        f"  integrity sha512-{i:086x}==",
+    ]
+    if acyclic:
+        deps = [((i * 2654435761 >> 8) + d * 40503) % i for d in range(dependencies)] if i else []
+    else:
+        deps = [
+            (i * 31 + d * 17) % packages if packages else i * 1000 + d for d in range(dependencies)
+        ]
+    if deps:
+        lines.append("  dependencies:")
+        for dep in deps:
+            dep_name = f"pkg-{dep}" if dep % 5 else f"@scope-{dep % 7}/pkg-{dep}"
+            lines.append(f'    "{dep_name}" "^{dep % 9}.0.0"')
+    return "\n".join(lines) + "\n"
+
+
+def lockfile(packages, dependencies=3, acyclic=False):
+    """Return a lockfile with the given number of packages, depending on each other."""
+    blocks = (entry(i, dependencies, packages, acyclic) for i in range(packages))
+    return V1_HEADER + "\n" + "\n".join(blocks)
+
+
+def wide_block(dependencies):
+    """Return a lockfile with a single block with the given number of dependencies."""
+    return V1_HEADER + "\n" + entry(1, dependencies)
@@ -0,0 +1,102 @@
+"""
+Copyright (C) 2020  Red Hat, Inc
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import marshal
+import os
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+from typing import Dict, Generator, Iterable, NamedTuple, Optional, Union
+
+from pyarn.engine import get_default_engine
+from pyarn.lockfile import Lockfile, parse
+
+
+class BatchResult(NamedTuple):
+    """The outcome of parsing one lockfile: either lockfile or error is None."""
+
+    path: Union[str, os.PathLike]
+    lockfile: Optional[Lockfile]
+    error: Optional[BaseException]
+
+
+def _init_worker(backend: str) -> None:
+    if backend == "ply":
+        # Build the parser once per worker process, before the first file arrives
+        get_default_engine()
+
+
+def _parse_file(path: Union[str, os.PathLike], tokenizer: str, backend: str) -> bytes:
+    """Parse a lockfile in a worker process, return the parsed data in marshal format."""
+    with open(path) as lockfile:
+        lockfile_str = lockfile.read()
+    # marshal is much faster than pickle for nested dicts of strings, integers and booleans,
+    # and only ever loads data written by this module
+    return marshal.dumps(parse(lockfile_str, tokenizer=tokenizer, backend=backend))
+
+
+def _result(path: Union[str, os.PathLike], future: "Future[bytes]") -> BatchResult:
+    try:
+        lockfile = Lockfile._from_parsed(marshal.loads(future.result()))  # nosec
+    except Exception as e:
+        return BatchResult(path, None, e)
+    return BatchResult(path, lockfile, None)
+
+
+def parse_many(
+    paths: Iterable[Union[str, os.PathLike]],
+    workers: Optional[int] = None,
+    ordered: bool = True,
+    tokenizer: str = "ply",
+    backend: str = "ply",
+) -> Generator[BatchResult, None, None]:
+    """
+    Parse many yarn.lock files in a pool of worker processes.
+
+    Yields a BatchResult for every path, in the order of paths if ordered is true, otherwise
+    as soon as each file is parsed. Files that cannot be read or parsed do not interrupt the
+    batch, their result holds the error instead of a lockfile. The number of workers defaults
+    to the number of CPUs. See Lockfile.from_str for the tokenizer and backend.
+
+    To stop early, close() the returned generator: the files not being parsed yet are
+    skipped.
+    """
+    if backend not in ("ply", "direct"):
+        raise ValueError(f"Unknown backend: {backend}")
+    # The arguments are checked above, when parse_many is called, not on the first next()
+    return _parse_many(paths, workers, ordered, tokenizer, backend)
+
+
+def _parse_many(
+    paths: Iterable[Union[str, os.PathLike]],
+    workers: Optional[int],
+    ordered: bool,
+    tokenizer: str,
+    backend: str,
+) -> Generator[BatchResult, None, None]:
+    futures: Dict["Future[bytes]", Union[str, os.PathLike]] = {}
+    executor = ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(backend,)
+    )
+    try:
+        for path in paths:
+            futures[executor.submit(_parse_file, path, tokenizer, backend)] = path
+        for future in futures if ordered else as_completed(futures):
+            yield _result(futures[future], future)
+    finally:
+        # If the caller stops early, do not parse the files still queued (those being parsed
+        # are waited for). shutdown(cancel_futures=True) needs Python 3.9.
+        for future in futures:
+            future.cancel()
+        executor.shutdown()
@@ -0,0 +1,203 @@
+"""
+Copyright (C) 2020  Red Hat, Inc
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import hashlib
+import io
+import logging
+import marshal
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+# Parsed data of a lockfile, named after the sha256 of the file content
+ENTRY_SUFFIX = ".parsed"
+# Stat signature of a lockfile and the sha256 of its content, named after the sha256 of its path
+STAT_SUFFIX = ".stat"
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+logger = logging.getLogger(__name__)
+
+
+# Modules whose changes may change the parsed data, see parser_version
+PARSER_MODULES = (
+    "direct.py",
+    "engine.py",
+    "lexer.py",
+    "lexer_wrapper.py",
+    "parser.py",
+    "scanner.py",
+)
+
+
+def pyarn_version() -> str:
+    """Return the installed version of pyarn, or "unknown"."""
+    try:
+        from importlib.metadata import PackageNotFoundError, version
+    except ImportError:  # Python 3.7
+        try:
+            from importlib_metadata import PackageNotFoundError, version  # type: ignore
+        except ImportError:
+            return "unknown"
+    try:
+        return version("pyarn")
+    except PackageNotFoundError:
+        return "unknown"
+
+
+def parser_version() -> str:
+    """
+    Return an identifier of the parser: a hash of the source of the PARSER_MODULES, so that
+    it changes with any change of the parser, including in a source checkout.
+
+    Falls back to pyarn_version() if the sources cannot be read.
+    """
+    directory = Path(__file__).parent
+    digest = hashlib.sha256()
+    try:
+        for name in PARSER_MODULES:
+            digest.update(name.encode() + b"\0" + (directory / name).read_bytes())
+    except OSError:
+        return pyarn_version()
+    return f"parser-{digest.hexdigest()[:16]}"
+
+
+def _stat_signature(stat: os.stat_result) -> Tuple[int, int, int, int]:
+    return (stat.st_mtime_ns, stat.st_size, stat.st_ino, stat.st_dev)
+
+
+class ParseCache:
+    """
+    On-disk cache of parsed lockfiles, see Lockfile.from_file.
+
+    Parsed lockfiles are stored in marshal format, keyed by the sha256 of the file content.
+    The path, modification time, size and inode of every file seen are also recorded, so that
+    an unchanged file is not even read on a cache hit.
+
+    Entries are kept in a subdirectory per parser version (see parser_version) and marshal
+    format version, so a changed parser never returns results of an older one. When the
+    entries for the current version take more than max_bytes, the least recently used ones
+    are removed.
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, os.PathLike],
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        version: Optional[str] = None,
+    ) -> None:
+        self.root = Path(directory)
+        self.directory = self.root / f"{version or parser_version()}-marshal{marshal.version}"
+        self.max_bytes = max_bytes
+
+    def parse_file(
+        self, path: Union[str, os.PathLike], parse: Callable[[str], Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """
+        Return the parsed content of a lockfile, calling parse(content) only on a cache miss.
+
+        The content is decoded like open(path).read() would. Errors writing to the cache
+        (e.g. a read-only or full cache directory) are logged, the parsed content is still
+        returned.
+        """
+        path = os.path.abspath(path)
+        stat_path = self.directory / (hashlib.sha256(os.fsencode(path)).hexdigest() + STAT_SUFFIX)
+        signature = _stat_signature(os.stat(path))
+
+        recorded = self._read(stat_path)
+        if recorded is not None and recorded[0] == signature:
+            parsed = self._read(self._entry_path(recorded[1]))
+            if parsed is not None:
+                return parsed
+
+        # If the file changes after the stat, the signature is outdated and the next call will
+        # hash the content again
+        with open(path, "rb") as f:
+            raw = f.read()
+        digest = hashlib.sha256(raw).hexdigest()
+
+        parsed = self._read(self._entry_path(digest))
+        write = parsed is None
+        if parsed is None:
+            parsed = parse(io.TextIOWrapper(io.BytesIO(raw)).read())
+        try:
+            if write:
+                self._write(self._entry_path(digest), parsed)
+            self._write(stat_path, (signature, digest))
+            self._evict()
+        except OSError as e:
+            logger.warning("Cannot write to the parse cache %s: %s", self.directory, e)
+        return parsed
+
+    def clear(self) -> None:
+        """Remove all the cache entries, for all versions of pyarn."""
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def _entry_path(self, digest: str) -> Path:
+        return self.directory / (digest + ENTRY_SUFFIX)
+
+    def _read(self, path: Path) -> Any:
+        try:
+            with open(path, "rb") as f:
+                value = marshal.load(f)  # nosec
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+        try:
+            # Mark the file as recently used, not possible in a read-only cache
+            os.utime(path)
+        except OSError:
+            pass
+        return value
+
+    def _write(self, path: Path, value: Any) -> None:
+        """Write a file atomically, concurrent readers see either the old or the new content."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                marshal.dump(value, f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def _evict(self) -> None:
+        """Remove the least recently used files until the cache fits in max_bytes."""
+        files = []
+        total = 0
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith((ENTRY_SUFFIX, STAT_SUFFIX)):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                files.append((stat.st_mtime_ns, stat.st_size, entry.path))
+                total += stat.st_size
+
+        files.sort()
+        for _, size, path in files:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            total -= size
@@ -0,0 +1,151 @@
+"""
+Copyright (C) 2020  Red Hat, Inc
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from array import array
+from operator import attrgetter
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+)
+
+if TYPE_CHECKING:
+    from pyarn.lockfile import Lockfile
+
+
+def _numpy() -> Any:
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("NumPy is required for numpy=True, install pyarn[numpy]") from None
+    return numpy
+
+
+class DictionaryColumn(Sequence[Optional[str]]):
+    """
+    A column of optional strings, dictionary-encoded: row i is values[codes[i]], or None if
+    codes[i] is -1.
+
+    codes is an array("i"), or a NumPy int32 array (and values a NumPy object array) if the
+    column was built with numpy=True.
+    """
+
+    def __init__(self, codes: Any, values: Any) -> None:
+        self.codes = codes
+        self.values = values
+        self._index: Optional[Dict[str, int]] = None
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __getitem__(self, index: Any) -> Any:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        code = self.codes[index]
+        return None if code < 0 else self.values[code]
+
+    def __iter__(self) -> Iterator[Optional[str]]:
+        values = self.values
+        for code in self.codes:
+            yield None if code < 0 else values[code]
+
+    def code(self, value: str) -> int:
+        """Return the code of a value, -1 if it is not in the column."""
+        if self._index is None:
+            self._index = {v: code for code, v in enumerate(self.values)}
+        return self._index.get(value, -1)
+
+
+def _encode(values: Iterable[Optional[str]], numpy: Any) -> DictionaryColumn:
+    """Dictionary-encode a column, codes are assigned in order of first appearance."""
+    values = list(values)
+    distinct = [value for value in dict.fromkeys(values) if value is not None]
+    index = {value: code for code, value in enumerate(distinct)}
+    lookup: Dict[Optional[str], int] = {None: -1}
+    lookup.update(index.items())
+    codes = array("i", map(lookup.__getitem__, values))
+    if numpy is None:
+        column = DictionaryColumn(codes, distinct)
+    else:
+        column = DictionaryColumn(
+            numpy.frombuffer(codes, dtype=numpy.intc).astype(numpy.int32),
+            numpy.array(distinct, dtype=object),
+        )
+    column._index = index
+    return column
+
+
+class PackageColumns(NamedTuple):
+    """
+    The packages of a lockfile as parallel columns, one row per top-level entry.
+
+    Row i holds the fields of the i-th package of Lockfile.packages(). Its dependencies are
+    the rows dependency_offsets[i] to dependency_offsets[i + 1] of dependency_names and
+    dependency_ranges. Equal strings share a code within a column, so that grouping and
+    filtering work on the integer codes.
+    """
+
+    keys: List[str]
+    name: DictionaryColumn
+    version: DictionaryColumn
+    url: DictionaryColumn
+    checksum: DictionaryColumn
+    path: DictionaryColumn
+    alias: DictionaryColumn
+    dependency_offsets: Any
+    dependency_names: DictionaryColumn
+    dependency_ranges: DictionaryColumn
+
+    @classmethod
+    def from_lockfile(cls, lockfile: "Lockfile", numpy: bool = False) -> "PackageColumns":
+        """Build the columns of a lockfile, see Lockfile.to_columns."""
+        np = _numpy() if numpy else None
+        packages = list(lockfile.iter_packages())
+        dependency_names: List[str] = []
+        dependency_ranges: List[str] = []
+        offsets = array("q", [0])
+        for package in packages:
+            dependencies = package.dependencies
+            dependency_names.extend(dependencies)
+            dependency_ranges.extend(dependencies.values())
+            offsets.append(len(dependency_names))
+
+        def column(field: str) -> DictionaryColumn:
+            return _encode(map(attrgetter(field), packages), np)
+
+        return cls(
+            list(lockfile.data),
+            column("name"),
+            column("version"),
+            column("url"),
+            column("checksum"),
+            column("path"),
+            column("alias"),
+            offsets if np is None else np.frombuffer(offsets, dtype=np.int64).copy(),
+            _encode(dependency_names, np),
+            _encode(dependency_ranges, np),
+        )
+
+    def dependencies(self, row: int) -> Dict[str, str]:
+        """Return the dependencies of a row, as {name: version range}."""
+        start, end = self.dependency_offsets[row], self.dependency_offsets[row + 1]
+        return dict(zip(self.dependency_names[start:end], self.dependency_ranges[start:end]))
@@ -0,0 +1,149 @@
+"""
+Copyright (C) 2020  Red Hat, Inc
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import os
+import re
+from itertools import zip_longest
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple, Union
+
+from pyarn.lockfile import Lockfile, Package
+from pyarn.stream import Entry, iter_entries
+
+# (version, resolved, integrity) of a lockfile entry
+Fingerprint = Tuple[Optional[str], Optional[str], Optional[str]]
+
+
+class PackageSummary(NamedTuple):
+    """The fields of a locked package compared by diff()."""
+
+    name: str
+    version: str
+    url: Optional[str]
+    checksum: Optional[str]
+
+
+class LockfileDiff(NamedTuple):
+    """Packages added, removed and changed (as (old, new) pairs), sorted by name and version."""
+
+    added: List[PackageSummary]
+    removed: List[PackageSummary]
+    changed: List[Tuple[PackageSummary, PackageSummary]]
+
+
+def _fingerprints(entries: Iterable[Tuple[str, Any]]) -> Dict[str, Fingerprint]:
+    return {
+        key: (value.get("version"), value.get("resolved"), value.get("integrity"))
+        for key, value in entries
+        if isinstance(value, dict)
+    }
+
+
+def _summary(key: str, fingerprint: Fingerprint) -> PackageSummary:
+    version, url, checksum = fingerprint
+    package = Package.from_dict(key, {"version": version})
+    return PackageSummary(package.name, package.version, url, checksum)
+
+
+def _version_key(summary: PackageSummary) -> Tuple[Any, ...]:
+    """Sort key ordering versions by their numeric parts, e.g. 1.9.0 before 1.10.0."""
+    # Unquoted versions, e.g. version 1, are parsed as integers
+    parts = re.split(r"(\d+)", str(summary.version))
+    version = tuple((1, int(part)) if part.isdigit() else (0, part) for part in parts)
+    return version, summary.url or "", summary.checksum or ""
+
+
+def _changed_summaries(
+    fingerprints: Dict[str, Fingerprint], other: Dict[str, Fingerprint]
+) -> Set[PackageSummary]:
+    """Return the summaries of the entries not in other with the same fingerprint."""
+    return {
+        _summary(key, fingerprint)
+        for key, fingerprint in fingerprints.items()
+        if other.get(key) != fingerprint
+    }
+
+
+def _present(
+    summaries: Set[PackageSummary], fingerprints: Dict[str, Fingerprint]
+) -> Set[PackageSummary]:
+    """Return the summaries that match an entry in fingerprints (under any key)."""
+    candidates = {(s.version, s.url, s.checksum) for s in summaries}
+    found = {
+        _summary(key, fingerprint)
+        for key, fingerprint in fingerprints.items()
+        if fingerprint in candidates
+    }
+    return summaries & found
+
+
+def _diff_fingerprints(old: Dict[str, Fingerprint], new: Dict[str, Fingerprint]) -> LockfileDiff:
+    """Compare two {key: (version, resolved, integrity)} dicts, see diff()."""
+    # Entries with the same key and fingerprint in both files are skipped without even
+    # parsing their key, only the others are summarized
+    old_changed = _changed_summaries(old, new)
+    new_changed = _changed_summaries(new, old)
+    removed = old_changed - new_changed
+    added = new_changed - old_changed
+    # A package may also be locked under another, unchanged key
+    removed -= _present(removed, new)
+    added -= _present(added, old)
+
+    by_name: Dict[str, Tuple[List[PackageSummary], List[PackageSummary]]] = {}
+    for summary in removed:
+        by_name.setdefault(summary.name, ([], []))[0].append(summary)
+    for summary in added:
+        by_name.setdefault(summary.name, ([], []))[1].append(summary)
+
+    result = LockfileDiff([], [], [])
+    for name in sorted(by_name):
+        old_versions, new_versions = by_name[name]
+        old_versions.sort(key=_version_key)
+        new_versions.sort(key=_version_key)
+        # Pair the versions of a package in order, e.g. 1.0.0 -> 1.0.1 and 2.0.0 -> 2.1.0
+        for old_summary, new_summary in zip_longest(old_versions, new_versions):
+            if new_summary is None:
+                result.removed.append(old_summary)
+            elif old_summary is None:
+                result.added.append(new_summary)
+            else:
+                result.changed.append((old_summary, new_summary))
+    return result
+
+
+def diff(old: Lockfile, new: Lockfile) -> LockfileDiff:
+    """
+    Compare the packages locked by two lockfiles.
+
+    Packages are compared by name, version, resolved URL and integrity. A package whose
+    version (or URL, or integrity) changed is reported as changed from the old to the new
+    version, packages only in the new or old lockfile are reported as added or removed.
+    """
+    return _diff_fingerprints(_fingerprints(old.data.items()), _fingerprints(new.data.items()))
+
+
+def diff_files(
+    old_path: Union[str, os.PathLike], new_path: Union[str, os.PathLike]
+) -> LockfileDiff:
+    """
+    Compare the packages locked by two yarn.lock files, see diff().
+
+    The files are parsed incrementally, only the fields compared by diff() are kept in memory.
+    """
+
+    def entries(path: Union[str, os.PathLike]) -> Iterable[Tuple[str, Any]]:
+        return (event for event in iter_entries(path) if isinstance(event, Entry))
+
+    return _diff_fingerprints(_fingerprints(entries(old_path)), _fingerprints(entries(new_path)))
@@ -0,0 +1,137 @@
+"""
+Copyright (C) 2020  Red Hat, Inc
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+Recursive-descent parser for yarn.lock files, an alternative to the PLY parser in
+pyarn.parser that accepts the same grammar and builds the same result:
+
+    blocks  : block | blocks block
+    block   : title members DEDENT | pair | COMMENT
+    title   : STRING COLON INDENT | list COLON INDENT
+    list    : STRING COMMA STRING | list COMMA STRING
+    members : member | members member
+    member  : pair | title members DEDENT
+    pair    : STRING [COLON] (STRING | NUMBER | BOOLEAN)
+"""
+from functools import partial
+from typing import Any, Dict, Iterable, Iterator, List, NoReturn, Optional, Tuple
+
+from pyarn.scanner import RawToken, Token, tokenize
+
+VALUE_TYPES = frozenset(("STRING", "NUMBER", "BOOLEAN"))
+
+# (key, value, first line, last line), key is None for comments
+Block = Tuple[Optional[str], Any, int, int]
+
+
+def _error(token: Optional[RawToken]) -> NoReturn:
+    raise ValueError(f"error parsing {Token(*token) if token is not None else None}")
+
+
+def _check_key(key: str) -> None:
+    if "," in key:
+        raise ValueError(f'Following key has a quoted comma: "{key}"')
+
+
+class _Parser:
+    def __init__(self, tokens: Iterable[RawToken]) -> None:
+        self._next = partial(next, iter(tokens), None)
+
+    def blocks(self) -> Iterator[Block]:
+        token = self._next()
+        if token is None:
+            _error(token)
+
+        while token is not None:
+            if token[0] == "COMMENT":
+                yield None, token[1], token[2], token[2]
+            elif token[0] == "STRING":
+                key, value, end = self._entry(token)
+                yield key, value, token[2], end[2]
+            else:
+                _error(token)
+            token = self._next()
+
+    def _entry(self, token: RawToken) -> Tuple[str, Any, RawToken]:
+        """Parse a pair or a titled block, return the key, value and the last token used."""
+        key = token[1]
+        token = self._next()
+        kind = token[0] if token is not None else None
+
+        if kind == "COLON":
+            token = self._next()
+            kind = token[0] if token is not None else None
+            if kind == "INDENT":
+                _check_key(key)
+                return self._members(key)
+        elif kind == "COMMA":
+            keys = [key]
+            while kind == "COMMA":
+                token = self._next()
+                if token is None or token[0] != "STRING":
+                    _error(token)
+                keys.append(token[1])
+                token = self._next()
+                kind = token[0] if token is not None else None
+            if kind != "COLON":
+                _error(token)
+            token = self._next()
+            if token is None or token[0] != "INDENT":
+                _error(token)
+            for k in keys:
+                _check_key(k)
+            return self._members(", ".join(keys))
+
+        if kind in VALUE_TYPES:
+            return key, token[1], token  # type: ignore[index]  # not None, see kind
+        _error(token)
+
+    def _members(self, key: str) -> Tuple[str, Dict[str, Any], RawToken]:
+        members: Dict[str, Any] = {}
+        token = self._next()
+        while token is not None and token[0] == "STRING":
+            member_key, value, _ = self._entry(token)
+            members[member_key] = value
+            token = self._next()
+            if token is not None and token[0] == "DEDENT":
+                return key, members, token
+        _error(token)
+
+
+def iter_blocks(tokens: Iterable[RawToken]) -> Iterator[Block]:
+    """
+    Parse the tokens of a yarn.lock file and yield its top-level blocks one by one.
+
+    Each block is a (key, value, first line, last line) tuple. Comments are yielded as
+    (None, comment, line, line).
+    """
+    return _Parser(tokens).blocks()
+
+
+def parse(lockfile_str: str) -> Dict[str, Any]:
+    """Parse the content of a yarn.lock file into a {"comments": ..., "data": ...} dict."""
+    return parse_tokens(tokenize(lockfile_str))
+
+
+def parse_tokens(tokens: Iterable[RawToken]) -> Dict[str, Any]:
+    """Parse the tokens of a yarn.lock file into a {"comments": ..., "data": ...} dict."""
+    comments: List[str] = []
+    data: Dict[str, Any] = {}
+    for key, value, _, _ in iter_blocks(tokens):
+        if key is None:
+            comments.append(value)
+        else:
+            data[key] = value
+    return {"comments": comments, "data": data}
@@ -0,0 +1,140 @@
+"""
+Copyright (C) 2020  Red Hat, Inc
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import copy
+import os
+import sys
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Union
+
+from ply import lex, yacc
+
+from pyarn import lexer, parser
+from pyarn.lexer_wrapper import Wrapper
+from pyarn.scanner import Scanner
+
+# Parse tables generated at build time (see write_tables) and shipped inside the package
+TABLES_MODULE = "parsetab"
+TABLES_PICKLE = "pyarn-parsetab.pickle"
+
+# Tokenizers for ParserEngine.parse: the PLY lexer or the hand-written pyarn.scanner
+TOKENIZERS = ("ply", "scanner")
+
+
+class ParserEngine:
+    """
+    Lexer and LALR parser for yarn.lock files, built once and reused across parses.
+
+    Building the PLY lexer and parser reflects over the grammar modules and loads (or
+    generates) the parse tables, which is much more expensive than parsing a small lockfile.
+    An engine does that work once. Every call to parse() works on a clone of the lexer and
+    parser state, so a single engine can safely be shared between threads.
+
+    By default, the parse tables bundled with the package are loaded as-is: nothing is written
+    to the filesystem and the tables are not checked against the grammar. If they are missing
+    (e.g. in a development checkout), they are generated in memory. Pass cache_dir to keep
+    generated tables in that directory instead; those are checked against the grammar and
+    regenerated whenever it changes.
+    """
+
+    def __init__(self, cache_dir: Optional[Union[str, os.PathLike]] = None) -> None:
+        self._lexer = lex.lex(module=lexer)
+        if cache_dir is None:
+            self._parser = yacc.yacc(
+                module=parser,
+                tabmodule=TABLES_MODULE,
+                optimize=True,
+                write_tables=False,
+                debug=False,
+            )
+        else:
+            Path(cache_dir).mkdir(parents=True, exist_ok=True)
+            self._parser = yacc.yacc(
+                module=parser,
+                picklefile=os.path.join(cache_dir, TABLES_PICKLE),
+                debug=False,
+            )
+
+    def parse(self, lockfile_str: str, tokenizer: str = "ply") -> Dict[str, Any]:
+        """
+        Parse the content of a yarn.lock file into a {"comments": ..., "data": ...} dict.
+
+        The tokenizer is either "ply" (the PLY lexer) or "scanner" (pyarn.scanner, faster).
+        Both produce the same tokens.
+        """
+        if tokenizer not in TOKENIZERS:
+            raise ValueError(f"Unknown tokenizer: {tokenizer}")
+        pyarn_lexer: Union[Wrapper, Scanner]
+        if tokenizer == "scanner":
+            pyarn_lexer = Scanner()
+        else:
+            pyarn_lexer = Wrapper(self._lexer.clone())
+
+        # The parser keeps its state stacks on the instance while parsing, a shallow copy
+        # shares the (read-only) tables but not the state
+        lockfile_parser = copy.copy(self._parser)
+        return lockfile_parser.parse(lockfile_str, lexer=pyarn_lexer)
+
+    def parse_lines(self, lines: Iterable[str]) -> Dict[str, Any]:
+        """Parse a yarn.lock file read line by line, always tokenized by pyarn.scanner."""
+        scanner = Scanner()
+        scanner.input_lines(lines)
+        # Without input, the parser reads the tokens the lexer already has
+        return copy.copy(self._parser).parse(lexer=scanner)
+
+
+def user_cache_dir() -> Path:
+    """Return the pyarn directory in the user's cache directory ($XDG_CACHE_HOME)."""
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_home, "pyarn")
+
+
+def write_tables() -> None:
+    """Generate the parse tables and write them to the package directory (at build time)."""
+    package_dir = Path(__file__).parent
+    # Never reuse existing tables, they may have been generated for an older grammar
+    try:
+        package_dir.joinpath(f"{TABLES_MODULE}.py").unlink()
+    except FileNotFoundError:
+        pass
+    sys.modules.pop(f"{__package__}.{TABLES_MODULE}", None)
+    yacc.yacc(
+        module=parser,
+        tabmodule=TABLES_MODULE,
+        outputdir=str(package_dir),
+        write_tables=True,
+        debug=False,
+    )
+
+
+_default_engine: Optional[ParserEngine] = None
+_default_engine_lock = threading.Lock()
+
+
+def get_default_engine() -> ParserEngine:
+    """Return the engine shared by the whole process, building it on first use."""
+    global _default_engine
+
+    if _default_engine is None:
+        with _default_engine_lock:
+            if _default_engine is None:
+                _default_engine = ParserEngine()
+    return _default_engine
+
+
+if __name__ == "__main__":
+    write_tables()
@@ -0,0 +1,215 @@
+"""
+Copyright (C) 2020  Red Hat, Inc
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from array import array
+from typing import TYPE_CHECKING, Iterable, List, Optional, Sequence, Tuple
+
+if TYPE_CHECKING:
+    from pyarn.lockfile import Lockfile
+
+# Entry fields listing the dependencies of a package
+DEPENDENCY_FIELDS = ("dependencies", "optionalDependencies")
+
+
+def _reverse(offsets: array, targets: array) -> Tuple[array, array]:
+    """Return the CSR arrays of the graph with all edges reversed."""
+    count = len(offsets) - 1
+    reverse_offsets = array("l", bytes(offsets.itemsize * (count + 1)))
+    for target in targets:
+        reverse_offsets[target + 1] += 1
+    for node in range(count):
+        reverse_offsets[node + 1] += reverse_offsets[node]
+
+    reverse_targets = array("l", bytes(targets.itemsize * len(targets)))
+    position = reverse_offsets[:-1]
+    for node in range(count):
+        for edge in range(offsets[node], offsets[node + 1]):
+            target = targets[edge]
+            reverse_targets[position[target]] = node
+            position[target] += 1
+    return reverse_offsets, reverse_targets
+
+
+def _reachable(offsets: array, targets: array, nodes: Iterable[int]) -> List[int]:
+    """Return the nodes reachable from the given ones (excluded), in breadth-first order."""
+    start = list(nodes)
+    seen = bytearray(len(offsets) - 1)
+    for node in start:
+        seen[node] = 1
+
+    result = []
+    queue = start
+    while queue:
+        next_queue = []
+        for node in queue:
+            for target in targets[offsets[node] : offsets[node + 1]]:
+                if not seen[target]:
+                    seen[target] = 1
+                    next_queue.append(target)
+        result.extend(next_queue)
+        queue = next_queue
+    return result
+
+
+class DependencyGraph:
+    """
+    Dependency graph of the entries of a lockfile.
+
+    Node i is the i-th top-level entry of the lockfile (keys[i]). The edges, from a package
+    to the entries locking its dependencies and optional dependencies, are stored as
+    compressed sparse rows: the dependencies of node i are
+    targets[offsets[i]:offsets[i + 1]]. Dependencies without a matching entry are listed
+    in unresolved as (node, name, version range) tuples.
+    """
+
+    def __init__(
+        self,
+        keys: List[str],
+        offsets: array,
+        targets: array,
+        unresolved: Optional[List[Tuple[int, str, str]]] = None,
+    ) -> None:
+        self.keys = keys
+        self.offsets = offsets
+        self.targets = targets
+        self.unresolved = unresolved or []
+        self._nodes = {key: node for node, key in enumerate(keys)}
+        self._reverse: Optional[Tuple[array, array]] = None
+
+    @classmethod
+    def from_lockfile(cls, lockfile: "Lockfile") -> "DependencyGraph":
+        """Resolve every dependency of every entry of the lockfile, once."""
+        keys = list(lockfile.data)
+        nodes = {key: node for node, key in enumerate(keys)}
+        specifiers = lockfile._specifier_index(rebuild=True)
+        offsets = array("l", [0])
+        targets = array("l")
+        unresolved = []
+
+        for node, entry in enumerate(lockfile.data.values()):
+            if isinstance(entry, dict):
+                for field in DEPENDENCY_FIELDS:
+                    for name, version_range in entry.get(field, {}).items():
+                        key = specifiers.get(f"{name}@{version_range}")
+                        if key is None:
+                            unresolved.append((node, name, version_range))
+                        else:
+                            targets.append(nodes[key])
+            offsets.append(len(targets))
+
+        return cls(keys, offsets, targets, unresolved)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def node(self, key: str) -> int:
+        """Return the node of a top-level lockfile key."""
+        return self._nodes[key]
+
+    def dependencies(self, node: int) -> Sequence[int]:
+        """Return the direct dependencies of a node."""
+        return self.targets[self.offsets[node] : self.offsets[node + 1]]
+
+    def dependents(self, node: int) -> Sequence[int]:
+        """Return the nodes that directly depend on a node."""
+        offsets, targets = self._reversed()
+        return targets[offsets[node] : offsets[node + 1]]
+
+    def transitive_dependencies(self, *nodes: int) -> List[int]:
+        """Return all the nodes the given ones depend on, directly or not."""
+        return _reachable(self.offsets, self.targets, nodes)
+
+    def transitive_dependents(self, *nodes: int) -> List[int]:
+        """Return all the nodes that depend on the given ones, directly or not."""
+        return _reachable(*self._reversed(), nodes)
+
+    def strongly_connected_components(self) -> List[List[int]]:
+        """
+        Return the strongly connected components of the graph, each with its nodes in
+        increasing order, every component coming after all the components it depends on.
+
+        A component is either a single node, or nodes that all depend on each other, directly
+        or not (a dependency cycle).
+        """
+        # Tarjan's algorithm, with an explicit stack of (node, next edge) frames instead of
+        # recursion, as dependency chains can be deeper than the recursion limit
+        offsets, targets = self.offsets, self.targets
+        count = len(self)
+        index = array("l", [-1]) * count
+        lowlink = array("l", [0]) * count
+        on_stack = bytearray(count)
+        stack: List[int] = []
+        components: List[List[int]] = []
+        visited = 0
+
+        for root in range(count):
+            if index[root] >= 0:
+                continue
+            index[root] = lowlink[root] = visited
+            visited += 1
+            stack.append(root)
+            on_stack[root] = 1
+            frames = [(root, offsets[root])]
+            while frames:
+                node, edge = frames[-1]
+                end = offsets[node + 1]
+                while edge < end:
+                    target = targets[edge]
+                    edge += 1
+                    if index[target] < 0:
+                        # Visit the target first, then come back to the next edge
+                        frames[-1] = (node, edge)
+                        index[target] = lowlink[target] = visited
+                        visited += 1
+                        stack.append(target)
+                        on_stack[target] = 1
+                        frames.append((target, offsets[target]))
+                        break
+                    if on_stack[target] and index[target] < lowlink[node]:
+                        lowlink[node] = index[target]
+                else:
+                    frames.pop()
+                    if frames:
+                        parent = frames[-1][0]
+                        if lowlink[node] < lowlink[parent]:
+                            lowlink[parent] = lowlink[node]
+                    if lowlink[node] == index[node]:
+                        # node is the root of a component, made of the nodes above it
+                        component = []
+                        while True:
+                            member = stack.pop()
+                            on_stack[member] = 0
+                            component.append(member)
+                            if member == node:
+                                break
+                        component.sort()
+                        components.append(component)
+        return components
+
+    def topological_order(self) -> List[int]:
+        """
+        Return all the nodes, every node coming after all its dependencies.
+
+        The nodes of a dependency cycle cannot all come after each other: they come together,
+        in increasing order, after all the dependencies of the cycle (see
+        strongly_connected_components).
+        """
+        return [node for component in self.strongly_connected_components() for node in component]
+
+    def _reversed(self) -> Tuple[array, array]:
+        if self._reverse is None:
+            self._reverse = _reverse(self.offsets, self.targets)
+        return self._reverse
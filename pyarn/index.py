@@ -0,0 +1,276 @@
+"""
+Copyright (C) 2020  Red Hat, Inc
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import codecs
+import locale
+import logging
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple, Union
+
+from pyarn import direct
+from pyarn.lockfile import V1_VERSION_COMMENT, Package, split_key
+from pyarn.scanner import tokenize_lines
+
+logger = logging.getLogger(__name__)
+
+# The index of a lockfile is saved next to it, with this suffix
+INDEX_SUFFIX = ".pyarn-index"
+# Bumped whenever the content of saved indexes changes
+INDEX_FORMAT = 2
+
+# Saved indexes start with a header (INDEX_HEADER), followed by the UTF-8 length of every key
+# (uint32), the offset and length of every key's block (int64 pairs), then the UTF-8 text of
+# the version, the encoding and the keys. All numbers are little-endian.
+INDEX_MAGIC = b"PYARNIDX"
+# magic, format, lockfile size, lockfile mtime (ns), version length, encoding length, keys,
+# text size
+INDEX_HEADER = struct.Struct("<8sIQqIIIQ")
+_BIG_ENDIAN = sys.byteorder == "big"
+
+# (offset, length) of a top-level block, in bytes
+Span = Tuple[int, int]
+
+
+def _signature(path: Union[str, os.PathLike]) -> Tuple[int, int]:
+    stat = os.stat(path)
+    return (stat.st_size, stat.st_mtime_ns)
+
+
+def _little_endian(values: array) -> array:
+    if _BIG_ENDIAN:
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values
+
+
+def _read_index(
+    f: BinaryIO, path: Union[str, os.PathLike]
+) -> Tuple[str, Dict[str, Span], Tuple[int, int], str]:
+    """
+    Read and validate a saved index, return (version, spans, signature, encoding).
+
+    Raises ValueError if the file is not a valid index of the lockfile at path in its current
+    state. Saved indexes are only data: every field is checked, nothing in them is executed.
+    """
+    header = f.read(INDEX_HEADER.size)
+    if len(header) != INDEX_HEADER.size:
+        raise ValueError("Truncated index")
+    (
+        magic,
+        index_format,
+        size,
+        mtime_ns,
+        version_size,
+        encoding_size,
+        count,
+        text_size,
+    ) = INDEX_HEADER.unpack(header)
+    if magic != INDEX_MAGIC or index_format != INDEX_FORMAT:
+        raise ValueError("Not an index, or of another format")
+    if (size, mtime_ns) != _signature(path):
+        raise ValueError("Outdated index")
+    if os.fstat(f.fileno()).st_size != INDEX_HEADER.size + 20 * count + text_size:
+        raise ValueError("Index of the wrong size")
+
+    key_sizes = array("I")
+    key_sizes.frombytes(f.read(4 * count))
+    raw_spans = array("q")
+    raw_spans.frombytes(f.read(16 * count))
+    text = f.read(text_size)
+    if _BIG_ENDIAN:
+        key_sizes.byteswap()
+        raw_spans.byteswap()
+    if len(text) != text_size or version_size + encoding_size + sum(key_sizes) != text_size:
+        raise ValueError("Inconsistent index")
+
+    version = text[:version_size].decode()
+    encoding = text[version_size : version_size + encoding_size].decode()
+    if version not in ("1", "unknown"):
+        raise ValueError(f"Invalid lockfile version: {version!r}")
+    # Raises LookupError for unknown or non-text encodings (not for empty input)
+    b"\n\n\n\n".decode(encoding, "ignore")
+
+    spans: Dict[str, Span] = {}
+    position = version_size + encoding_size
+    for i, key_size in enumerate(key_sizes):
+        key = text[position : position + key_size].decode()
+        position += key_size
+        offset, length = raw_spans[2 * i], raw_spans[2 * i + 1]
+        if offset < 0 or length <= 0 or offset + length > size:
+            raise ValueError(f"Invalid span of {key!r}")
+        spans[key] = (offset, length)
+    if len(spans) != count:
+        raise ValueError("Duplicated keys")
+    return version, spans, (size, mtime_ns), encoding
+
+
+def _decoded_lines(f: BinaryIO, encoding: str, offsets: array) -> Iterator[str]:
+    """Decode a file opened in binary mode line by line, recording where every line starts."""
+    decode = codecs.getincrementaldecoder(encoding)().decode
+    offset = 0
+    for raw in f:
+        offsets.append(offset)
+        offset += len(raw)
+        # The scanner ignores the \r of \r\n newlines
+        yield decode(raw)
+    offsets.append(offset)
+    yield decode(b"", final=True)
+
+
+class LockfileIndex:
+    """
+    Position of every top-level entry of a yarn.lock file, to load entries one at a time.
+
+    Building an index parses the whole file once. Afterwards, get() reads and parses only the
+    block of the requested entry. Indexes can be saved next to the lockfile and are only used
+    as long as the lockfile keeps the same size and modification time.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, os.PathLike],
+        version: str,
+        spans: Dict[str, Span],
+        signature: Tuple[int, int],
+        encoding: Optional[str] = None,
+    ) -> None:
+        self.path = path
+        self.version = version
+        self.spans = spans
+        self.signature = signature
+        self.encoding = encoding or locale.getpreferredencoding(False)
+        self._specifiers: Optional[Dict[str, str]] = None
+
+    @classmethod
+    def build(
+        cls, path: Union[str, os.PathLike], encoding: Optional[str] = None
+    ) -> "LockfileIndex":
+        """Parse a lockfile and return the index of its top-level entries."""
+        encoding = encoding or locale.getpreferredencoding(False)
+        signature = _signature(path)
+        version = "unknown"
+        spans = {}
+        # Offset of the start of every line read so far, line n starts at offsets[n - 1]
+        offsets = array("q")
+
+        with open(path, "rb") as f:
+            blocks = direct.iter_blocks(tokenize_lines(_decoded_lines(f, encoding, offsets)))
+            for key, value, first_line, last_line in blocks:
+                if key is None:
+                    if value == V1_VERSION_COMMENT:
+                        version = "1"
+                    continue
+                start = offsets[first_line - 1]
+                # The line after the block may not have been read yet
+                end = offsets[last_line] if last_line < len(offsets) else f.tell()
+                spans[key] = (start, end - start)
+
+        return cls(path, version, spans, signature, encoding)
+
+    @classmethod
+    def load(cls, path: Union[str, os.PathLike]) -> Optional["LockfileIndex"]:
+        """
+        Return the saved index of a lockfile, or None if there is none, it is outdated or it
+        is not valid.
+        """
+        try:
+            with open(f"{os.fspath(path)}{INDEX_SUFFIX}", "rb") as f:
+                version, spans, signature, encoding = _read_index(f, path)
+        except (OSError, ValueError, LookupError):
+            return None
+        return cls(path, version, spans, signature, encoding)
+
+    @classmethod
+    def open(cls, path: Union[str, os.PathLike]) -> "LockfileIndex":
+        """Return the saved index of a lockfile if it is up to date, otherwise build and save it."""
+        index = cls.load(path)
+        if index is None:
+            index = cls.build(path)
+            try:
+                index.save()
+            except OSError as e:
+                logger.warning("Cannot save the index of %s: %s", path, e)
+        return index
+
+    def save(self) -> None:
+        """Save the index next to the lockfile (atomically)."""
+        index_path = f"{os.fspath(self.path)}{INDEX_SUFFIX}"
+        version = self.version.encode()
+        encoding = self.encoding.encode()
+        keys = [key.encode() for key in self.spans]
+        spans = array("q")
+        for offset, length in self.spans.values():
+            spans.extend((offset, length))
+        text = b"".join([version, encoding, *keys])
+        header = INDEX_HEADER.pack(
+            INDEX_MAGIC,
+            INDEX_FORMAT,
+            *self.signature,
+            len(version),
+            len(encoding),
+            len(keys),
+            len(text),
+        )
+
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(index_path) or ".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(header)
+                f.write(_little_endian(array("I", map(len, keys))))
+                f.write(_little_endian(spans))
+                f.write(text)
+            os.replace(tmp_path, index_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def __len__(self) -> int:
+        return len(self.spans)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.spans
+
+    def keys(self) -> List[str]:
+        return list(self.spans)
+
+    def key_for(self, name: str, version_range: str) -> Optional[str]:
+        """Return the top-level key of the entry locking name@version_range, if any."""
+        if self._specifiers is None:
+            # Only needed by dependency lookups, built on first use
+            self._specifiers = {
+                specifier: key for key in self.spans for specifier in split_key(key)
+            }
+        return self._specifiers.get(f"{name}@{version_range}")
+
+    def get(self, key: str) -> Any:
+        """Read and parse the value of a top-level entry. Raises KeyError if there is none."""
+        offset, length = self.spans[key]
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            block = f.read(length)
+        data = direct.parse(block.decode(self.encoding))["data"]
+        return data[key]
+
+    def resolve(self, name: str, version_range: str) -> Optional[Package]:
+        """Return the package locked for a dependency on name@version_range, if any."""
+        key = self.key_for(name, version_range)
+        if key is None:
+            return None
+        return Package.from_dict(key, self.get(key))
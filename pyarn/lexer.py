@@ -14,6 +14,8 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
+import sys
+
 tokens = (
     "STRING",
     "COMMENT",
@@ -53,6 +55,8 @@ def t_STRING(t):
     r'"[^"\n]*"|[a-zA-Z/.-][^\s\n,:]*'
     if t.value.startswith('"'):
         t.value = t.value[1:-1]
+    # Keys, package names and version ranges repeat a lot in big lockfiles, share them
+    t.value = sys.intern(t.value)
     return t
 
 
@@ -14,17 +14,41 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
-import io
 import json
 import logging
+import os
 import re
+import sys
+from concurrent.futures import Executor
+from functools import lru_cache
+from itertools import chain
 from pathlib import Path
-from typing import Any, Dict, Optional, Pattern
-
-from ply import lex, yacc
-
-from pyarn import lexer, parser
-from pyarn.lexer_wrapper import Wrapper
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Collection,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Pattern,
+    Sequence,
+    TextIO,
+    Tuple,
+    Union,
+    overload,
+)
+
+from pyarn import direct, lexer, parallel, snapshot
+from pyarn.cache import ParseCache
+from pyarn.columns import PackageColumns
+from pyarn.engine import TOKENIZERS, ParserEngine, get_default_engine
+from pyarn.graph import DependencyGraph
+from pyarn.scanner import RawToken, tokenize, tokenize_lines
+from pyarn.source import Source
+from pyarn.stream import Comment, Entry, aiter_entries, mapped_lines
 
 logger = logging.getLogger(__name__)
 
@@ -32,8 +56,18 @@ UNQUOTED_STRING_RE = re.compile(lexer.UNQUOTED_STRING)
 
 V1_VERSION_COMMENT = "# yarn lockfile v1"
 
+NAME_AT_VERSION_RE = re.compile(r"(?P<name>@?[^@]+)(?:@(?P<version>[^,]*))?")
+# Like NAME_AT_VERSION_RE, also decoding npm aliases (alias@npm:name@version) in one step
+PACKAGE_KEY_RE = re.compile(
+    r"(?P<name>@?[^@]+)"
+    r"(?:@(?:npm:(?P<aliased_name>@?[^@,]+)(?:@(?P<aliased_version>[^,]*))?|(?P<version>[^,]*)))?"
+)
+
 
 class Package:
+    # Big lockfiles have many thousands of packages, avoid a __dict__ for each of them
+    __slots__ = ("name", "version", "url", "checksum", "path", "dependencies", "alias")
+
     def __init__(
         self,
         name: str,
@@ -81,16 +115,24 @@ class Package:
 
     @classmethod
     def from_dict(cls, raw_name: str, data: Dict[str, Any]) -> "Package":
-        name_at_version = re.compile(r"(?P<name>@?[^@]+)(?:@(?P<version>[^,]*))?")
-
         # _version is the version as declared in package.json, not the resolved version
-        name, _version = _must_match(name_at_version, raw_name).groups()
+        match = PACKAGE_KEY_RE.match(raw_name)
+        if not match:
+            # Both patterns fail on the name, report the error for the simpler one (raises)
+            match = _must_match(NAME_AT_VERSION_RE, raw_name)
+        name, aliased_name, aliased_version, _version = match.groups()
         alias = None
         path = None
 
-        if _version and _version.startswith("npm:"):
+        if aliased_name is not None:
+            alias = name
+            name, _version = aliased_name, aliased_version
+        elif _version and _version.startswith("npm:"):
+            # Not a valid alias (e.g. "npm:@"), this fails with the appropriate error
             alias = name
-            name, _version = _must_match(name_at_version, _remove_prefix(_version, "npm:")).groups()
+            name, _version = _must_match(
+                NAME_AT_VERSION_RE, _remove_prefix(_version, "npm:")
+            ).groups()
 
         if _version:
             path = cls.get_path_from_version_specifier(_version)
@@ -101,7 +143,7 @@ class Package:
             raise ValueError("Package version was not provided")
 
         return cls(
-            name=name,
+            name=sys.intern(name),
             version=version,
             url=data.get("resolved"),
             checksum=data.get("integrity"),
@@ -113,14 +155,12 @@ class Package:
     @staticmethod
     def get_path_from_version_specifier(version: str) -> Optional[str]:
         """Return the path from a package.json file dependency version specifier."""
-        version_path = Path(version)
-
         if version.startswith("file:"):
             return _remove_prefix(version, "file:")
         elif version.startswith("link:"):
             return _remove_prefix(version, "link:")
-        elif version_path.is_absolute() or version.startswith(("./", "../")):
-            return str(version_path)
+        elif version.startswith(("./", "../")) or os.path.isabs(version):
+            return str(Path(version))
         else:
             # Some non-path version specifier, (e.g. "1.0.0" or a web link)
             # See https://docs.npmjs.com/cli/v10/configuring-npm/package-json#dependencies
@@ -138,10 +178,180 @@ def _must_match(pat: Pattern, s: str) -> re.Match:
     return match
 
 
+class LazyPackages(Sequence[Package]):
+    """
+    Read-only sequence of the packages of a lockfile, built only when accessed.
+
+    Packages are created by Package.from_dict the first time they are accessed and cached
+    afterwards. The sequence covers the entries present when it was created.
+    """
+
+    def __init__(self, data: Dict[str, Any]) -> None:
+        self._data = data
+        self._keys = list(data)
+        self._packages: List[Optional[Package]] = [None] * len(self._keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    @overload
+    def __getitem__(self, index: int) -> Package:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[Package]:
+        ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Package, List[Package]]:
+        if isinstance(index, slice):
+            return [self._get(i) for i in range(*index.indices(len(self._keys)))]
+        # Let range handle negative and out-of-range indexes
+        return self._get(range(len(self._keys))[index])
+
+    def __iter__(self) -> Iterator[Package]:
+        for i in range(len(self._keys)):
+            yield self._get(i)
+
+    def _get(self, i: int) -> Package:
+        package = self._packages[i]
+        if package is None:
+            key = self._keys[i]
+            package = self._packages[i] = Package.from_dict(key, self._data[key])
+        return package
+
+
+def split_key(key: str) -> List[str]:
+    """Split a top-level lockfile key into its specifiers, e.g. ["foo@^1.0.0", "foo@^1.1.0"]."""
+    return [specifier.strip() for specifier in key.split(",")]
+
+
+def parse(
+    lockfile_str: str,
+    engine: Optional[ParserEngine] = None,
+    tokenizer: str = "ply",
+    backend: str = "ply",
+) -> Dict[str, Any]:
+    """
+    Parse the content of a yarn.lock file into a {"comments": ..., "data": ...} dict.
+
+    See Lockfile.from_str for the arguments.
+    """
+    if backend == "ply":
+        return (engine or get_default_engine()).parse(lockfile_str, tokenizer=tokenizer)
+    elif backend == "direct":
+        return direct.parse(lockfile_str)
+    else:
+        raise ValueError(f"Unknown backend: {backend}")
+
+
+def parse_lines(
+    lines: Iterable[str], engine: Optional[ParserEngine] = None, backend: str = "ply"
+) -> Dict[str, Any]:
+    """Like parse(), for a yarn.lock file read line by line (always tokenized by pyarn.scanner)."""
+    if backend == "ply":
+        return (engine or get_default_engine()).parse_lines(lines)
+    elif backend == "direct":
+        return direct.parse_tokens(tokenize_lines(lines))
+    else:
+        raise ValueError(f"Unknown backend: {backend}")
+
+
+# Package names to parse, see Lockfile.from_str
+NameFilter = Union[Collection[str], Callable[[str], bool]]
+
+
+def _skip_entries(only: NameFilter) -> Callable[[str], bool]:
+    """Return a scanner skip_block function skipping the entries of the packages not in only."""
+    if callable(only):
+        match = only
+    else:
+        match = frozenset([only] if isinstance(only, str) else only).__contains__
+
+    def skip(line: str) -> bool:
+        line = line.rstrip()
+        if not line.endswith(":"):
+            # Not the title of a top-level entry
+            return False
+        for specifier in line[:-1].split(","):
+            specifier = specifier.strip().strip('"')
+            at = specifier.find("@", 1)
+            if at < 0:
+                if match(specifier):
+                    return False
+                continue
+            if match(specifier[:at]):
+                return False
+            if specifier.startswith("npm:", at + 1):
+                # An alias, also match the name of the aliased package
+                aliased = specifier[at + 5 :]
+                aliased_at = aliased.find("@", 1)
+                if match(aliased[:aliased_at] if aliased_at > 0 else aliased):
+                    return False
+        return True
+
+    return skip
+
+
+def _parse_filtered(tokens: Iterator[RawToken]) -> Dict[str, Any]:
+    first = next(tokens, None)
+    if first is None:
+        # All the entries were skipped (the grammar does not allow empty files)
+        return {"comments": [], "data": {}}
+    return direct.parse_tokens(chain([first], tokens))
+
+
+def _check_options(
+    engine: Optional[ParserEngine],
+    tokenizer: str,
+    backend: str,
+    keep_source: bool,
+    only: Optional[NameFilter],
+    jobs: Optional[int],
+    cache: Optional[ParseCache] = None,
+    mmap: bool = False,
+) -> None:
+    """Raise ValueError if options of Lockfile.from_file or from_str cannot be combined."""
+    modes = [
+        name
+        for name, enabled in (
+            ("keep_source", keep_source),
+            ("only", only is not None),
+            ("jobs", jobs is not None),
+            ("mmap", mmap),
+        )
+        if enabled
+    ]
+    if len(modes) > 1:
+        raise ValueError(f"Cannot combine {modes[0]} and {modes[1]}")
+    if cache is not None and modes and modes[0] != "jobs":
+        raise ValueError(f"Cannot combine cache and {modes[0]}")
+
+    # Options of the PLY backend, checked here too as a cache hit never reaches the engine
+    if tokenizer not in TOKENIZERS:
+        raise ValueError(f"Unknown tokenizer: {tokenizer}")
+    ply_options = [
+        name
+        for name, given in (("engine", engine is not None), ("tokenizer", tokenizer != "ply"))
+        if given
+    ]
+    if ply_options:
+        if backend == "direct":
+            raise ValueError(f"Cannot combine {ply_options[0]} and the direct backend")
+        # keep_source, only and jobs always use the direct backend (mmap uses the engine, and
+        # always tokenizes with pyarn.scanner)
+        if modes and modes != ["mmap"]:
+            raise ValueError(f"Cannot combine {ply_options[0]} and {modes[0]}")
+
+
 class Lockfile:
     def __init__(self, version, data):
         self.version = version
         self.data = data
+        # Specifier index, and the data and number of entries it was built from
+        self._specifiers: Dict[str, str] = {}
+        self._specifiers_source: Tuple[Optional[Dict[str, Any]], int] = (None, -1)
+        # Text of the parsed file, for save_incremental
+        self._source: Optional[Source] = None
 
         if self.version == "unknown":
             logger.warning("Unknown Yarn version. Was this lockfile manually edited?")
@@ -149,72 +359,361 @@ class Lockfile:
         elif self.version != "1":
             raise ValueError(f"Unsupported yarn.lockfile version: {version}")
 
+    def _specifier_index(self, rebuild: bool = False) -> Dict[str, str]:
+        """
+        Return the index from specifiers (e.g. "foo@^1.0.0") to top-level keys.
+
+        The index is built on first use and rebuilt when data is replaced, when its number of
+        entries changes, or if rebuild is true.
+        """
+        data: Dict[str, Any] = self.data
+        source, size = self._specifiers_source
+        if rebuild or source is not data or size != len(data):
+            self._specifiers = {specifier: key for key in data for specifier in split_key(key)}
+            self._specifiers_source = (data, len(data))
+        return self._specifiers
+
+    def key_for(self, name: str, version_range: str) -> Optional[str]:
+        """
+        Return the top-level key of the entry locking name@version_range, if any.
+
+        Lookups use an index of the specifiers of all the keys, rebuilt when data is replaced,
+        when its number of entries changes, or when the key found is no longer in data. Call
+        invalidate() after replacing keys without changing the number of entries.
+        """
+        specifier = f"{name}@{version_range}"
+        key = self._specifier_index().get(specifier)
+        if key is not None and key not in self.data:
+            key = self._specifier_index(rebuild=True).get(specifier)
+        return key
+
+    def invalidate(self) -> None:
+        """Rebuild the specifier index on the next lookup, see key_for."""
+        self._specifiers_source = (None, -1)
+
+    def resolve(self, name: str, version_range: str) -> Optional[Package]:
+        """
+        Return the package locked for a dependency on name@version_range, if any.
+
+        See key_for for how entries are looked up.
+        """
+        key = self.key_for(name, version_range)
+        if key is None:
+            return None
+        return Package.from_dict(key, self.data[key])
+
+    def graph(self) -> DependencyGraph:
+        """
+        Return the dependency graph of the lockfile entries, with every dependency resolved.
+
+        The graph is a snapshot, it does not follow later changes to the lockfile data.
+        """
+        return DependencyGraph.from_lockfile(self)
+
+    def to_columns(self, numpy: bool = False) -> PackageColumns:
+        """
+        Return the packages as parallel, dictionary-encoded columns, see PackageColumns.
+
+        If numpy is true, the columns hold NumPy arrays (NumPy must be installed).
+        """
+        return PackageColumns.from_lockfile(self, numpy)
+
     def to_json(self):
         return json.dumps(self.data, sort_keys=True, indent=4)
 
+    def iter_json(self, indent: Optional[int] = 4, compact: bool = False) -> Iterator[str]:
+        """
+        Yield the JSON document of the lockfile data in parts, one per top-level entry.
+
+        The parts joined together are json.dumps(self.data, sort_keys=True, indent=indent),
+        the same as to_json() by default. If compact is true, the document is written without
+        any whitespace instead (indent is ignored).
+        """
+        if compact:
+            indent = None
+            separators = (",", ":")
+        else:
+            separators = (",", ": ") if indent is not None else (", ", ": ")
+        encoder = json.JSONEncoder(sort_keys=True, indent=indent, separators=separators)
+        item_separator, key_separator = separators
+
+        if not self.data:
+            yield "{}"
+            return
+        if indent is None:
+            start, newline, end = "{", item_separator, "}"
+        else:
+            # Entries are encoded on their own, shift their lines by one level (newlines in
+            # strings are escaped, all the newlines in an encoded value start a new line)
+            start = "{\n" + " " * indent
+            newline = item_separator + "\n" + " " * indent
+            end = "\n}"
+        encode = encoder.encode
+        first = True
+        for key in sorted(self.data):
+            value = encode(self.data[key])
+            if indent is not None:
+                value = value.replace("\n", "\n" + " " * indent)
+            yield f"{start if first else newline}{encode(key)}{key_separator}{value}"
+            first = False
+        yield end
+
+    def to_json_file(self, fp: TextIO, indent: Optional[int] = 4, compact: bool = False) -> None:
+        """
+        Write the JSON document of the lockfile data to a text file object, see iter_json.
+
+        The document is written one top-level entry at a time, it is never held in memory
+        as a whole.
+        """
+        for part in self.iter_json(indent, compact):
+            fp.write(part)
+
     def packages(self):
-        packages = []
+        return list(self.iter_packages())
+
+    def iter_packages(self) -> Iterator[Package]:
+        """Yield the packages of the lockfile one by one."""
         for name, pkg_data in self.data.items():
-            pkg = Package.from_dict(name, pkg_data)
-            packages.append(pkg)
-        return packages
+            yield Package.from_dict(name, pkg_data)
+
+    def lazy_packages(self) -> LazyPackages:
+        """Return a sequence of the packages of the lockfile that builds them only on access."""
+        return LazyPackages(self.data)
+
+    @staticmethod
+    def parser() -> ParserEngine:
+        """Return the parser engine shared by all Lockfile.from_str calls."""
+        return get_default_engine()
 
     @classmethod
-    def from_file(cls, path):
+    def from_file(
+        cls,
+        path,
+        engine: Optional[ParserEngine] = None,
+        tokenizer: str = "ply",
+        backend: str = "ply",
+        cache: Optional[ParseCache] = None,
+        mmap: bool = False,
+        keep_source: bool = False,
+        only: Optional[NameFilter] = None,
+        jobs: Optional[int] = None,
+    ):
+        """
+        Parse a yarn.lock file, see from_str.
+
+        If a cache is given, the parsed content is looked up in it before parsing the file, and
+        stored in it afterwards.
+
+        If mmap is true, the file is memory-mapped and tokenized by pyarn.scanner one line at a
+        time, instead of being read into a string first. This keeps the memory used while
+        parsing close to the size of the parsed data.
+
+        For keep_source, only and jobs, see from_str. keep_source, only, jobs and mmap cannot
+        be combined with each other, and only jobs can be combined with a cache: any other
+        combination raises ValueError.
+        """
+        _check_options(engine, tokenizer, backend, keep_source, only, jobs, cache, mmap)
+        if only is not None:
+            with open(path) as lockfile:
+                tokens = tokenize_lines(lockfile, skip_block=_skip_entries(only))
+                return cls._from_parsed(_parse_filtered(tokens))
+
+        if keep_source:
+            with open(path) as lockfile:
+                return cls.from_str(lockfile.read(), keep_source=True)
+
+        if cache is not None:
+            if jobs is not None:
+                parsed_data = cache.parse_file(
+                    path, lambda lockfile_str: parallel.parse(lockfile_str, jobs)
+                )
+                return cls._from_parsed(parsed_data)
+            if backend == "ply" and engine is None:
+                engine = cls.parser()
+            parsed_data = cache.parse_file(
+                path, lambda lockfile_str: parse(lockfile_str, engine, tokenizer, backend)
+            )
+            return cls._from_parsed(parsed_data)
+
+        if mmap:
+            if backend == "ply" and engine is None:
+                engine = cls.parser()
+            with mapped_lines(path) as lines:
+                return cls._from_parsed(parse_lines(lines, engine, backend))
+
         with open(path) as lockfile:
             lockfile_str = lockfile.read()
-        return Lockfile.from_str(lockfile_str)
+        return Lockfile.from_str(
+            lockfile_str, engine=engine, tokenizer=tokenizer, backend=backend, jobs=jobs
+        )
+
+    @classmethod
+    def from_str(
+        cls,
+        lockfile_str,
+        engine: Optional[ParserEngine] = None,
+        tokenizer: str = "ply",
+        backend: str = "ply",
+        keep_source: bool = False,
+        only: Optional[NameFilter] = None,
+        jobs: Optional[int] = None,
+    ):
+        """
+        Parse the content of a yarn.lock file.
+
+        The backend is either "ply" (the PLY parser, using the given engine and tokenizer) or
+        "direct" (pyarn.direct, a faster recursive-descent parser). Both give the same result.
+
+        If keep_source is true, the content and the position of every top-level block are kept
+        for save_incremental. Parsing then always uses the direct backend.
+
+        If only is given, either a collection of package names or a function called with
+        package names, only the entries for the given packages (or for which the function
+        returns true) are parsed. The other entries are skipped line by line, without being
+        tokenized. Top-level comments are kept, and parsing always uses the direct backend.
+
+        If jobs is given, large content is split into chunks of top-level blocks parsed in up
+        to jobs worker processes (0 for one per CPU), see pyarn.parallel.parse. Parsing then
+        always uses the direct backend.
+
+        keep_source, only and jobs cannot be combined with each other, nor with the engine or
+        tokenizer of the PLY backend: such combinations raise ValueError.
+        """
+        _check_options(engine, tokenizer, backend, keep_source, only, jobs)
+        if only is not None:
+            tokens = tokenize(lockfile_str, skip_block=_skip_entries(only))
+            return cls._from_parsed(_parse_filtered(tokens))
+
+        if keep_source:
+            parsed_data, source = Source.parse(lockfile_str)
+            lock = cls._from_parsed(parsed_data)
+            lock._source = source
+            return lock
+
+        if jobs is not None:
+            return cls._from_parsed(parallel.parse(lockfile_str, jobs))
+
+        if backend == "ply" and engine is None:
+            engine = cls.parser()
+        return cls._from_parsed(parse(lockfile_str, engine, tokenizer, backend))
+
+    @classmethod
+    async def afrom_file(cls, path, executor: Optional[Executor] = None) -> "Lockfile":
+        """
+        Parse a yarn.lock file without blocking the asyncio event loop.
+
+        The file is read and parsed in the executor (the loop's default executor if None), a
+        batch of top-level blocks at a time, see pyarn.stream.aiter_entries. The result is the
+        same as from_file(path, backend="direct").
+        """
+        comments = []
+        data = {}
+        async for event in aiter_entries(path, executor):
+            if isinstance(event, Comment):
+                comments.append(event.text)
+            else:
+                data[event.key] = event.value
+        return cls._from_parsed({"comments": comments, "data": data})
 
     @classmethod
-    def from_str(cls, lockfile_str):
-        pyarn_lexer = Wrapper(lex.lex(module=lexer))
-        lockfile_parser = yacc.yacc(module=parser, debug=False)
-        parsed_data = lockfile_parser.parse(lockfile_str, lexer=pyarn_lexer)
+    async def aiter_packages(
+        cls, path, executor: Optional[Executor] = None
+    ) -> AsyncIterator[Package]:
+        """
+        Yield the packages of a yarn.lock file as it is parsed, see afrom_file.
+
+        Packages are yielded in file order, one per top-level entry.
+        """
+        async for event in aiter_entries(path, executor):
+            if isinstance(event, Entry):
+                yield Package.from_dict(event.key, event.value)
+
+    @classmethod
+    def _from_parsed(cls, parsed_data):
         version = "unknown"
         for comment in parsed_data["comments"]:
             if comment == V1_VERSION_COMMENT:
                 version = "1"
         return cls(version, parsed_data["data"])
 
+    @classmethod
+    def load_snapshot(cls, path) -> "Lockfile":
+        """
+        Load a lockfile saved by dump_snapshot, much faster than parsing it again.
+
+        To read only some entries, open the file as a pyarn.snapshot.Snapshot instead: it is
+        memory-mapped and decodes entries on access.
+        """
+        version, data = snapshot.load(path)
+        return cls(version, data)
+
+    def dump_snapshot(self, path) -> None:
+        """Save the lockfile in the binary snapshot format of pyarn.snapshot."""
+        snapshot.dump(path, self.version, self.data)
+
     def to_file(self, path):
         with open(path, "w") as lockfile:
             self._dump(lockfile)
 
     def to_str(self):
-        buffer = io.StringIO()
-        self._dump(buffer)
-        return buffer.getvalue()
+        return "".join(self._serialize())
+
+    def save_incremental(self, path):
+        """
+        Write the lockfile, re-serializing only the entries changed since it was parsed.
+
+        Requires a lockfile parsed with keep_source=True (otherwise, this is the same as
+        to_file). Comments, unchanged entries and the blank lines between them are copied
+        as they were in the parsed file, changed entries are re-serialized where they were,
+        removed entries are dropped and new entries are appended at the end of the file.
+        """
+        if self._source is None:
+            self.to_file(path)
+            return
+
+        self._source.update(self.data, _serialize_entry)
+        with open(path, "w") as lockfile:
+            lockfile.write(self._source.text)
 
     def _dump(self, outfile):
+        outfile.writelines(self._serialize())
+
+    def _serialize(self) -> List[str]:
+        """Return the parts of the lockfile content, meant to be joined or written at once."""
         # Does not preserve any comments, but this one is required
-        outfile.write(V1_VERSION_COMMENT)
-        outfile.write("\n")
+        parts = [V1_VERSION_COMMENT, "\n"]
         for key, val in self.data.items():
             # Separate top-level keyvals by newline
-            outfile.write("\n")
-            _dump_keyval(key, val, outfile, 0)
+            parts.append("\n")
+            _serialize_keyval(key, val, parts.append, "")
+        return parts
+
 
+def _serialize_entry(key, value):
+    parts: List[str] = []
+    _serialize_keyval(key, value, parts.append, "")
+    return "".join(parts)
 
-def _dump_keyval(key, value, outfile, indent_level):
-    outfile.write(" " * indent_level * 2)
-    outfile.write(_quote_key_if_needed(key))
 
+def _serialize_keyval(key, value, append, indent):
     if isinstance(value, dict):
-        outfile.write(":\n")
+        append(f"{indent}{_quoted_key(key)}:\n")
+        indent += "  "
         for k, v in value.items():
-            _dump_keyval(k, v, outfile, indent_level + 1)
-        # No newline here, _dump_keyval has already added one (recursion always ends
+            _serialize_keyval(k, v, append, indent)
+        # No newline here, _serialize_keyval has already added one (recursion always ends
         # with a string, integer or boolean - the grammar does not allow empty dicts)
+    elif isinstance(value, str):
+        # Always quote string values
+        # TODO: use json.dumps to quote the value instead
+        #   (the lexer would also have to interpret strings using json.load)
+        append(f'{indent}{_quoted_key(key)} "{value}"\n')
+    elif value is True or value is False:
+        append(f"{indent}{_quoted_key(key)} {'true' if value else 'false'}\n")
+    elif type(value) is int:
+        append(f"{indent}{_quoted_key(key)} {value}\n")
     else:
-        outfile.write(" ")
-        if isinstance(value, str):
-            # Always quote string values
-            # TODO: use json.dump to quote the value instead
-            #   (the lexer would also have to interpret strings using json.load)
-            outfile.write(f'"{value}"')
-        else:
-            json.dump(value, outfile)
-        outfile.write("\n")
+        append(f"{indent}{_quoted_key(key)} {json.dumps(value)}\n")
 
 
 def _quote_key_if_needed(key):
@@ -224,8 +723,18 @@ def _quote_key_if_needed(key):
     return ", ".join(f'"{k}"' if _needs_quoting(k) else k for k in keys)
 
 
+# Most keys (field names, dependency names) repeat many times in a lockfile
+@lru_cache(maxsize=65536)
+def _quoted_key(key):
+    """Same as _quote_key_if_needed, cached and with a shortcut for single keys."""
+    if "," in key:
+        return _quote_key_if_needed(key)
+    key = key.strip()
+    return f'"{key}"' if _needs_quoting(key) else key
+
+
 def _needs_quoting(s):
-    if s.startswith("true") or s.startswith("false"):
+    if s.startswith(("true", "false")):
         # If a string starts with a boolean, it must be quoted no matter what
         #   (otherwise, the string would be tokenized as BOOLEAN STRING)
         return True
@@ -0,0 +1,110 @@
+"""
+Copyright (C) 2020  Red Hat, Inc
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import marshal
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from pyarn import direct
+from pyarn.scanner import tokenize
+
+# Files are not split into chunks smaller than this (in characters), the time spent starting
+# worker processes and passing results around would exceed the time saved
+MIN_CHUNK_SIZE = 1024 * 1024
+
+# A line starting at column 0 after a blank line almost always starts a new top-level block
+# (the value of a top-level pair may also follow its key after blank lines)
+_BLOCK_START = re.compile(r"\n\r?\n(?=\S)")
+_NON_SPACE = re.compile(r"\S")
+
+
+def split_points(lockfile_str: str, chunks: int) -> List[int]:
+    """
+    Return the offsets where to split the content of a yarn.lock file into about equal chunks.
+
+    The first offset is always 0. The other ones are at the start of a line at column 0 after
+    a blank line, which is the start of a top-level block unless a value follows its key
+    after blank lines (see parse). There are fewer offsets than chunks if the content has too
+    few blocks.
+    """
+    points = [0]
+    first = _NON_SPACE.search(lockfile_str)
+    if first is None:
+        return points
+    # Leading blank lines stay in the first chunk
+    pos = first.start()
+    for i in range(1, chunks):
+        match = _BLOCK_START.search(lockfile_str, max(len(lockfile_str) * i // chunks, pos))
+        if match is None:
+            break
+        pos = match.end()
+        points.append(pos)
+    return points
+
+
+def _parse_chunk(chunk: str, lineno: int) -> bytes:
+    """Parse a chunk in a worker process, return the parsed data in marshal format."""
+    return marshal.dumps(direct.parse_tokens(tokenize(chunk, lineno=lineno)))
+
+
+def parse(
+    lockfile_str: str, jobs: Optional[int] = None, min_chunk_size: int = MIN_CHUNK_SIZE
+) -> Dict[str, Any]:
+    """
+    Parse the content of a yarn.lock file in up to jobs worker processes.
+
+    The content is split into chunks of whole top-level blocks, parsed by pyarn.direct in
+    parallel and merged in file order. If any chunk cannot be parsed, because the content is
+    invalid or a chunk does not start with a block, the whole content is parsed again in this
+    process: the result, or the parse error, is always the same as for pyarn.direct.parse.
+    A chunk that parses ends with a complete top-level item, so the next chunk starts where a
+    serial parse would start a new item.
+
+    The number of jobs defaults to the number of CPUs. Content too small to be split into
+    chunks of min_chunk_size is parsed in this process.
+    """
+    jobs = jobs or os.cpu_count() or 1
+    points = split_points(lockfile_str, min(jobs, len(lockfile_str) // min_chunk_size))
+    if len(points) == 1:
+        return direct.parse(lockfile_str)
+
+    comments: List[str] = []
+    data: Dict[str, Any] = {}
+    with ProcessPoolExecutor(max_workers=len(points)) as executor:
+        futures = []
+        lineno = 1
+        for start, end in zip(points, points[1:] + [len(lockfile_str)]):
+            chunk = lockfile_str[start:end]
+            futures.append(executor.submit(_parse_chunk, chunk, lineno))
+            lineno += chunk.count("\n")
+        for future in futures:
+            try:
+                parsed = marshal.loads(future.result())  # nosec
+            except Exception:
+                # Either the content is invalid, or a split point is not the start of a block
+                for pending in futures:
+                    pending.cancel()
+                break
+            comments.extend(parsed["comments"])
+            # Same as parsing all the blocks in a row: a key defined again keeps its position
+            # and takes the last value
+            data.update(parsed["data"])
+        else:
+            return {"comments": comments, "data": data}
+    # Parse the content serially, for the same result or error as pyarn.direct.parse
+    return direct.parse(lockfile_str)
@@ -83,23 +83,25 @@ def p_list(p):
 
 
 def p_members(p):
-    """members : pair"""
+    """members : member"""
     p[0] = p[1]
 
 
-def p_members_multiple_pairs(p):
-    """members : pair members"""
-    p[0] = {**p[1], **p[2]}
+def p_members_multiple(p):
+    """members : members member"""
+    # Left recursion: every member is added to one dict, in file order
+    p[1].update(p[2])
+    p[0] = p[1]
 
 
-def p_members_nested_title(p):
-    """members : title members DEDENT"""
-    p[0] = {p[1]: p[2]}
+def p_member_pair(p):
+    """member : pair"""
+    p[0] = p[1]
 
 
-def p_members_nested_title_memb(p):
-    """members : title members DEDENT members"""
-    p[0] = {**p[4], p[1]: p[2]}
+def p_member_nested_title(p):
+    """member : title members DEDENT"""
+    p[0] = {p[1]: p[2]}
 
 
 def p_pair(p):
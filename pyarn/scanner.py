@@ -0,0 +1,220 @@
+"""
+Copyright (C) 2020  Red Hat, Inc
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import re
+import sys
+from itertools import starmap
+from typing import Any, Callable, Iterable, Iterator, NamedTuple, Optional, Tuple
+
+# Same rules as pyarn.lexer, in the same order (the first matching alternative wins).
+# Newlines never appear here, the scanner splits the input into lines first.
+TOKEN_RE = re.compile(
+    r"(?P<NUMBER>[0-9]+)"
+    r"|(?P<BOOLEAN>true|false)"
+    r'|"(?P<QUOTED>[^"\n]*)"'
+    r"|(?P<STRING>[a-zA-Z/.-][^\s\n,:]*)"
+    r"|(?P<SPACES>[ ]+)"
+    r"|(?P<COMMENT>[#]+.*)"
+    r"|(?P<COMMA>,)"
+    r"|(?P<COLON>:)"
+)
+INDENT_RE = re.compile(r"(?:[ ][ ])*")
+
+RawToken = Tuple[str, Any, int]
+
+
+class Token(NamedTuple):
+    """A token as produced by the PLY lexer (type, value and line number)."""
+
+    type: str
+    value: Any
+    lineno: int
+    # PLY attaches the lexer to the token passed to p_error unless it already has one,
+    # which would fail on a tuple
+    lexer: Any = None
+
+
+def _split_text(text: str) -> Iterator[Tuple[str, bool]]:
+    lines = text.split("\n")
+    last = len(lines) - 1
+    for i, line in enumerate(lines):
+        yield line, i != last
+
+
+def _split_lines(lines: Iterable[str]) -> Iterator[Tuple[str, bool]]:
+    for line in lines:
+        if not line.endswith("\n"):
+            # Only the last line may not end with a newline
+            yield line, False
+            return
+        yield line[:-1], True
+    yield "", False
+
+
+def _scan(
+    lines: Iterable[Tuple[str, bool]],
+    split_dedents: bool,
+    lineno: int,
+    text: Optional[str] = None,
+    skip_block: Optional[Callable[[str], bool]] = None,
+) -> Iterator[RawToken]:
+    """
+    Tokenize (line, followed_by_newline) pairs, see tokenize().
+
+    If the full text is known, invalid token errors report the rest of the input like the
+    PLY lexer does, otherwise only the rest of the line.
+    """
+    match = TOKEN_RE.match
+    match_indent = INDENT_RE.match
+    intern = sys.intern
+    indent_lvl = 0
+    offset = 0
+    first = True
+    skipping = False
+
+    for line, has_newline in lines:
+        if skipping:
+            if line.startswith(" "):
+                # Body of a skipped block
+                lineno += 1
+                offset += len(line) + 1
+                continue
+            skipping = False
+
+        pos = 0
+        if first:
+            first = False
+        else:
+            # The newline before this line (t_INDENT in pyarn.lexer)
+            pos = match_indent(line).end()  # type: ignore[union-attr]  # always matches
+            indents = pos // 2
+            if indents > indent_lvl:
+                if indents != indent_lvl + 1:
+                    # no one line multiple indentation allowed
+                    raise SyntaxError
+                indent_lvl = indents
+                yield ("INDENT", indents, lineno)
+            elif indents < indent_lvl:
+                if split_dedents:
+                    for _ in range(indent_lvl - indents):
+                        yield ("DEDENT", 1, lineno)
+                else:
+                    yield ("DEDENT", indent_lvl - indents, lineno)
+                indent_lvl = indents
+            lineno += 1
+
+        if not pos and line and skip_block is not None and skip_block(line):
+            skipping = True
+            offset += len(line) + 1
+            continue
+
+        end = len(line)
+        while pos < end:
+            m = match(line, pos)
+            if m is None:
+                if line[pos] == "\r" and pos == end - 1 and has_newline:
+                    # The \r of a \r\n newline
+                    break
+                rest = text[offset + pos :] if text is not None else line[pos:]
+                raise ValueError(f"{lineno}: Invalid token {rest}")
+
+            kind = m.lastgroup
+            if kind == "STRING":
+                yield ("STRING", intern(m.group()), lineno)
+            elif kind == "QUOTED":
+                yield ("STRING", intern(m.group(kind)), lineno)
+            elif kind == "SPACES":
+                pass
+            elif kind == "COLON":
+                yield ("COLON", ":", lineno)
+            elif kind == "NUMBER":
+                yield ("NUMBER", int(m.group()), lineno)
+            elif kind == "BOOLEAN":
+                yield ("BOOLEAN", m.group() == "true", lineno)
+            elif kind == "COMMA":
+                yield ("COMMA", ",", lineno)
+            else:
+                yield ("COMMENT", m.group(), lineno)
+            pos = m.end()
+
+        offset += end + 1
+
+    # The input ended while indented, close all open blocks (t_eof in pyarn.lexer)
+    if indent_lvl:
+        if split_dedents:
+            for _ in range(indent_lvl):
+                yield ("DEDENT", 1, lineno)
+        else:
+            yield ("DEDENT", indent_lvl, lineno)
+
+
+def tokenize(
+    text: str,
+    split_dedents: bool = True,
+    lineno: int = 1,
+    skip_block: Optional[Callable[[str], bool]] = None,
+) -> Iterator[RawToken]:
+    """
+    Tokenize the content of a yarn.lock file into (type, value, lineno) tuples.
+
+    The tokens are exactly those of the PLY lexer in pyarn.lexer, strings included (both
+    intern them). If split_dedents is true, a DEDENT closing several levels is split into
+    single-level DEDENTs, like pyarn.lexer_wrapper.Wrapper does.
+
+    skip_block is called with every line that starts at column 0 (without its newline). If
+    it returns true, that line and the indented lines following it are skipped without being
+    tokenized, e.g. to leave out a whole top-level entry.
+    """
+    return _scan(_split_text(text), split_dedents, lineno, text, skip_block)
+
+
+def tokenize_lines(
+    lines: Iterable[str],
+    split_dedents: bool = True,
+    lineno: int = 1,
+    skip_block: Optional[Callable[[str], bool]] = None,
+) -> Iterator[RawToken]:
+    """
+    Tokenize a yarn.lock file read line by line (e.g. from a text file object), see tokenize().
+
+    Lines are consumed lazily, only as far as needed for the tokens requested so far.
+    """
+    return _scan(_split_lines(lines), split_dedents, lineno, skip_block=skip_block)
+
+
+class Scanner:
+    """
+    Hand-written alternative to the PLY lexer, usable as the lexer of the PLY parser.
+
+    By default, this is equivalent to Wrapper(lex.lex(module=pyarn.lexer)).
+    """
+
+    def __init__(self, split_dedents: bool = True) -> None:
+        self.split_dedents = split_dedents
+        self._tokens: Iterator[Token] = iter(())
+
+    def input(self, data: str) -> None:
+        self._tokens = starmap(Token, tokenize(data, self.split_dedents))
+
+    def input_lines(self, lines: Iterable[str]) -> None:
+        """Tokenize a file read line by line, see tokenize_lines()."""
+        self._tokens = starmap(Token, tokenize_lines(lines, self.split_dedents))
+
+    def token(self) -> Optional[Token]:
+        return next(self._tokens, None)
+
+    def __iter__(self) -> Iterator[Token]:
+        return self._tokens
@@ -0,0 +1,365 @@
+"""
+Copyright (C) 2020  Red Hat, Inc
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_right
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Tuple, Union
+
+# Binary snapshots of parsed lockfiles. A snapshot starts with a header (HEADER), followed
+# by these sections, each padded to a multiple of 8 bytes. All numbers are little-endian.
+#
+# - string offsets, (strings + 1) uint32: string i is the UTF-8 text at
+#   text[offsets[i]:offsets[i + 1]]
+# - text, the UTF-8 encoded strings
+# - ints, int64: the integer values
+# - tokens, uint32: the values of all the entries, see below
+# - entry keys, uint32: the string id of the key of every top-level entry
+# - entry offsets, (entries + 1) uint32: the value of entry i starts at
+#   tokens[entry_offsets[i]]
+#
+# Every value is one token, its type in the lowest TAG_BITS bits and its argument in the
+# others: a string id, an index in ints, or for dicts the number of items. A dict token is
+# followed by the key string id and the value of each of its items.
+
+MAGIC = b"PYARNSNP"
+# Bumped on any incompatible change of the layout
+FORMAT_VERSION = 1
+
+# magic, format version, flags, lockfile version string id, strings, text size (bytes),
+# ints, tokens, entries
+HEADER = struct.Struct("<8sIIIIQIII")
+# The text is ASCII: string offsets are also character offsets
+FLAG_ASCII = 1
+
+TAG_BITS = 3
+TAG_MASK = (1 << TAG_BITS) - 1
+STR, INT, TRUE, FALSE, NONE, DICT = range(6)
+
+_BIG_ENDIAN = sys.byteorder == "big"
+
+# Number of lookups in a Snapshot before it builds an index of its keys
+SEARCHES = 16
+
+
+def _padding(size: int) -> bytes:
+    return bytes(-size % 8)
+
+
+class _Encoder:
+    def __init__(self) -> None:
+        self.strings: Dict[str, int] = {}
+        self.ints = array("q")
+        self.tokens = array("I")
+
+    def string(self, s: str) -> int:
+        strings = self.strings
+        string_id = strings.get(s)
+        if string_id is None:
+            string_id = strings[s] = len(strings)
+        return string_id
+
+    def value(self, value: Any) -> None:
+        append = self.tokens.append
+        if isinstance(value, str):
+            append(self.string(value) << TAG_BITS | STR)
+        elif value is True:
+            append(TRUE)
+        elif value is False:
+            append(FALSE)
+        elif value is None:
+            append(NONE)
+        elif isinstance(value, int):
+            append(len(self.ints) << TAG_BITS | INT)
+            self.ints.append(value)
+        elif isinstance(value, dict):
+            append(len(value) << TAG_BITS | DICT)
+            for key, item in value.items():
+                append(self.string(key))
+                self.value(item)
+        else:
+            raise TypeError(f"Cannot store a value of type {type(value).__name__} in a snapshot")
+
+
+def dump(path: Union[str, os.PathLike], version: str, data: Dict[str, Any]) -> None:
+    """Write a snapshot of the version and data of a lockfile."""
+    encoder = _Encoder()
+    version_id = encoder.string(version)
+    keys = array("I")
+    entry_offsets = array("I", [0])
+    for key, value in data.items():
+        keys.append(encoder.string(key))
+        encoder.value(value)
+        entry_offsets.append(len(encoder.tokens))
+
+    encoded = [s.encode() for s in encoder.strings]
+    text = b"".join(encoded)
+    string_offsets = array("I", [0])
+    offset = 0
+    for s in encoded:
+        offset += len(s)
+        string_offsets.append(offset)
+
+    flags = FLAG_ASCII if text.isascii() else 0
+    sections: List[Union[array, bytes]] = [
+        string_offsets,
+        text,
+        encoder.ints,
+        encoder.tokens,
+        keys,
+        entry_offsets,
+    ]
+    with open(path, "wb") as f:
+        f.write(
+            HEADER.pack(
+                MAGIC,
+                FORMAT_VERSION,
+                flags,
+                version_id,
+                len(encoded),
+                len(text),
+                len(encoder.ints),
+                len(encoder.tokens),
+                len(keys),
+            )
+        )
+        for section in sections:
+            if isinstance(section, array) and _BIG_ENDIAN:
+                section = array(section.typecode, section)
+                section.byteswap()
+            f.write(section)
+            f.write(
+                _padding(len(section) * (section.itemsize if isinstance(section, array) else 1))
+            )
+
+
+class _Layout:
+    """Positions of the sections of a snapshot in a buffer."""
+
+    def __init__(self, buffer: Any, name: Union[str, os.PathLike]) -> None:
+        if len(buffer) < HEADER.size or bytes(buffer[:8]) != MAGIC:
+            raise ValueError(f"Not a pyarn snapshot: {name}")
+        header = HEADER.unpack_from(buffer)
+        if header[1] != FORMAT_VERSION:
+            raise ValueError(f"Unsupported snapshot format version {header[1]}: {name}")
+        _, _, flags, self.version_id, strings, text_size, ints, tokens, entries = header
+        self.ascii = bool(flags & FLAG_ASCII)
+
+        pos = HEADER.size
+        self.sections = []
+        for size in (
+            4 * (strings + 1),
+            text_size,
+            8 * ints,
+            4 * tokens,
+            4 * entries,
+            4 * (entries + 1),
+        ):
+            self.sections.append((pos, pos + size))
+            pos += size + -size % 8
+        if pos > len(buffer):
+            raise ValueError(f"Truncated pyarn snapshot: {name}")
+
+    def array(self, buffer: Any, section: int, typecode: str) -> Any:
+        """Return a section as an array, or as a memoryview if it can be used in place."""
+        start, end = self.sections[section]
+        if not _BIG_ENDIAN:
+            return memoryview(buffer)[start:end].cast(typecode)  # type: ignore[call-overload]
+        values = array(typecode, bytes(buffer[start:end]))
+        values.byteswap()
+        return values
+
+    def text(self, buffer: Any) -> Any:
+        start, end = self.sections[1]
+        return memoryview(buffer)[start:end]
+
+
+def _decoder(tokens: Any, strings: Any, ints: Any) -> Any:
+    """Return a function decoding the value starting at tokens[pos], as (value, next pos)."""
+
+    def decode(pos: int) -> Tuple[Any, int]:
+        token = tokens[pos]
+        tag = token & TAG_MASK
+        pos += 1
+        if tag == STR:
+            return strings[token >> TAG_BITS], pos
+        if tag == DICT:
+            result = {}
+            for _ in range(token >> TAG_BITS):
+                key = strings[tokens[pos]]
+                token = tokens[pos + 1]
+                if token & TAG_MASK == STR:
+                    # Most values are strings, skip the recursive call for them
+                    result[key] = strings[token >> TAG_BITS]
+                    pos += 2
+                else:
+                    result[key], pos = decode(pos + 1)
+            return result, pos
+        if tag == INT:
+            return ints[token >> TAG_BITS], pos
+        if tag == TRUE:
+            return True, pos
+        if tag == FALSE:
+            return False, pos
+        return None, pos
+
+    return decode
+
+
+def _all_strings(layout: _Layout, buffer: Any) -> List[str]:
+    offsets = layout.array(buffer, 0, "I").tolist()
+    text = layout.text(buffer)
+    if layout.ascii:
+        # Decode the text at once and slice it, one allocation per string
+        decoded = str(text, "ascii")
+        return [decoded[start:end] for start, end in zip(offsets, offsets[1:])]
+    return [str(text[start:end], "utf-8") for start, end in zip(offsets, offsets[1:])]
+
+
+def load(path: Union[str, os.PathLike]) -> Tuple[str, Dict[str, Any]]:
+    """Read a whole snapshot, return the version and data of the lockfile."""
+    with open(path, "rb") as f:
+        buffer = f.read()
+    layout = _Layout(buffer, path)
+    strings = _all_strings(layout, buffer)
+    # Copies of the sections, so that no view on the buffer outlives this function
+    tokens = layout.array(buffer, 3, "I").tolist()
+    decode = _decoder(tokens, strings, layout.array(buffer, 2, "q").tolist())
+    keys = layout.array(buffer, 4, "I").tolist()
+    offsets = layout.array(buffer, 5, "I").tolist()
+
+    data = {}
+    for i, key in enumerate(keys):
+        data[strings[key]] = decode(offsets[i])[0]
+    return strings[layout.version_id], data
+
+
+class Snapshot(Mapping[str, Any]):
+    """
+    A memory-mapped snapshot, as a read-only mapping of the lockfile data.
+
+    Entries are decoded on access, along with the strings they use, the rest of the file is
+    never read. Use it as a context manager, or close() it, to unmap the file.
+    """
+
+    def __init__(self, path: Union[str, os.PathLike]) -> None:
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            layout = _Layout(self._mmap, path)
+        except ValueError:
+            self._mmap.close()
+            raise
+        self._layout = layout
+        # Views on the mapped file, released by close()
+        self._views = [layout.array(self._mmap, i, "I") for i in (0, 3, 4, 5)]
+        self._views += [layout.text(self._mmap), layout.array(self._mmap, 2, "q")]
+        self._offsets, self._tokens, self._keys, self._entry_offsets, self._text, ints = self._views
+        self._strings = _LazyStrings(self)
+        self._decode = _decoder(self._tokens, self._strings, ints)
+        # Entries are looked up by searching the text, until there have been SEARCHES lookups:
+        # then all the keys are decoded into an index
+        self._searches = 0
+        self._key_ids: Optional[List[int]] = None
+        self._index: Optional[Dict[str, int]] = None
+        self.version = self._strings[layout.version_id]
+
+    def _string(self, string_id: int) -> str:
+        start, end = self._offsets[string_id], self._offsets[string_id + 1]
+        return str(self._text[start:end], "ascii" if self._layout.ascii else "utf-8")
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __iter__(self) -> Iterator[str]:
+        strings = self._strings
+        for key in self._keys:
+            yield strings[key]
+
+    def _string_id(self, s: str) -> Optional[int]:
+        """Find a string in the mapped text, without decoding any other string."""
+        encoded = s.encode()
+        start, end = self._layout.sections[1]
+        offsets = self._offsets
+        pos = self._mmap.find(encoded, start, end)
+        while pos >= 0:
+            offset = pos - start
+            # The last string starting at offset is the only one there that may not be empty
+            string_id = bisect_right(offsets, offset) - 1
+            if offsets[string_id] == offset and offsets[string_id + 1] == offset + len(encoded):
+                return string_id
+            pos = self._mmap.find(encoded, pos + 1, end)
+        return None
+
+    def _entry(self, key: object) -> Optional[int]:
+        if self._index is None and isinstance(key, str) and key and self._searches < SEARCHES:
+            self._searches += 1
+            string_id = self._string_id(key)
+            if string_id is None:
+                return None
+            if self._key_ids is None:
+                self._key_ids = self._keys.tolist()
+            try:
+                return self._key_ids.index(string_id)
+            except ValueError:
+                return None
+        if self._index is None:
+            self._index = {key: i for i, key in enumerate(self)}
+        return self._index.get(key)  # type: ignore[call-overload]
+
+    def __contains__(self, key: object) -> bool:
+        return self._entry(key) is not None
+
+    def __getitem__(self, key: str) -> Any:
+        i = self._entry(key)
+        if i is None:
+            raise KeyError(key)
+        return self._decode(self._entry_offsets[i])[0]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Decode all the entries."""
+        decode = self._decode
+        return {key: decode(offset)[0] for key, offset in zip(self, self._entry_offsets)}
+
+    def close(self) -> None:
+        # Views must be released before the file can be unmapped
+        for view in self._views:
+            if isinstance(view, memoryview):
+                view.release()
+        self._mmap.close()
+
+    def __enter__(self) -> "Snapshot":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+class _LazyStrings:
+    """The strings of a Snapshot, each decoded on first use."""
+
+    def __init__(self, snapshot: Snapshot) -> None:
+        self._string = snapshot._string
+        self._cache: Dict[int, str] = {}
+
+    def __getitem__(self, string_id: int) -> str:
+        s = self._cache.get(string_id)
+        if s is None:
+            s = self._cache[string_id] = self._string(string_id)
+        return s
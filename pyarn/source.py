@@ -0,0 +1,169 @@
+"""
+Copyright (C) 2020  Red Hat, Inc
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import marshal
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from pyarn import direct
+from pyarn.scanner import tokenize
+
+
+class Block(NamedTuple):
+    """A top-level block of a yarn.lock file: text[start:end], key is None for comments."""
+
+    key: Optional[str]
+    start: int
+    end: int
+
+
+def _block_spans(text: str, blocks: Iterable[Tuple[Optional[str], int, int]]) -> Iterator[Block]:
+    """Convert (key, first line, last line) blocks, in file order, to character spans."""
+    find = text.find
+    line = 1
+    pos = 0
+    for key, first_line, last_line in blocks:
+        while line < first_line:
+            pos = find("\n", pos) + 1
+            line += 1
+        start = pos
+        while line <= last_line:
+            # Spans include the newline ending the last line
+            pos = find("\n", pos) + 1 or len(text)
+            line += 1
+        yield Block(key, start, pos)
+
+
+def _dump(value: Any) -> bytes:
+    """
+    Return a snapshot of a parsed value, equal only for the same values of the same types.
+
+    == is not enough to detect changes, True == 1 == 1.0 in Python. marshal keeps the types,
+    and version 2 does not depend on reference counts. A value that differs only by string
+    interning or dict order is considered changed, it is then written again.
+    """
+    return marshal.dumps(value, 2)
+
+
+class Source:
+    """
+    Text of a yarn.lock file, with the span of every top-level block and their parsed values.
+
+    update() uses them to write new content for the file that keeps all the unchanged blocks,
+    comments and blank lines as they are.
+    """
+
+    def __init__(self, text: str, blocks: List[Block], data: Dict[str, Any]) -> None:
+        self.text = text
+        self.blocks = blocks
+        self._keys = set(data)
+        # Snapshots of the values, to detect changes made in place
+        self._original = {key: _dump(value) for key, value in data.items()}
+
+    @classmethod
+    def parse(cls, text: str) -> Tuple[Dict[str, Any], "Source"]:
+        """Parse the content of a yarn.lock file, see pyarn.direct.parse."""
+        comments: List[str] = []
+        data: Dict[str, Any] = {}
+        duplicates = set()
+        lines = []
+        for key, value, first_line, last_line in direct.iter_blocks(tokenize(text)):
+            if key is None:
+                comments.append(value)
+            else:
+                if key in data:
+                    duplicates.add(key)
+                data[key] = value
+            lines.append((key, first_line, last_line))
+
+        source = cls(text, list(_block_spans(text, lines)), data)
+        # The text of the first block of a key defined more than once does not match its value,
+        # leave them out of the original values so that update() considers them changed
+        for key in duplicates:
+            del source._original[key]
+        return {"comments": comments, "data": data}, source
+
+    def update(self, data: Dict[str, Any], serialize: Callable[[str, Any], str]) -> None:
+        """
+        Update the source to match the given data.
+
+        Unchanged entries and all comments keep their text. Changed entries are re-serialized
+        in place, removed entries are dropped along with the blank lines before them, and new
+        entries are appended at the end. Unchanged text is copied in as few slices as possible.
+        """
+        text = self.text
+        original = self._original
+        parts = []
+        blocks = []
+        # text[:copied] is already in parts, shifted by shift characters
+        copied = 0
+        shift = 0
+        previous_end = 0
+        done = set()
+
+        for block in self.blocks:
+            key, start, end = block
+            if key is None or (
+                key not in done
+                and key in original
+                and key in data
+                and _dump(data[key]) == original[key]
+            ):
+                if shift:
+                    block = Block(key, start + shift, end + shift)
+                blocks.append(block)
+            elif key in done or key not in data:
+                # Drop the block and the blank lines before it
+                parts.append(text[copied:previous_end])
+                shift -= end - previous_end
+                copied = end
+                original.pop(key, None)
+            else:
+                done.add(key)
+                value = data[key]
+                serialized = serialize(key, value)
+                parts.append(text[copied:start])
+                parts.append(serialized)
+                blocks.append(Block(key, start + shift, start + shift + len(serialized)))
+                shift += len(serialized) - (end - start)
+                copied = end
+                original[key] = _dump(value)
+            previous_end = end
+
+        parts.append(text[copied:])
+        size = len(text) + shift
+        last_part = next((part for part in reversed(parts) if part), "")
+
+        for key, value in data.items():
+            if key in self._keys:
+                continue
+            if size and not last_part.endswith("\n"):
+                # The last line had no newline, it now belongs to the last block
+                if blocks and blocks[-1].end == size:
+                    blocks[-1] = blocks[-1]._replace(end=size + 1)
+                parts.append("\n")
+                size += 1
+            # Separate top-level blocks by a blank line
+            serialized = serialize(key, value)
+            parts.append("\n")
+            blocks.append(Block(key, size + 1, size + 1 + len(serialized)))
+            parts.append(serialized)
+            size += 1 + len(serialized)
+            last_part = serialized
+            original[key] = _dump(value)
+
+        self.text = "".join(parts)
+        self.blocks = blocks
+        self._keys = set(data)
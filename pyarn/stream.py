@@ -0,0 +1,165 @@
+"""
+Copyright (C) 2020  Red Hat, Inc
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+import codecs
+import io
+import locale
+import mmap
+import os
+from concurrent.futures import Executor
+from contextlib import contextmanager
+from itertools import islice
+from typing import (
+    Any,
+    AsyncIterator,
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    TextIO,
+    Union,
+)
+
+from pyarn import direct
+from pyarn.scanner import tokenize_lines
+
+
+class Entry(NamedTuple):
+    """A top-level entry of a yarn.lock file."""
+
+    key: str
+    value: Any
+
+
+class Comment(NamedTuple):
+    """A top-level comment of a yarn.lock file."""
+
+    text: str
+
+
+def _iter_events(lines: Iterable[str]) -> Iterator[Union[Entry, Comment]]:
+    for key, value, _, _ in direct.iter_blocks(tokenize_lines(lines)):
+        if key is None:
+            yield Comment(value)
+        else:
+            yield Entry(key, value)
+
+
+def iter_entries(
+    source: Union[str, os.PathLike, TextIO]
+) -> Generator[Union[Entry, Comment], None, None]:
+    """
+    Parse a yarn.lock file incrementally, yielding its top-level entries and comments.
+
+    The source is a path or a text file object. The file is read in chunks and every entry
+    is yielded as soon as it is complete, so memory usage depends on the size of the largest
+    entry rather than on the size of the file.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source) as lockfile:
+            yield from _iter_events(lockfile)
+    else:
+        yield from _iter_events(source)
+
+
+# Number of top-level blocks parsed at once by aiter_entries
+ASYNC_BATCH_SIZE = 256
+
+
+def _next_batch(events: Iterator[Union[Entry, Comment]], size: int) -> List[Union[Entry, Comment]]:
+    return list(islice(events, size))
+
+
+async def aiter_entries(
+    path: Union[str, os.PathLike],
+    executor: Optional[Executor] = None,
+    batch_size: int = ASYNC_BATCH_SIZE,
+) -> AsyncIterator[Union[Entry, Comment]]:
+    """
+    Asynchronous version of iter_entries(), for use in asyncio event loops.
+
+    The file is read and parsed in the executor (the loop's default executor if None),
+    batch_size top-level blocks at a time, so the event loop is never blocked for more than
+    one batch and concurrent tasks parsing other files take turns.
+    """
+    loop = asyncio.get_running_loop()
+    events = iter_entries(path)
+    pending: "Optional[asyncio.Future[List[Union[Entry, Comment]]]]" = None
+    try:
+        while True:
+            pending = loop.run_in_executor(executor, _next_batch, events, batch_size)
+            # If this task is cancelled, the batch still runs to completion in the executor
+            batch = await asyncio.shield(pending)
+            for event in batch:
+                yield event
+            if len(batch) < batch_size:
+                break
+    finally:
+        if pending is not None and not pending.done():
+            # The generator cannot be closed while it runs, close the file once it stops
+            pending.add_done_callback(lambda _: events.close())
+        else:
+            events.close()
+
+
+# Size of the parts of a buffer decoded at once by iter_buffer_lines
+CHUNK_SIZE = 64 * 1024
+
+
+def iter_buffer_lines(buffer: Any, encoding: Optional[str] = None) -> Iterator[str]:
+    """
+    Decode a bytes-like buffer (e.g. a mmap object) line by line.
+
+    The lines are the same as those of a text file opened with open() and the same encoding
+    (the locale encoding by default): newlines are translated to "\n" and kept at the end of
+    the lines. The buffer is decoded in small chunks, never all at once.
+    """
+    decoder = io.IncrementalNewlineDecoder(
+        codecs.getincrementaldecoder(encoding or locale.getpreferredencoding(False))(),
+        translate=True,
+    )
+    pos = 0
+    size = len(buffer)
+    pending = ""
+    while pos < size:
+        # Decode whole lines, about CHUNK_SIZE bytes at a time
+        end = buffer.rfind(b"\n", pos, pos + CHUNK_SIZE) + 1 or buffer.find(b"\n", pos) + 1
+        if not end or end == size:
+            end = size
+        text = pending + decoder.decode(buffer[pos:end], final=end == size)
+        pos = end
+        lines = text.split("\n")
+        # Not a whole line yet, unless at the end of the buffer
+        pending = lines.pop()
+        for line in lines:
+            yield line + "\n"
+    if pending:
+        yield pending
+
+
+@contextmanager
+def mapped_lines(path: Union[str, os.PathLike]) -> Iterator[Iterator[str]]:
+    """Memory-map a file and return an iterator over its lines, see iter_buffer_lines()."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            # Empty files cannot be mapped
+            yield iter(())
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            yield iter_buffer_lines(buffer)
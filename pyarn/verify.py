@@ -0,0 +1,237 @@
+"""
+Copyright (C) 2020  Red Hat, Inc
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import base64
+import binascii
+import hashlib
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Tuple, Union
+from urllib.parse import unquote, urlsplit
+
+from pyarn.lockfile import Package
+
+# Subresource Integrity algorithms, from the weakest to the strongest
+SRI_ALGORITHMS = ("sha1", "sha256", "sha384", "sha512")
+
+# Files are hashed by reading them this many bytes at a time
+READ_SIZE = 1024 * 1024
+
+# A registry tarball URL, e.g. https://registry.yarnpkg.com/@babel/core/-/core-7.0.0.tgz
+_TARBALL_URL_RE = re.compile(
+    r"/(?:(@[^/]+)(?:/|%2f))?[^/]+/(?:-|_attachments)/(?:@[^/]+/)?([^/]+)$", re.IGNORECASE
+)
+_SHA1_HEX_RE = re.compile(r"[0-9a-fA-F]{40}")
+
+# (algorithm, accepted digests)
+Expected = Tuple[str, FrozenSet[bytes]]
+
+
+def _is_file_name(name: str) -> bool:
+    """True if name is the name of a file in a directory, not a path leaving it."""
+    return name not in ("", ".", "..") and not any(c in name for c in "/\\\0")
+
+
+def mirror_filename(package: Package) -> Optional[str]:
+    """
+    Return the name of the tarball of a package in a yarn offline mirror, or None if it has none.
+
+    Like yarn, the name is the last part of the resolved URL, prefixed by the scope of the
+    package for registry URLs (e.g. @babel-core-7.0.0.tgz). Names that would not be a file
+    of the mirror directory itself (e.g. with an encoded "/", or "..") are rejected: None is
+    returned.
+    """
+    if not package.url:
+        return None
+    path = urlsplit(package.url).path
+    match = _TARBALL_URL_RE.search(path)
+    if match:
+        scope, name = match.groups()
+        name = unquote(f"{scope}-{name}" if scope else name)
+    else:
+        name = unquote(os.path.basename(path))
+    return name if _is_file_name(name) else None
+
+
+def expected_digest(package: Package) -> Optional[Expected]:
+    """
+    Return the algorithm and digests a package tarball must match, or None if it has none.
+
+    The integrity field is a Subresource Integrity string, possibly with several hashes: only
+    those of the strongest supported algorithm are used, and any of them may match. Without
+    integrity, the sha1 in the fragment of the resolved URL (e.g. lodash.tgz#<sha1>) is used.
+    """
+    if package.checksum:
+        digests: Dict[str, List[bytes]] = {}
+        for token in package.checksum.split():
+            algorithm, _, value = token.partition("-")
+            if algorithm not in SRI_ALGORITHMS:
+                continue
+            # Options follow the digest, e.g. sha512-...?foo
+            value = value.partition("?")[0]
+            try:
+                digests.setdefault(algorithm, []).append(base64.b64decode(value, validate=True))
+            except binascii.Error:
+                continue
+        if digests:
+            algorithm = max(digests, key=SRI_ALGORITHMS.index)
+            return algorithm, frozenset(digests[algorithm])
+
+    if package.url:
+        fragment = urlsplit(package.url).fragment
+        if _SHA1_HEX_RE.fullmatch(fragment):
+            return "sha1", frozenset([bytes.fromhex(fragment)])
+    return None
+
+
+def _sri(algorithm: str, digest: bytes) -> str:
+    return f"{algorithm}-{base64.b64encode(digest).decode()}"
+
+
+def hash_file(path: Union[str, os.PathLike], algorithm: str) -> Tuple[bytes, int]:
+    """Return the digest of a file and its size, reading it READ_SIZE bytes at a time."""
+    hasher = hashlib.new(algorithm)
+    size = 0
+    buffer = bytearray(READ_SIZE)
+    view = memoryview(buffer)
+    # Unbuffered reads straight into a reused buffer, hashlib releases the GIL while hashing
+    with open(path, "rb", buffering=0) as f:
+        while True:
+            n = f.readinto(buffer)
+            if not n:
+                break
+            hasher.update(view[:n])
+            size += n
+    return hasher.digest(), size
+
+
+class Mismatch(NamedTuple):
+    """A tarball whose content does not match the integrity of its package."""
+
+    package: Package
+    path: Path
+    # Subresource Integrity strings, e.g. sha512-...
+    expected: str
+    actual: str
+
+
+class VerifyReport(NamedTuple):
+    """
+    Result of verify_mirror.
+
+    verified packages match their tarball, mismatched and missing ones do not (missing holds
+    (package, expected path) pairs), unchecked ones have no tarball URL, no usable mirror file
+    name or no checksum. errors holds (package, path, error) tuples for the tarballs that
+    exist but cannot be read, e.g. directories or files without read permission.
+    """
+
+    verified: List[Package]
+    mismatched: List[Mismatch]
+    missing: List[Tuple[Package, Path]]
+    unchecked: List[Package]
+    errors: List[Tuple[Package, Path, OSError]]
+    files: int
+    total_bytes: int
+    seconds: float
+
+    @property
+    def ok(self) -> bool:
+        """True if no tarball is missing, mismatched or unreadable."""
+        return not self.mismatched and not self.missing and not self.errors
+
+    @property
+    def throughput(self) -> float:
+        """Bytes hashed per second."""
+        return self.total_bytes / self.seconds if self.seconds else 0.0
+
+    def summary(self) -> str:
+        """Return a one-line, human readable summary of the report."""
+        return (
+            f"{len(self.verified)} verified, {len(self.mismatched)} mismatched, "
+            f"{len(self.missing)} missing, {len(self.errors)} unreadable, "
+            f"{len(self.unchecked)} unchecked; "
+            f"{self.files} files, {self.total_bytes / 1024 / 1024:.1f} MiB in {self.seconds:.2f} s "
+            f"({self.throughput / 1024 / 1024:.1f} MiB/s)"
+        )
+
+
+def _hash_or_error(key: Tuple[Path, str]) -> Union[Tuple[bytes, int], OSError]:
+    """Hash a file, return the error instead if it cannot be read (not raised by the pool)."""
+    path, algorithm = key
+    try:
+        return hash_file(path, algorithm)
+    except OSError as e:
+        return e
+
+
+def verify_mirror(
+    packages: Iterable[Package],
+    directory: Union[str, os.PathLike],
+    workers: Optional[int] = None,
+    filename: Callable[[Package], Optional[str]] = mirror_filename,
+) -> VerifyReport:
+    """
+    Verify the tarballs of packages in a local mirror directory against their checksums.
+
+    Tarballs are looked up in directory by filename(package), yarn offline mirror names by
+    default, and checked against the strongest hash in the package integrity, or the sha1 in
+    the fragment of its URL (see expected_digest). Files are hashed in a pool of threads
+    (workers defaults to that of ThreadPoolExecutor), each file only once even if several
+    packages use it. Packages whose file name is not a plain name in directory (e.g.
+    "../x.tgz") are unchecked, files that cannot be read are reported as errors.
+
+    For all the packages of a lockfile, pass lockfile.iter_packages().
+    """
+    directory = Path(directory)
+    unchecked = []
+    checks = []
+    keys: Dict[Tuple[Path, str], None] = {}
+    for package in packages:
+        name = filename(package)
+        expected = expected_digest(package)
+        if name is None or not _is_file_name(name) or expected is None:
+            unchecked.append(package)
+            continue
+        key = (directory / name, expected[0])
+        checks.append((package, key, expected[1]))
+        keys[key] = None
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        hashes = dict(zip(keys, executor.map(_hash_or_error, keys)))
+    seconds = time.perf_counter() - start
+
+    report = VerifyReport([], [], [], unchecked, [], 0, 0, seconds)
+    for package, key, digests in checks:
+        result = hashes[key]
+        path, algorithm = key
+        if isinstance(result, FileNotFoundError):
+            report.missing.append((package, path))
+        elif isinstance(result, OSError):
+            report.errors.append((package, path, result))
+        elif result[0] in digests:
+            report.verified.append(package)
+        else:
+            expected_sri = " ".join(sorted(_sri(algorithm, digest) for digest in digests))
+            report.mismatched.append(
+                Mismatch(package, path, expected_sri, _sri(algorithm, result[0]))
+            )
+
+    found = [result for result in hashes.values() if not isinstance(result, OSError)]
+    return report._replace(files=len(found), total_bytes=sum(size for _, size in found))
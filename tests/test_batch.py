@@ -0,0 +1,85 @@
+"""
+Copyright (C) 2020  Red Hat, Inc
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, List
+
+import pytest
+
+from pyarn import batch, lockfile
+from pyarn.batch import parse_many
+
+
+@pytest.mark.parametrize("backend", ["ply", "direct"])
+def test_parse_many(all_test_files: List[Path], backend: str) -> None:
+    results = list(parse_many(all_test_files, workers=2, backend=backend))
+    assert [result.path for result in results] == all_test_files
+    for result in results:
+        expected = lockfile.Lockfile.from_file(result.path)
+        assert result.error is None
+        assert result.lockfile is not None
+        assert result.lockfile.version == expected.version
+        assert result.lockfile.data == expected.data
+
+
+def test_parse_many_unordered(all_test_files: List[Path]) -> None:
+    results = list(parse_many(all_test_files, workers=2, ordered=False, tokenizer="scanner"))
+    assert {result.path for result in results} == set(all_test_files)
+    assert all(result.error is None for result in results)
+
+
+def test_parse_many_errors(tmp_path: Path, test_data_dir: Path) -> None:
+    invalid = tmp_path / "invalid.lock"
+    invalid.write_text("foo:\n    bar baz\n")
+    missing = tmp_path / "missing.lock"
+    valid = test_data_dir / "aliases.lock"
+
+    results = list(parse_many([invalid, missing, valid], workers=1))
+    assert [result.path for result in results] == [invalid, missing, valid]
+    assert isinstance(results[0].error, SyntaxError)
+    assert isinstance(results[1].error, FileNotFoundError)
+    assert results[2].error is None
+    assert results[2].lockfile is not None
+    assert results[0].lockfile is None and results[1].lockfile is None
+
+
+def test_parse_many_unknown_backend() -> None:
+    # Raised by the call, before iterating
+    with pytest.raises(ValueError, match="Unknown backend: foo"):
+        parse_many([], backend="foo")
+
+
+def test_parse_many_close_cancels(
+    monkeypatch: pytest.MonkeyPatch, all_test_files: List[Path]
+) -> None:
+    futures = []
+
+    class Executor(ThreadPoolExecutor):
+        def submit(self, *args: Any, **kwargs: Any) -> "Future[Any]":
+            future = super().submit(*args, **kwargs)
+            futures.append(future)
+            return future
+
+    # Threads, to see the futures from the test
+    monkeypatch.setattr(batch, "ProcessPoolExecutor", Executor)
+    results = parse_many(all_test_files * 20, workers=1)
+    assert next(results).error is None
+    results.close()
+
+    assert len(futures) == len(all_test_files) * 20
+    assert all(future.done() for future in futures)
+    assert any(future.cancelled() for future in futures)
@@ -0,0 +1,200 @@
+"""
+Copyright (C) 2020  Red Hat, Inc
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import os
+import sys
+import types
+from pathlib import Path
+from typing import Any, Dict, List
+
+import pytest
+
+from pyarn import cache, lockfile
+from pyarn.cache import ENTRY_SUFFIX, ParseCache
+
+
+class CountingParser:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def __call__(self, lockfile_str: str) -> Dict[str, Any]:
+        self.calls += 1
+        return lockfile.parse(lockfile_str, backend="direct")
+
+
+@pytest.fixture
+def lock_path(tmp_path: Path) -> Path:
+    path = tmp_path / "yarn.lock"
+    path.write_text('# yarn lockfile v1\n\nfoo@^1.0.0:\n  version "1.0.0"\n')
+    return path
+
+
+def test_from_file_cached(all_test_files: List[Path], tmp_path: Path) -> None:
+    cache = ParseCache(tmp_path / "cache")
+    for test_file in all_test_files:
+        expected = lockfile.Lockfile.from_file(test_file)
+        for _ in range(2):
+            cached = lockfile.Lockfile.from_file(test_file, cache=cache)
+            assert cached.version == expected.version
+            assert cached.data == expected.data
+
+
+def test_from_file_cached_unknown_tokenizer(lock_path: Path, tmp_path: Path) -> None:
+    cache = ParseCache(tmp_path / "cache")
+    lockfile.Lockfile.from_file(lock_path, cache=cache)
+    with pytest.raises(ValueError, match="Unknown tokenizer: foo"):
+        lockfile.Lockfile.from_file(lock_path, cache=cache, tokenizer="foo")
+
+
+def test_cache_hit(lock_path: Path, tmp_path: Path) -> None:
+    cache = ParseCache(tmp_path / "cache")
+    parse = CountingParser()
+    first = cache.parse_file(lock_path, parse)
+    assert cache.parse_file(lock_path, parse) == first
+    assert parse.calls == 1
+    assert first["data"] == {"foo@^1.0.0": {"version": "1.0.0"}}
+
+
+def test_cache_keyed_by_content(lock_path: Path, tmp_path: Path) -> None:
+    cache = ParseCache(tmp_path / "cache")
+    parse = CountingParser()
+    cache.parse_file(lock_path, parse)
+
+    copy = tmp_path / "copy.lock"
+    copy.write_bytes(lock_path.read_bytes())
+    cache.parse_file(copy, parse)
+    assert parse.calls == 1
+
+    lock_path.write_text('foo@^1.0.0:\n  version "1.0.1"\n')
+    # Modification times may not change between quick writes, the size does
+    assert cache.parse_file(lock_path, parse)["data"] == {"foo@^1.0.0": {"version": "1.0.1"}}
+    assert parse.calls == 2
+
+
+def test_cache_version(lock_path: Path, tmp_path: Path) -> None:
+    parse = CountingParser()
+    ParseCache(tmp_path / "cache", version="1.0").parse_file(lock_path, parse)
+    ParseCache(tmp_path / "cache", version="1.0").parse_file(lock_path, parse)
+    assert parse.calls == 1
+    ParseCache(tmp_path / "cache", version="2.0").parse_file(lock_path, parse)
+    assert parse.calls == 2
+
+
+def test_parser_version(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    assert cache.parser_version() == cache.parser_version()
+    assert cache.parser_version().startswith("parser-")
+
+    # Any change to the parser sources changes the version, and so the cache directory
+    source = tmp_path / "parser.py"
+    source.write_text("# version 1\n")
+    monkeypatch.setattr(cache, "PARSER_MODULES", (str(source),))
+    first = ParseCache(tmp_path / "cache").directory
+    source.write_text("# version 2\n")
+    assert ParseCache(tmp_path / "cache").directory != first
+
+
+def test_parser_version_without_sources(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(cache, "PARSER_MODULES", ("missing.py",))
+    monkeypatch.setattr(cache, "pyarn_version", lambda: "1.2.3")
+    assert cache.parser_version() == "1.2.3"
+
+
+def test_pyarn_version_backport(monkeypatch: pytest.MonkeyPatch) -> None:
+    # Python 3.7 has no importlib.metadata, the importlib_metadata backport is used instead
+    backport = types.ModuleType("importlib_metadata")
+    backport.PackageNotFoundError = LookupError  # type: ignore[attr-defined]
+    backport.version = lambda name: "1.2.3"  # type: ignore[attr-defined]
+    monkeypatch.setitem(sys.modules, "importlib.metadata", None)
+    monkeypatch.setitem(sys.modules, "importlib_metadata", backport)
+    assert cache.pyarn_version() == "1.2.3"
+
+    monkeypatch.setitem(sys.modules, "importlib_metadata", None)
+    assert cache.pyarn_version() == "unknown"
+
+
+def test_cache_clear(lock_path: Path, tmp_path: Path) -> None:
+    cache = ParseCache(tmp_path / "cache")
+    parse = CountingParser()
+    cache.parse_file(lock_path, parse)
+    cache.clear()
+    assert not (tmp_path / "cache").exists()
+    cache.parse_file(lock_path, parse)
+    assert parse.calls == 2
+
+
+def test_cache_write_error(
+    lock_path: Path,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    def mkstemp(*args: Any, **kwargs: Any) -> Any:
+        raise OSError(28, "No space left on device")
+
+    monkeypatch.setattr(cache.tempfile, "mkstemp", mkstemp)
+    parse = CountingParser()
+    parsed = ParseCache(tmp_path / "cache").parse_file(lock_path, parse)
+    assert parsed["data"] == {"foo@^1.0.0": {"version": "1.0.0"}}
+    assert "Cannot write to the parse cache" in caplog.text
+    assert not list((tmp_path / "cache").rglob("*.tmp"))
+
+
+def test_cache_read_only(lock_path: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    parse = CountingParser()
+    ParseCache(tmp_path / "cache").parse_file(lock_path, parse)
+
+    # Entries cannot be marked as recently used, they are still hits
+    def utime(*args: Any) -> None:
+        raise PermissionError(13, "Permission denied")
+
+    monkeypatch.setattr(cache.os, "utime", utime)
+    assert ParseCache(tmp_path / "cache").parse_file(lock_path, parse)["data"]
+    assert parse.calls == 1
+
+
+def test_cache_corrupted_entry(lock_path: Path, tmp_path: Path) -> None:
+    cache = ParseCache(tmp_path / "cache")
+    parse = CountingParser()
+    expected = cache.parse_file(lock_path, parse)
+    for entry in cache.directory.iterdir():
+        entry.write_bytes(b"garbage")
+    assert cache.parse_file(lock_path, parse) == expected
+    assert parse.calls == 2
+
+
+def test_cache_eviction(tmp_path: Path) -> None:
+    cache = ParseCache(tmp_path / "cache", max_bytes=1000)
+    parse = CountingParser()
+    paths = []
+    for i in range(20):
+        path = tmp_path / f"{i}.lock"
+        path.write_text(f'foo@^{i}.0.0:\n  version "{i}.0.0"\n')
+        paths.append(path)
+        cache.parse_file(path, parse)
+        # Distinct modification times, to make the order of use unambiguous
+        for entry in cache.directory.iterdir():
+            os.utime(entry, ns=(entry.stat().st_atime_ns, entry.stat().st_mtime_ns - 10**9))
+
+    sizes = [entry.stat().st_size for entry in cache.directory.iterdir()]
+    assert sum(sizes) <= 1000
+    assert len([e for e in cache.directory.iterdir() if e.name.endswith(ENTRY_SUFFIX)]) < 20
+
+    # The most recent entries are kept
+    parse.calls = 0
+    cache.parse_file(paths[-1], parse)
+    assert parse.calls == 0
+    cache.parse_file(paths[0], parse)
+    assert parse.calls == 1
@@ -0,0 +1,119 @@
+"""
+Copyright (C) 2020  Red Hat, Inc
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import sys
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from pyarn.columns import PackageColumns
+from pyarn.lockfile import Lockfile
+
+LOCKFILE = """\
+foo@^1.0.0:
+  version "1.0.0"
+  resolved "https://registry.yarnpkg.com/foo/-/foo-1.0.0.tgz"
+  dependencies:
+    bar "^2.0.0"
+    baz "^3.0.0"
+
+bar@^2.0.0:
+  version "2.0.0"
+  resolved "https://registry.yarnpkg.com/bar/-/bar-2.0.0.tgz"
+  dependencies:
+    baz "^3.0.0"
+
+foo@^2.0.0:
+  version "2.0.0"
+
+baz@^3.0.0:
+  version "3.0.0"
+
+"alias@npm:foo@^1.0.0":
+  version "1.0.0"
+"""
+
+
+def _rows(columns: PackageColumns) -> List[tuple]:
+    fields = (
+        columns.name,
+        columns.version,
+        columns.url,
+        columns.checksum,
+        columns.path,
+        columns.alias,
+    )
+    return [
+        (*(field[row] for field in fields), columns.dependencies(row))
+        for row in range(len(columns.keys))
+    ]
+
+
+def _package_rows(lock: Lockfile) -> List[tuple]:
+    return [
+        (p.name, p.version, p.url, p.checksum, p.path, p.alias, p.dependencies)
+        for p in lock.packages()
+    ]
+
+
+def test_to_columns_all_files(all_test_files: List[Path]) -> None:
+    for test_file in all_test_files:
+        lock = Lockfile.from_file(test_file)
+        columns = lock.to_columns()
+        assert columns.keys == list(lock.data)
+        assert _rows(columns) == _package_rows(lock)
+
+
+def test_dictionary_encoding() -> None:
+    columns = Lockfile.from_str(LOCKFILE).to_columns()
+    assert list(columns.name.codes) == [0, 1, 0, 2, 0]
+    assert columns.name.values == ["foo", "bar", "baz"]
+    assert list(columns.name) == ["foo", "bar", "foo", "baz", "foo"]
+    assert columns.name.code("baz") == 2
+    assert columns.name.code("qux") == -1
+
+    assert list(columns.url.codes) == [0, 1, -1, -1, -1]
+    assert columns.url[2] is None
+    assert list(columns.alias) == [None, None, None, None, "alias"]
+
+    assert list(columns.dependency_offsets) == [0, 2, 3, 3, 3, 3]
+    assert list(columns.dependency_names) == ["bar", "baz", "baz"]
+    assert columns.dependency_names.values == ["bar", "baz"]
+    assert columns.dependencies(0) == {"bar": "^2.0.0", "baz": "^3.0.0"}
+    assert columns.dependencies(3) == {}
+
+
+def test_to_columns_numpy() -> None:
+    np = pytest.importorskip("numpy")
+    lock = Lockfile.from_str(LOCKFILE)
+    columns = lock.to_columns(numpy=True)
+    assert isinstance(columns.name.codes, np.ndarray)
+    assert columns.name.codes.dtype == np.int32
+    assert columns.dependency_offsets.dtype == np.int64
+    assert _rows(columns) == _package_rows(lock)
+
+    # All the versions of foo
+    versions = columns.version.codes[columns.name.codes == columns.name.code("foo")]
+    assert sorted(columns.version.values[versions]) == ["1.0.0", "1.0.0", "2.0.0"]
+    # Number of dependencies per package
+    assert list(np.diff(columns.dependency_offsets)) == [2, 1, 0, 0, 0]
+
+
+def test_to_columns_without_numpy(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setitem(sys.modules, "numpy", None)
+    with pytest.raises(ImportError, match=r"pyarn\[numpy\]"):
+        Lockfile.from_str(LOCKFILE).to_columns(numpy=True)
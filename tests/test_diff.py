@@ -0,0 +1,143 @@
+"""
+Copyright (C) 2020  Red Hat, Inc
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from pathlib import Path
+from textwrap import dedent
+from typing import List
+
+from pyarn.diff import LockfileDiff, PackageSummary, diff, diff_files
+from pyarn.lockfile import Lockfile
+
+OLD = dedent(
+    """
+    # yarn lockfile v1
+
+    foo@^1.0.0:
+      version "1.0.0"
+      resolved "https://registry.yarnpkg.com/foo/-/foo-1.0.0.tgz"
+      integrity sha1-foo1
+
+    foo@^2.0.0:
+      version "2.0.0"
+      resolved "https://registry.yarnpkg.com/foo/-/foo-2.0.0.tgz"
+      integrity sha1-foo2
+
+    bar@^1.0.0:
+      version "1.0.0"
+      dependencies:
+        foo "^1.0.0"
+
+    baz@^1.0.0:
+      version "1.0.0"
+
+    qux@^1.0.0:
+      version "1.0.0"
+    """
+)
+
+NEW = dedent(
+    """
+    # yarn lockfile v1
+
+    foo@^1.0.0:
+      version "1.0.1"
+      resolved "https://registry.yarnpkg.com/foo/-/foo-1.0.1.tgz"
+      integrity sha1-foo1-1
+
+    foo@^2.0.0:
+      version "2.0.0"
+      resolved "https://registry.yarnpkg.com/foo/-/foo-2.0.0.tgz"
+      integrity sha1-foo2
+
+    bar@^1.0.0:
+      version "1.0.0"
+      dependencies:
+        foo "^1.0.1"
+
+    "baz@^1.0.0", "baz@~1.0.0":
+      version "1.0.0"
+
+    new@^1.0.0:
+      version "1.0.0"
+    """
+)
+
+EXPECTED = LockfileDiff(
+    added=[PackageSummary("new", "1.0.0", None, None)],
+    removed=[PackageSummary("qux", "1.0.0", None, None)],
+    changed=[
+        (
+            PackageSummary(
+                "foo", "1.0.0", "https://registry.yarnpkg.com/foo/-/foo-1.0.0.tgz", "sha1-foo1"
+            ),
+            PackageSummary(
+                "foo", "1.0.1", "https://registry.yarnpkg.com/foo/-/foo-1.0.1.tgz", "sha1-foo1-1"
+            ),
+        )
+    ],
+)
+
+
+def test_diff() -> None:
+    assert diff(Lockfile.from_str(OLD), Lockfile.from_str(NEW)) == EXPECTED
+
+
+def test_diff_reversed() -> None:
+    result = diff(Lockfile.from_str(NEW), Lockfile.from_str(OLD))
+    assert result.added == EXPECTED.removed
+    assert result.removed == EXPECTED.added
+    assert result.changed == [(new, old) for old, new in EXPECTED.changed]
+
+
+def test_diff_files(tmp_path: Path) -> None:
+    old_path = tmp_path / "old.lock"
+    old_path.write_text(OLD)
+    new_path = tmp_path / "new.lock"
+    new_path.write_text(NEW)
+    assert diff_files(old_path, new_path) == EXPECTED
+
+
+def test_diff_same(all_test_files: List[Path]) -> None:
+    for test_file in all_test_files:
+        lock = Lockfile.from_file(test_file)
+        assert diff(lock, lock) == LockfileDiff([], [], [])
+
+
+def test_diff_versions() -> None:
+    def lockfile(*versions: str) -> Lockfile:
+        return Lockfile("1", {f"foo@{v}": {"version": v} for v in versions})
+
+    result = diff(lockfile("1.9.0", "1.10.0", "3.0.0"), lockfile("1.9.1", "1.10.1"))
+    assert [(old.version, new.version) for old, new in result.changed] == [
+        ("1.9.0", "1.9.1"),
+        ("1.10.0", "1.10.1"),
+    ]
+    assert [summary.version for summary in result.removed] == ["3.0.0"]
+    assert result.added == []
+
+
+def test_diff_moved_key() -> None:
+    old = Lockfile("1", {"foo@^1.0.0": {"version": "1.0.0"}, "foo@~1.0.0": {"version": "1.0.0"}})
+    new = Lockfile("1", {"foo@^1.0.0": {"version": "1.0.0"}})
+    assert diff(old, new) == LockfileDiff([], [], [])
+
+
+def test_diff_unquoted_version() -> None:
+    old = Lockfile.from_str("foo@1:\n  version 1\n\nfoo@2:\n  version 2\n")
+    new = Lockfile.from_str('foo@1:\n  version "1.0.1"\n')
+    result = diff(old, new)
+    assert [(old.version, new.version) for old, new in result.changed] == [(1, "1.0.1")]
+    assert [summary.version for summary in result.removed] == [2]
@@ -0,0 +1,57 @@
+"""
+Copyright (C) 2020  Red Hat, Inc
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import pytest
+
+from pyarn import direct, lockfile
+from pyarn.scanner import tokenize
+
+
+def test_iter_blocks():
+    data = '# comment\n\nfoo, bar:\n  a:\n    b c\n  d e\n\nbaz "qux"\nquux:\n  x y'
+    assert list(direct.iter_blocks(tokenize(data))) == [
+        (None, "# comment", 1, 1),
+        ("foo, bar", {"a": {"b": "c"}, "d": "e"}, 3, 6),
+        ("baz", "qux", 8, 8),
+        ("quux", {"x": "y"}, 9, 10),
+    ]
+
+
+def test_iter_blocks_is_lazy():
+    blocks = direct.iter_blocks(tokenize('foo:\n  bar "baz"\n\n@'))
+    assert next(blocks) == ("foo", {"bar": "baz"}, 1, 2)
+    with pytest.raises(ValueError, match="4: Invalid token @"):
+        next(blocks)
+
+
+def test_error_message():
+    with pytest.raises(ValueError, match=r"error parsing Token\(type='COLON'"):
+        direct.parse("foo ::")
+    with pytest.raises(ValueError, match="error parsing None"):
+        direct.parse("foo:")
+
+
+def test_from_file_direct(all_test_files):
+    for test_file in all_test_files:
+        lock = lockfile.Lockfile.from_file(test_file, backend="direct")
+        expected = lockfile.Lockfile.from_file(test_file)
+        assert lock.version == expected.version
+        assert lock.data == expected.data
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError, match="Unknown backend: foo"):
+        lockfile.Lockfile.from_str('foo "bar"', backend="foo")
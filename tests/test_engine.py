@@ -0,0 +1,88 @@
+"""
+Copyright (C) 2020  Red Hat, Inc
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from pyarn import engine, lockfile
+
+
+def test_parse():
+    result = engine.ParserEngine().parse('foo:\n  bar "baz"\n# comment\n')
+    assert result == {"data": {"foo": {"bar": "baz"}}, "comments": ["# comment"]}
+
+
+def test_parse_lines():
+    lines = ["foo:\n", '  bar "baz"\n', "# comment\n"]
+    result = engine.ParserEngine().parse_lines(iter(lines))
+    assert result == {"data": {"foo": {"bar": "baz"}}, "comments": ["# comment"]}
+
+
+def test_parse_reuses_engine():
+    test_engine = engine.ParserEngine()
+    # Lexer state (indentation level, line number) must not leak between parses
+    with pytest.raises(ValueError):
+        test_engine.parse('foo:\n  bar:\n  foo "bar"')
+    assert test_engine.parse("foo:\n  bar:\n    yes no") == {
+        "data": {"foo": {"bar": {"yes": "no"}}},
+        "comments": [],
+    }
+    assert test_engine.parse('foo "bar"') == {"data": {"foo": "bar"}, "comments": []}
+
+
+def test_parse_threads(all_test_files):
+    test_engine = engine.ParserEngine()
+    contents = [f.read_text() for f in all_test_files] * 2
+    expected = [test_engine.parse(content) for content in contents]
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(test_engine.parse, contents))
+
+    assert results == expected
+
+
+def test_default_engine():
+    assert engine.get_default_engine() is engine.get_default_engine()
+    assert lockfile.Lockfile.parser() is engine.get_default_engine()
+
+
+def test_from_str_with_engine():
+    test_engine = engine.ParserEngine()
+    lock = lockfile.Lockfile.from_str('# yarn lockfile v1\nfoo "bar"\n', engine=test_engine)
+    assert lock.version == "1"
+    assert lock.data == {"foo": "bar"}
+
+
+def test_cache_dir(tmp_path):
+    cache_dir = tmp_path / "cache"
+    test_engine = engine.ParserEngine(cache_dir=cache_dir)
+    tables = cache_dir / engine.TABLES_PICKLE
+    assert tables.exists()
+    mtime = tables.stat().st_mtime_ns
+
+    # The cached tables are reused as long as the grammar does not change
+    cached_engine = engine.ParserEngine(cache_dir=cache_dir)
+    assert tables.stat().st_mtime_ns == mtime
+    assert cached_engine.parse('foo "bar"') == test_engine.parse('foo "bar"')
+
+
+def test_user_cache_dir(monkeypatch, tmp_path):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    assert engine.user_cache_dir() == tmp_path / "pyarn"
+    monkeypatch.delenv("XDG_CACHE_HOME")
+    assert engine.user_cache_dir() == Path.home() / ".cache" / "pyarn"
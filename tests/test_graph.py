@@ -0,0 +1,159 @@
+"""
+Copyright (C) 2020  Red Hat, Inc
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from pathlib import Path
+from textwrap import dedent
+
+import pytest
+
+from pyarn import lockfile
+from pyarn.graph import DependencyGraph
+
+LOCKFILE = dedent(
+    """
+    "app@^1.0.0":
+      version "1.0.0"
+      dependencies:
+        lib "^2.0.0"
+        util "^3.0.0"
+      optionalDependencies:
+        missing "^1.0.0"
+
+    lib@^2.0.0, lib@^2.1.0:
+      version "2.1.0"
+      dependencies:
+        util "^3.1.0"
+
+    util@^3.0.0, util@^3.1.0:
+      version "3.1.0"
+
+    standalone@^1.0.0:
+      version "1.0.0"
+    """
+)
+
+
+@pytest.fixture
+def graph() -> DependencyGraph:
+    return lockfile.Lockfile.from_str(LOCKFILE).graph()
+
+
+def keys(graph: DependencyGraph, nodes) -> set:
+    return {graph.keys[node] for node in nodes}
+
+
+def test_graph_edges(graph: DependencyGraph) -> None:
+    assert len(graph) == 4
+    app = graph.node("app@^1.0.0")
+    assert keys(graph, graph.dependencies(app)) == {
+        "lib@^2.0.0, lib@^2.1.0",
+        "util@^3.0.0, util@^3.1.0",
+    }
+    assert list(graph.dependencies(graph.node("standalone@^1.0.0"))) == []
+    assert graph.unresolved == [(app, "missing", "^1.0.0")]
+
+
+def test_graph_dependents(graph: DependencyGraph) -> None:
+    util = graph.node("util@^3.0.0, util@^3.1.0")
+    assert keys(graph, graph.dependents(util)) == {"app@^1.0.0", "lib@^2.0.0, lib@^2.1.0"}
+    assert keys(graph, graph.transitive_dependents(util)) == {
+        "app@^1.0.0",
+        "lib@^2.0.0, lib@^2.1.0",
+    }
+    assert list(graph.dependents(graph.node("app@^1.0.0"))) == []
+
+
+def test_graph_transitive_dependencies(graph: DependencyGraph) -> None:
+    app = graph.node("app@^1.0.0")
+    lib = graph.node("lib@^2.0.0, lib@^2.1.0")
+    assert keys(graph, graph.transitive_dependencies(app)) == {
+        "lib@^2.0.0, lib@^2.1.0",
+        "util@^3.0.0, util@^3.1.0",
+    }
+    assert keys(graph, graph.transitive_dependencies(lib)) == {"util@^3.0.0, util@^3.1.0"}
+    # The starting nodes are not part of the result
+    assert graph.transitive_dependencies(app, lib) == [graph.node("util@^3.0.0, util@^3.1.0")]
+
+
+def test_graph_topological_order(graph: DependencyGraph) -> None:
+    order = graph.topological_order()
+    assert sorted(order) == list(range(len(graph)))
+    position = {node: i for i, node in enumerate(order)}
+    for node in range(len(graph)):
+        for dependency in graph.dependencies(node):
+            assert position[dependency] < position[node]
+
+
+def test_graph_cycle() -> None:
+    lock = lockfile.Lockfile.from_str(
+        dedent(
+            """
+            a@^1.0.0:
+              dependencies:
+                b "^1.0.0"
+
+            b@^1.0.0:
+              dependencies:
+                a "^1.0.0"
+
+            c@^1.0.0:
+              version "1.0.0"
+            """
+        )
+    )
+    graph = lock.graph()
+    assert keys(graph, graph.transitive_dependencies(graph.node("a@^1.0.0"))) == {"b@^1.0.0"}
+    assert graph.strongly_connected_components() == [[0, 1], [2]]
+    assert graph.topological_order() == [0, 1, 2]
+
+
+def test_graph_cycles_full_lock(test_data_dir: Path) -> None:
+    graph = lockfile.Lockfile.from_file(test_data_dir / "full.lock").graph()
+    components = graph.strongly_connected_components()
+    assert sorted(node for component in components for node in component) == list(range(len(graph)))
+    # full.lock has dependency cycles
+    cycles = [component for component in components if len(component) > 1]
+    assert cycles
+    for cycle in cycles:
+        for node in cycle:
+            assert set(cycle) - {node} <= set(graph.transitive_dependencies(node))
+
+    order = graph.topological_order()
+    assert order == [node for component in components for node in component]
+    component_of = {node: i for i, component in enumerate(components) for node in component}
+    for node in range(len(graph)):
+        for dependency in graph.dependencies(node):
+            assert component_of[dependency] <= component_of[node]
+            if component_of[dependency] == component_of[node]:
+                # Only within a cycle
+                assert len(components[component_of[node]]) > 1 or dependency == node
+
+
+def test_graph_test_files(all_test_files) -> None:
+    for test_file in all_test_files:
+        lock = lockfile.Lockfile.from_file(test_file)
+        graph = lock.graph()
+        assert graph.keys == list(lock.data)
+        for node, key in enumerate(graph.keys):
+            entry = lock.data[key]
+            resolved = [
+                lock.key_for(name, version_range)
+                for field in ("dependencies", "optionalDependencies")
+                for name, version_range in entry.get(field, {}).items()
+            ]
+            expected = [graph.node(k) for k in resolved if k is not None]
+            assert list(graph.dependencies(node)) == expected
+        assert sorted(graph.topological_order()) == list(range(len(graph)))
@@ -0,0 +1,182 @@
+"""
+Copyright (C) 2020  Red Hat, Inc
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import marshal
+import os
+from pathlib import Path
+from typing import Any, List, Optional
+
+import pytest
+
+from pyarn.index import INDEX_SUFFIX, LockfileIndex
+from pyarn.lockfile import Lockfile
+
+LOCKFILE = """\
+# yarn lockfile v1
+
+
+foo@^1.0.0, foo@~1.0.0:
+  version "1.0.0"
+  dependencies:
+    bar "^2.0.0"
+
+# Comment between entries
+bar@^2.0.0:
+  version "2.0.1"
+  resolved "https://registry.yarnpkg.com/bar/-/bar-2.0.1.tgz#abc"
+"""
+
+
+@pytest.fixture
+def lock_path(tmp_path: Path) -> Path:
+    path = tmp_path / "yarn.lock"
+    path.write_text(LOCKFILE)
+    return path
+
+
+def test_build_all_files(all_test_files: List[Path]) -> None:
+    for test_file in all_test_files:
+        expected = Lockfile.from_file(test_file)
+        index = LockfileIndex.build(test_file)
+        assert index.version == expected.version
+        assert index.keys() == list(expected.data)
+        for key, value in expected.data.items():
+            assert index.get(key) == value
+
+
+def test_spans(lock_path: Path) -> None:
+    index = LockfileIndex.build(lock_path)
+    content = lock_path.read_bytes()
+    offset, length = index.spans["bar@^2.0.0"]
+    assert content[offset : offset + length].startswith(b"bar@^2.0.0:\n")
+    assert offset + length == len(content)
+
+
+@pytest.mark.parametrize("newline", ["\n", "\r\n"])
+@pytest.mark.parametrize("final_newline", [True, False])
+def test_newlines(tmp_path: Path, newline: str, final_newline: bool) -> None:
+    content = LOCKFILE.replace("\n", newline)
+    if not final_newline:
+        content = content.rstrip()
+    path = tmp_path / "yarn.lock"
+    path.write_bytes(content.encode())
+    index = LockfileIndex.build(path)
+    assert index.get("foo@^1.0.0, foo@~1.0.0") == {
+        "version": "1.0.0",
+        "dependencies": {"bar": "^2.0.0"},
+    }
+    assert index.get("bar@^2.0.0")["version"] == "2.0.1"
+
+
+def test_non_ascii(tmp_path: Path) -> None:
+    path = tmp_path / "yarn.lock"
+    path.write_bytes('"é@^1.0.0":\n  version "1.0.0"\n\nfoo@^1.0.0:\n  version "1.0.0"\n'.encode())
+    index = LockfileIndex.build(path, encoding="utf-8")
+    assert index.get("é@^1.0.0") == {"version": "1.0.0"}
+    assert index.get("foo@^1.0.0") == {"version": "1.0.0"}
+
+
+def test_resolve(lock_path: Path) -> None:
+    index = LockfileIndex.build(lock_path)
+    assert index.key_for("foo", "~1.0.0") == "foo@^1.0.0, foo@~1.0.0"
+    package = index.resolve("foo", "^1.0.0")
+    assert package is not None
+    assert (package.name, package.version) == ("foo", "1.0.0")
+    assert package.dependencies == {"bar": "^2.0.0"}
+    assert index.resolve("foo", "^2.0.0") is None
+    with pytest.raises(KeyError):
+        index.get("foo@^2.0.0")
+
+
+def test_open_saves_index(lock_path: Path) -> None:
+    index_path = Path(f"{lock_path}{INDEX_SUFFIX}")
+    assert LockfileIndex.load(lock_path) is None
+    index = LockfileIndex.open(lock_path)
+    assert index_path.exists()
+
+    loaded = LockfileIndex.load(lock_path)
+    assert loaded is not None
+    assert loaded.spans == index.spans
+    assert loaded.version == "1"
+    assert loaded.get("bar@^2.0.0") == index.get("bar@^2.0.0")
+
+
+def test_outdated_index(lock_path: Path) -> None:
+    LockfileIndex.open(lock_path)
+    lock_path.write_text(LOCKFILE + '\nbaz@^3.0.0:\n  version "3.0.0"\n')
+    assert LockfileIndex.load(lock_path) is None
+    assert LockfileIndex.open(lock_path).get("baz@^3.0.0") == {"version": "3.0.0"}
+
+
+def test_corrupted_index(lock_path: Path) -> None:
+    Path(f"{lock_path}{INDEX_SUFFIX}").write_bytes(b"not an index")
+    assert LockfileIndex.load(lock_path) is None
+    assert "bar@^2.0.0" in LockfileIndex.open(lock_path)
+
+
+def test_saved_non_ascii(tmp_path: Path) -> None:
+    path = tmp_path / "yarn.lock"
+    path.write_bytes('"é@^1.0.0":\n  version "1.0.0"\n'.encode("latin-1"))
+    LockfileIndex.build(path, encoding="latin-1").save()
+    loaded = LockfileIndex.load(path)
+    assert loaded is not None
+    assert loaded.encoding == "latin-1"
+    assert loaded.get("é@^1.0.0") == {"version": "1.0.0"}
+
+
+def _tampered(lock_path: Path, **fields: Any) -> Optional[LockfileIndex]:
+    index = LockfileIndex.build(lock_path)
+    for name, value in fields.items():
+        setattr(index, name, value)
+    index.save()
+    return LockfileIndex.load(lock_path)
+
+
+def test_invalid_saved_index(lock_path: Path) -> None:
+    size = lock_path.stat().st_size
+    assert _tampered(lock_path) is not None
+    assert _tampered(lock_path, spans={"foo": (0, size + 1)}) is None
+    assert _tampered(lock_path, spans={"foo": (-1, 2)}) is None
+    assert _tampered(lock_path, spans={"foo": (0, 0)}) is None
+    assert _tampered(lock_path, encoding="rot13") is None
+    assert _tampered(lock_path, encoding="no-such-encoding") is None
+    assert _tampered(lock_path, version="2") is None
+
+    index_path = Path(f"{lock_path}{INDEX_SUFFIX}")
+    LockfileIndex.build(lock_path).save()
+    content = index_path.read_bytes()
+    for invalid in (content[:-1], content + b"\0", content[:20]):
+        index_path.write_bytes(invalid)
+        assert LockfileIndex.load(lock_path) is None
+
+
+def test_marshal_index_not_loaded(lock_path: Path) -> None:
+    # Indexes saved by earlier versions of pyarn are never unmarshalled
+    stat = lock_path.stat()
+    saved = (1, "1", {"foo": (0, 1)}, (stat.st_size, stat.st_mtime_ns), "utf-8")
+    Path(f"{lock_path}{INDEX_SUFFIX}").write_bytes(marshal.dumps(saved))
+    assert LockfileIndex.load(lock_path) is None
+
+
+@pytest.mark.skipif(os.geteuid() == 0, reason="root can write to read-only directories")
+def test_read_only_directory(lock_path: Path) -> None:
+    lock_path.parent.chmod(0o500)
+    try:
+        index = LockfileIndex.open(lock_path)
+    finally:
+        lock_path.parent.chmod(0o700)
+    assert len(index) == 2
+    assert not Path(f"{lock_path}{INDEX_SUFFIX}").exists()
@@ -18,6 +18,12 @@ import pytest
 from ply import lex
 
 from pyarn import lexer
+from pyarn.scanner import Scanner
+
+LEXERS = [
+    pytest.param(lambda: lex.lex(module=lexer), id="ply"),
+    pytest.param(lambda: Scanner(split_dedents=False), id="scanner"),
+]
 
 
 @pytest.mark.parametrize(
@@ -145,12 +151,13 @@ from pyarn import lexer
         ("not-true", ["STRING"], ["not-true"]),
     ],
 )
-def test_lexer(data, expected_types, expected_values):
+@pytest.mark.parametrize("make_lexer", LEXERS)
+def test_lexer(data, expected_types, expected_values, make_lexer):
     if len(expected_types) != len(expected_values):
         msg = f"Length of parameters should match for [{expected_types}, {expected_values}]"
         raise ValueError(msg)
 
-    test_lexer = lex.lex(module=lexer)
+    test_lexer = make_lexer()
     test_lexer.input(data)
     tokens = list(test_lexer)
     for token, expected_type, expected_value in zip(tokens, expected_types, expected_values):
@@ -167,8 +174,9 @@ def test_lexer(data, expected_types, expected_values):
         ("foo:\n\tbar", "2: Invalid token \tbar"),
     ],
 )
-def test_lexer_error(data, error):
-    test_lexer = lex.lex(module=lexer)
+@pytest.mark.parametrize("make_lexer", LEXERS)
+def test_lexer_error(data, error, make_lexer):
+    test_lexer = make_lexer()
     test_lexer.input(data)
     with pytest.raises(ValueError) as exc:
         list(test_lexer)[0]
@@ -176,9 +184,10 @@ def test_lexer_error(data, error):
     assert str(exc.value) == error
 
 
-def test_lexer_lineno():
+@pytest.mark.parametrize("make_lexer", LEXERS)
+def test_lexer_lineno(make_lexer):
     data = "foo\nbar\n\nbaz end"
-    test_lexer = lex.lex(module=lexer)
+    test_lexer = make_lexer()
     test_lexer.input(data)
     tokens = list(test_lexer)
     assert (tokens[0].value, tokens[0].lineno) == ("foo", 1)
@@ -19,6 +19,7 @@ from ply import lex
 
 from pyarn import lexer
 from pyarn.lexer_wrapper import Wrapper
+from pyarn.scanner import Scanner
 
 
 @pytest.mark.parametrize(
@@ -117,12 +118,19 @@ from pyarn.lexer_wrapper import Wrapper
     ],
 )
 @pytest.mark.parametrize("use_iterator", [True, False])
-def test_wrapper(data, expected_types, expected_values, use_iterator):
+@pytest.mark.parametrize(
+    "make_lexer",
+    [
+        pytest.param(lambda: Wrapper(lex.lex(module=lexer)), id="ply"),
+        pytest.param(Scanner, id="scanner"),
+    ],
+)
+def test_wrapper(data, expected_types, expected_values, use_iterator, make_lexer):
     if len(expected_types) != len(expected_values):
         msg = f"Length of parameters should match for [{expected_types}, {expected_values}]"
         raise ValueError(msg)
 
-    test_lexer = Wrapper(lex.lex(module=lexer))
+    test_lexer = make_lexer()
     test_lexer.input(data)
     tokens = []
     if use_iterator:
@@ -14,15 +14,20 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
+import asyncio
+import io
 import json
+import marshal
 import os
+import pickle
 from pathlib import Path
 from textwrap import dedent
-from typing import List
+from typing import Any, Dict, List
 
 import pytest
 
 from pyarn import lockfile
+from pyarn.cache import ParseCache
 
 
 @pytest.mark.parametrize(
@@ -111,6 +116,53 @@ def test_to_json(data, expected_data):
     assert lock.to_json() == json.dumps(expected_data, sort_keys=True, indent=4)
 
 
+@pytest.mark.parametrize(
+    "kwargs, dumps_kwargs",
+    [
+        ({}, {"indent": 4}),
+        ({"indent": 2}, {"indent": 2}),
+        ({"indent": 0}, {"indent": 0}),
+        ({"indent": None}, {}),
+        ({"compact": True}, {"separators": (",", ":")}),
+    ],
+)
+def test_iter_json(
+    all_test_files: List[Path], kwargs: Dict[str, Any], dumps_kwargs: Dict[str, Any]
+) -> None:
+    for test_file in all_test_files:
+        lock = lockfile.Lockfile.from_file(test_file)
+        expected = json.dumps(lock.data, sort_keys=True, **dumps_kwargs)
+        parts = list(lock.iter_json(**kwargs))
+        assert "".join(parts) == expected
+        # One part per entry, and one to close the document
+        assert len(parts) == len(lock.data) + 1
+
+        output = io.StringIO()
+        lock.to_json_file(output, **kwargs)
+        assert output.getvalue() == expected
+
+
+@pytest.mark.parametrize("compact", [True, False])
+def test_iter_json_special_values(compact: bool) -> None:
+    lock = lockfile.Lockfile(
+        "1",
+        {
+            "z": {"b": [1, 2], "a": {}, "c": "multi\nline \u00e9"},
+            "a": True,
+            "m": {"x": {"y": {"z": None}}},
+        },
+    )
+    dumps_kwargs: Dict[str, Any] = {"separators": (",", ":")} if compact else {"indent": 4}
+    assert "".join(lock.iter_json(compact=compact)) == json.dumps(
+        lock.data, sort_keys=True, **dumps_kwargs
+    )
+
+
+def test_iter_json_empty() -> None:
+    lock = lockfile.Lockfile("1", {})
+    assert "".join(lock.iter_json()) == lock.to_json() == "{}"
+
+
 def test_packages():
     data = 'breakfast@^1.1.1:\n  eggs bacon\n  version "2.0.0"'
     lock = lockfile.Lockfile.from_str(data)
@@ -293,6 +345,24 @@ def test_to_str():
     assert content == EXPECTED_CONTENT
 
 
+def test_to_str_values():
+    data: Dict[str, Dict[str, Any]] = {
+        "foo": {"false": False, "zero": 0, "float": 1.5, "none": None, "empty": {}}
+    }
+    assert lockfile.Lockfile("1", data).to_str() == dedent(
+        """\
+        # yarn lockfile v1
+
+        foo:
+          "false" false
+          zero 0
+          float 1.5
+          none null
+          empty:
+        """
+    )
+
+
 def test_roundtrip(all_test_files, tmp_path):
     for test_file in all_test_files:
         out_file = tmp_path / os.path.basename(test_file)
@@ -349,3 +419,405 @@ def test_aliased_packages(test_data_dir: Path):
     assert nonsense.alias == "probably-nonsense"
     assert nonsense.version == "0.0.1"
     assert nonsense.path == "how"
+
+
+def test_iter_packages(test_data_dir: Path):
+    lock = lockfile.Lockfile.from_file(test_data_dir / "aliases.lock")
+    packages = lock.iter_packages()
+    assert next(packages).name == "babel-plugin-add-module-exports"
+    assert [p.name for p in packages] == ["@elastic/lodash", "fecha", "what"]
+
+
+def test_iter_packages_is_lazy():
+    lock = lockfile.Lockfile.from_str('foo@^1.0.0:\n  version "1.0.0"\nbar@^1.0.0:\n  eggs bacon')
+    packages = lock.iter_packages()
+    assert next(packages).name == "foo"
+    with pytest.raises(ValueError, match="Package version was not provided"):
+        next(packages)
+
+
+def test_lazy_packages(test_data_dir: Path):
+    lock = lockfile.Lockfile.from_file(test_data_dir / "aliases.lock")
+    expected = [(p.name, p.version, p.alias, p.path) for p in lock.packages()]
+    view = lock.lazy_packages()
+
+    assert len(view) == 4
+    assert view[0].name == "babel-plugin-add-module-exports"
+    assert view[-1].name == "what"
+    # Packages are cached
+    assert view[1] is view[1]
+    assert view[0] is next(iter(view))
+    assert [p.name for p in view[1:3]] == ["@elastic/lodash", "fecha"]
+    assert [(p.name, p.version, p.alias, p.path) for p in view] == expected
+    with pytest.raises(IndexError):
+        view[4]
+
+
+def test_lazy_packages_on_access():
+    lock = lockfile.Lockfile.from_str('foo@^1.0.0:\n  version "1.0.0"\nbar@^1.0.0:\n  eggs bacon')
+    view = lock.lazy_packages()
+    assert len(view) == 2
+    assert view[0].name == "foo"
+    with pytest.raises(ValueError, match="Package version was not provided"):
+        view[1]
+
+
+def test_package_slots():
+    package = lockfile.Package("breakfast", "1.0.0", relpath="some/path")
+    assert not hasattr(package, "__dict__")
+    assert package.path == package.relpath == "some/path"
+    package.relpath = "other/path"
+    assert package.path == "other/path"
+    with pytest.raises(AttributeError):
+        package.foo = "bar"  # type: ignore[attr-defined]
+
+
+@pytest.mark.parametrize("backend", ["ply", "direct"])
+def test_strings_are_interned(backend):
+    data = 'a@^1.0.0:\n  version "1.0.0"\n  dependencies:\n    c "^2.0.0"\n'
+    data += 'b@^1.0.0:\n  version "1.0.0"\n  dependencies:\n    c "^2.0.0"\n'
+    lock = lockfile.Lockfile.from_str(data, backend=backend)
+    a, b = lock.data["a@^1.0.0"], lock.data["b@^1.0.0"]
+    assert a["version"] is b["version"]
+    [(key_a, range_a)] = a["dependencies"].items()
+    [(key_b, range_b)] = b["dependencies"].items()
+    assert key_a is key_b
+    assert range_a is range_b
+
+
+@pytest.mark.parametrize(
+    "key, expected_name, expected_alias, expected_path",
+    [
+        pytest.param("foo@^1.0.0", "foo", None, None, id="plain"),
+        pytest.param("foo", "foo", None, None, id="no_version"),
+        pytest.param("foo@", "foo", None, None, id="empty_version"),
+        pytest.param("@scope/foo@^1.0.0", "@scope/foo", None, None, id="scoped"),
+        pytest.param("foo@^1.0.0, foo@^1.1.0", "foo", None, None, id="multiple"),
+        pytest.param("foo@npm:bar@^1.0.0", "bar", "foo", None, id="alias"),
+        pytest.param("foo@npm:bar", "bar", "foo", None, id="alias_no_version"),
+        pytest.param("foo@npm:@scope/bar@1.0.0", "@scope/bar", "foo", None, id="alias_scoped"),
+        pytest.param("@s/foo@npm:@t/bar@1, @s/foo@npm:@t/bar@2", "@t/bar", "@s/foo", None),
+        pytest.param("foo@npm:bar@file:../baz", "bar", "foo", "../baz", id="alias_path"),
+        pytest.param("foo@file:bar", "foo", None, "bar", id="file"),
+        pytest.param("foo@link:bar", "foo", None, "bar", id="link"),
+        pytest.param("foo@./bar", "foo", None, "bar", id="relative"),
+        pytest.param("foo@/bar", "foo", None, "/bar", id="absolute"),
+        pytest.param("foo@https://example.org/foo.tgz", "foo", None, None, id="url"),
+        pytest.param("foo@npm-bar", "foo", None, None, id="not_alias"),
+    ],
+)
+def test_package_key_shapes(key, expected_name, expected_alias, expected_path):
+    package = lockfile.Package.from_dict(key, {"version": "1.0.0"})
+    assert package.name == expected_name
+    assert package.alias == expected_alias
+    assert package.path == expected_path
+
+
+@pytest.mark.parametrize("key", ["", "@", "foo@npm:", "foo@npm:@"])
+def test_package_invalid_key(key):
+    with pytest.raises(ValueError, match="Unexpected format"):
+        lockfile.Package.from_dict(key, {"version": "1.0.0"})
+
+
+def test_resolve(test_data_dir: Path):
+    lock = lockfile.Lockfile.from_file(test_data_dir / "sample.lock")
+
+    acorn = lock.resolve("acorn", "^5.5.0")
+    assert acorn is not None
+    assert (acorn.name, acorn.version) == ("acorn", "5.7.1")
+    assert (
+        lock.key_for("acorn", "5.X")
+        == "acorn@5.X, acorn@^5.0.0, acorn@^5.0.3, acorn@^5.5.0, acorn@^5.5.3"
+    )
+    babel = lock.resolve("@babel/code-frame", "^7.0.0-beta.35")
+    assert babel is not None
+    assert babel.version == "7.0.0-beta.55"
+    assert lock.resolve("acorn", "^6.0.0") is None
+    assert lock.resolve("nope", "^5.5.0") is None
+
+
+def test_resolve_alias(test_data_dir: Path):
+    lock = lockfile.Lockfile.from_file(test_data_dir / "aliases.lock")
+    lodash = lock.resolve("lodash", "npm:@elastic/lodash@3.10.1-kibana1")
+    assert lodash is not None
+    assert (lodash.name, lodash.alias) == ("@elastic/lodash", "lodash")
+    fecha = lock.resolve("fecha", "^4.0.0")
+    assert fecha is not None
+    assert fecha.version == "4.2.3"
+
+
+def test_resolve_after_changes():
+    lock = lockfile.Lockfile("1", {"foo@^1.0.0, foo@^1.1.0": {"version": "1.1.0"}})
+    assert lock.key_for("foo", "^1.1.0") == "foo@^1.0.0, foo@^1.1.0"
+
+    # Entries changed in place are resolved as they are now
+    lock.data["foo@^1.0.0, foo@^1.1.0"]["version"] = "1.2.0"
+    assert lock.resolve("foo", "^1.1.0").version == "1.2.0"  # type: ignore[union-attr]
+
+    del lock.data["foo@^1.0.0, foo@^1.1.0"]
+    assert lock.resolve("foo", "^1.1.0") is None
+
+    lock.data["foo@^1.1.0"] = {"version": "1.3.0"}
+    assert lock.resolve("foo", "^1.1.0").version == "1.3.0"  # type: ignore[union-attr]
+
+    lock.data.update({"foo@^1.0.0": {"version": "1.0.0"}})
+    assert lock.resolve("foo", "^1.0.0").version == "1.0.0"  # type: ignore[union-attr]
+
+    lock.data.pop("foo@^1.0.0")
+    assert lock.resolve("foo", "^1.0.0") is None
+
+    lock.data = {"foo@^2.0.0": {"version": "2.0.0"}}
+    assert lock.resolve("foo", "^1.1.0") is None
+    assert lock.resolve("foo", "^2.0.0").version == "2.0.0"  # type: ignore[union-attr]
+
+    lock.data.clear()
+    assert lock.resolve("foo", "^2.0.0") is None
+
+
+def test_resolve_after_keys_replaced():
+    lock = lockfile.Lockfile("1", {"foo@^1.0.0": {"version": "1.0.0"}})
+    assert lock.key_for("foo", "^1.0.0") == "foo@^1.0.0"
+
+    # Same number of entries, different keys: a stale key found is detected
+    del lock.data["foo@^1.0.0"]
+    lock.data["foo@^2.0.0"] = {"version": "2.0.0"}
+    assert lock.key_for("foo", "^1.0.0") is None
+    assert lock.resolve("foo", "^2.0.0").version == "2.0.0"  # type: ignore[union-attr]
+
+    # Misses do not rebuild the index, new keys need invalidate()
+    del lock.data["foo@^2.0.0"]
+    lock.data["foo@^3.0.0"] = {"version": "3.0.0"}
+    assert lock.key_for("foo", "^3.0.0") is None
+    lock.invalidate()
+    assert lock.key_for("foo", "^3.0.0") == "foo@^3.0.0"
+
+
+def test_data_is_the_given_dict():
+    data = {"foo@1": {"version": "1.0.0"}}
+    lock = lockfile.Lockfile("1", data)
+    assert lock.data is data
+    assert lock.key_for("foo", "1") == "foo@1"
+    data["bar@1"] = {"version": "1.0.0"}
+    assert lock.key_for("bar", "1") == "bar@1"
+    assert marshal.loads(marshal.dumps(lock.data)) == data
+
+    restored = pickle.loads(pickle.dumps(lock))
+    assert restored.data == data
+    restored.data["baz@1"] = {"version": "1.0.0"}
+    assert restored.key_for("baz", "1") == "baz@1"
+
+
+@pytest.mark.parametrize("backend", ["ply", "direct"])
+def test_from_file_mmap(all_test_files: List[Path], backend: str) -> None:
+    for test_file in all_test_files:
+        expected = lockfile.Lockfile.from_file(test_file)
+        mapped = lockfile.Lockfile.from_file(test_file, mmap=True, backend=backend)
+        assert mapped.version == expected.version
+        assert mapped.data == expected.data
+
+
+@pytest.mark.parametrize("backend", ["ply", "direct"])
+def test_from_file_mmap_newlines(tmp_path: Path, backend: str) -> None:
+    path = tmp_path / "yarn.lock"
+    path.write_bytes(b'# yarn lockfile v1\r\n\r\nfoo:\r\n  bar "baz"\r\n')
+    mapped = lockfile.Lockfile.from_file(path, mmap=True, backend=backend)
+    assert mapped.version == "1"
+    assert mapped.data == {"foo": {"bar": "baz"}}
+
+
+@pytest.mark.parametrize("backend", ["ply", "direct"])
+def test_from_file_mmap_empty(tmp_path: Path, backend: str) -> None:
+    path = tmp_path / "yarn.lock"
+    path.touch()
+    with pytest.raises(ValueError):
+        lockfile.Lockfile.from_file(path, mmap=True, backend=backend)
+
+
+def test_save_incremental(tmp_path: Path) -> None:
+    path = tmp_path / "yarn.lock"
+    content = (
+        "# THIS IS AN AUTOGENERATED FILE. DO NOT EDIT THIS FILE DIRECTLY.\n"
+        "# yarn lockfile v1\n"
+        "\n"
+        "\n"
+        'foo@^1.0.0:\n  version "1.0.0"\n'
+        "\n"
+        'bar@^2.0.0:\n  version "2.0.0"\n'
+    )
+    path.write_text(content)
+
+    lock = lockfile.Lockfile.from_file(path, keep_source=True)
+    assert lock.version == "1"
+    lock.save_incremental(path)
+    assert path.read_text() == content
+
+    lock.data["bar@^2.0.0"]["version"] = "2.0.1"
+    lock.save_incremental(path)
+    assert path.read_text() == content.replace('version "2.0.0"', 'version "2.0.1"')
+
+    del lock.data["foo@^1.0.0"]
+    lock.data["baz@^3.0.0"] = {"version": "3.0.0"}
+    lock.save_incremental(path)
+    assert path.read_text() == (
+        "# THIS IS AN AUTOGENERATED FILE. DO NOT EDIT THIS FILE DIRECTLY.\n"
+        "# yarn lockfile v1\n"
+        "\n"
+        'bar@^2.0.0:\n  version "2.0.1"\n'
+        "\n"
+        'baz@^3.0.0:\n  version "3.0.0"\n'
+    )
+
+
+def test_save_incremental_type_change(tmp_path: Path) -> None:
+    # 1 == True in Python, the change must still be saved
+    path = tmp_path / "yarn.lock"
+    path.write_text("foo:\n  x 1\n  y 2\n")
+    lock = lockfile.Lockfile.from_file(path, keep_source=True)
+    lock.data["foo"]["x"] = True
+    lock.save_incremental(path)
+    assert path.read_text() == "foo:\n  x true\n  y 2\n"
+
+
+def test_save_incremental_without_source(tmp_path: Path) -> None:
+    path = tmp_path / "yarn.lock"
+    lockfile.Lockfile("1", DATA_TO_DUMP).save_incremental(path)
+    assert path.read_text() == EXPECTED_CONTENT
+
+
+def test_save_incremental_test_files(all_test_files: List[Path], tmp_path: Path) -> None:
+    for test_file in all_test_files:
+        lock = lockfile.Lockfile.from_file(test_file, keep_source=True)
+        assert lock.data == lockfile.Lockfile.from_file(test_file).data
+        out_file = tmp_path / test_file.name
+        lock.save_incremental(out_file)
+        assert out_file.read_text() == test_file.read_text()
+
+
+ONLY_LOCKFILE = dedent(
+    """
+    # yarn lockfile v1
+
+    "@babel/core@^7.0.0", "@babel/core@^7.1.0":
+      version "7.1.0"
+
+    lodash@^4.17.0:
+      version "4.17.21"
+      dependencies:
+        foo "^1.0.0"
+
+    "underscore@npm:lodash@^4.0.0":
+      version "4.0.0"
+
+    foo@^1.0.0:
+      version "1.0.0"
+    """
+)
+
+
+@pytest.mark.parametrize(
+    "only, expected_keys",
+    [
+        ({"lodash"}, ["lodash@^4.17.0", "underscore@npm:lodash@^4.0.0"]),
+        (["@babel/core", "foo"], ["@babel/core@^7.0.0, @babel/core@^7.1.0", "foo@^1.0.0"]),
+        ("underscore", ["underscore@npm:lodash@^4.0.0"]),
+        (lambda name: name.startswith("@"), ["@babel/core@^7.0.0, @babel/core@^7.1.0"]),
+        (set(), []),
+    ],
+)
+def test_from_str_only(only: Any, expected_keys: List[str], tmp_path: Path) -> None:
+    full = lockfile.Lockfile.from_str(ONLY_LOCKFILE)
+    expected = {key: full.data[key] for key in expected_keys}
+
+    lock = lockfile.Lockfile.from_str(ONLY_LOCKFILE, only=only)
+    assert lock.version == "1"
+    assert lock.data == expected
+
+    path = tmp_path / "yarn.lock"
+    path.write_text(ONLY_LOCKFILE)
+    assert lockfile.Lockfile.from_file(path, only=only).data == expected
+
+
+def test_from_str_only_error_line() -> None:
+    with pytest.raises(ValueError, match="8: Invalid token @"):
+        lockfile.Lockfile.from_str("foo:\n  a b\n  c d\n\nbar:\n  e f\n\n@", only={"bar"})
+
+
+@pytest.mark.parametrize(
+    "options, error",
+    [
+        ({"keep_source": True, "only": {"foo"}}, "keep_source and only"),
+        ({"only": {"foo"}, "jobs": 2}, "only and jobs"),
+        ({"keep_source": True, "jobs": 2}, "keep_source and jobs"),
+        ({"mmap": True, "jobs": 2}, "jobs and mmap"),
+        ({"mmap": True, "only": {"foo"}}, "only and mmap"),
+        ({"only": {"foo"}, "cache": True}, "cache and only"),
+        ({"keep_source": True, "cache": True}, "cache and keep_source"),
+        ({"mmap": True, "cache": True}, "cache and mmap"),
+        ({"backend": "direct", "tokenizer": "scanner"}, "tokenizer and the direct backend"),
+        ({"backend": "direct", "engine": True}, "engine and the direct backend"),
+        ({"only": {"foo"}, "engine": True}, "engine and only"),
+        ({"keep_source": True, "tokenizer": "scanner"}, "tokenizer and keep_source"),
+        ({"jobs": 2, "engine": True}, "engine and jobs"),
+    ],
+)
+def test_from_file_conflicting_options(options: Dict[str, Any], error: str, tmp_path: Path) -> None:
+    path = tmp_path / "yarn.lock"
+    path.write_text(ONLY_LOCKFILE)
+    if options.get("cache"):
+        options["cache"] = ParseCache(tmp_path / "cache")
+    if options.get("engine"):
+        options["engine"] = lockfile.Lockfile.parser()
+
+    with pytest.raises(ValueError, match=f"Cannot combine {error}"):
+        lockfile.Lockfile.from_file(path, **options)
+    if not {"cache", "mmap"} & set(options):
+        with pytest.raises(ValueError, match=f"Cannot combine {error}"):
+            lockfile.Lockfile.from_str(ONLY_LOCKFILE, **options)
+
+
+def test_from_file_compatible_options(test_data_dir: Path, tmp_path: Path) -> None:
+    path = test_data_dir / "sample.lock"
+    expected = lockfile.Lockfile.from_file(path).data
+    engine = lockfile.Lockfile.parser()
+    cache = ParseCache(tmp_path / "cache")
+    combinations: List[Dict[str, Any]] = [
+        {"mmap": True, "engine": engine},
+        {"mmap": True, "backend": "direct"},
+        {"jobs": 2, "cache": cache, "backend": "direct"},
+        {"cache": cache, "engine": engine, "tokenizer": "scanner"},
+    ]
+    for options in combinations:
+        assert lockfile.Lockfile.from_file(path, **options).data == expected
+
+
+def test_afrom_file(all_test_files: List[Path]) -> None:
+    for test_file in all_test_files:
+        expected = lockfile.Lockfile.from_file(test_file)
+        lock = asyncio.run(lockfile.Lockfile.afrom_file(test_file))
+        assert lock.version == expected.version
+        assert lock.data == expected.data
+
+
+def test_aiter_packages(test_data_dir: Path) -> None:
+    path = test_data_dir / "sample.lock"
+
+    async def collect() -> List[lockfile.Package]:
+        return [package async for package in lockfile.Lockfile.aiter_packages(path)]
+
+    packages = asyncio.run(collect())
+    expected = lockfile.Lockfile.from_file(path).packages()
+    assert [(p.name, p.version, p.url) for p in packages] == [
+        (p.name, p.version, p.url) for p in expected
+    ]
+
+
+def test_from_file_jobs(all_test_files: List[Path], tmp_path: Path) -> None:
+    cache = ParseCache(tmp_path / "cache")
+    for test_file in all_test_files:
+        expected = lockfile.Lockfile.from_file(test_file)
+        for lock in (
+            lockfile.Lockfile.from_file(test_file, jobs=2),
+            lockfile.Lockfile.from_file(test_file, jobs=2, cache=cache),
+        ):
+            assert lock.version == expected.version
+            assert lock.data == expected.data
@@ -0,0 +1,105 @@
+"""
+Copyright (C) 2020  Red Hat, Inc
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from pyarn import direct, parallel
+
+CONTENT = """\
+
+
+# yarn lockfile v1
+
+foo@^1.0.0:
+  version "1.0.0"
+  dependencies:
+    bar "^2.0.0"
+
+# Comment
+bar@^2.0.0:
+  version "2.0.1"
+
+foo@^1.0.0:
+  version "1.0.1"
+
+baz "qux"
+"""
+
+
+@pytest.mark.parametrize("chunks", [1, 2, 3, 5, 100])
+def test_split_points(chunks: int) -> None:
+    points = parallel.split_points(CONTENT, chunks)
+    assert points[0] == 0
+    assert points == sorted(set(points))
+    assert 1 <= len(points) <= chunks
+    for point in points[1:]:
+        assert CONTENT[point - 2 : point] == "\n\n"
+        assert not CONTENT[point].isspace()
+
+
+def test_split_points_blank() -> None:
+    assert parallel.split_points("", 4) == [0]
+    assert parallel.split_points("\n\n\n", 4) == [0]
+    # Leading blank lines are not a chunk of their own
+    assert parallel.split_points("\n\nfoo bar\n", 4) == [0]
+
+
+@pytest.mark.parametrize("newline", ["\n", "\r\n"])
+@pytest.mark.parametrize("jobs", [1, 2, 4])
+def test_parse(newline: str, jobs: int) -> None:
+    content = CONTENT.replace("\n", newline)
+    parsed = parallel.parse(content, jobs, min_chunk_size=1)
+    expected = direct.parse(content)
+    assert parsed == expected
+    assert list(parsed["data"]) == list(expected["data"])
+    assert parsed["data"]["foo@^1.0.0"] == {"version": "1.0.1"}
+
+
+def test_parse_all_files(all_test_files: List[Path]) -> None:
+    for test_file in all_test_files:
+        content = test_file.read_text()
+        assert parallel.parse(content, 3, min_chunk_size=1) == direct.parse(content)
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        'foo:\n  bar "baz"\n\nqux:\n  a b\n\n@\n',
+        'foo:\n  bar "baz"\n\nqux:\n    a b\n\nquux:\n  c d\n',
+    ],
+)
+def test_parse_errors(content: str) -> None:
+    with pytest.raises(Exception) as expected:
+        direct.parse(content)
+    with pytest.raises(expected.type, match=str(expected.value)):
+        parallel.parse(content, 3, min_chunk_size=1)
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        # Values after their key and blank lines, split points that are not block starts
+        'aaaa "b"\nfoo\n\n"bar"\n',
+        'aaaa\n\n"b"\n\nfoo\n\n\n"bar"\n\nbaz:\n  a b\n',
+    ],
+)
+def test_parse_value_after_blank_lines(content: str) -> None:
+    expected = direct.parse(content)
+    for jobs in (2, 3, 8):
+        assert parallel.parse(content, jobs, min_chunk_size=1) == expected
@@ -17,10 +17,22 @@ along with this program.  If not, see <https://www.gnu.org/licenses/>.
 import pytest
 from ply import lex, yacc
 
-from pyarn import lexer, parser
+from pyarn import direct, lexer, parser
 from pyarn.lexer_wrapper import Wrapper
 
 
+def ply_parse(data):
+    lex_wrapper = Wrapper(lex.lex(module=lexer))
+    test_parser = yacc.yacc(module=parser, write_tables=False, debug=False)
+    return test_parser.parse(data, lexer=lex_wrapper)
+
+
+PARSERS = [
+    pytest.param(ply_parse, id="ply"),
+    pytest.param(direct.parse, id="direct"),
+]
+
+
 @pytest.mark.parametrize(
     "data, expected_result",
     [
@@ -76,10 +88,9 @@ from pyarn.lexer_wrapper import Wrapper
         ('foo "false"\n', {"data": {"foo": "false"}, "comments": []}),
     ],
 )
-def test_parser(data, expected_result):
-    lex_wrapper = Wrapper(lex.lex(module=lexer))
-    test_parser = yacc.yacc(module=parser)
-    result = test_parser.parse(data, lexer=lex_wrapper)
+@pytest.mark.parametrize("parse", PARSERS)
+def test_parser(data, expected_result, parse):
+    result = parse(data)
     assert result == expected_result
 
 
@@ -88,20 +99,56 @@ def test_parser(data, expected_result):
     [
         # wrong indentation
         ('foo:\n  bar:\n  foo "bar"'),
+        # empty input
+        (""),
+        ("\n"),
+        # missing values or members
+        ("foo"),
+        ("foo:"),
+        ("foo:\nbar baz"),
+        ("foo, bar"),
+        ("foo, bar:"),
+        ("foo, bar baz"),
+        ("foo:\n  bar"),
+        ("foo:\n  bar:\n"),
+        # not keys
+        ("1 foo"),
+        ("true foo"),
+        (":"),
+        (", foo"),
+        ("foo:\n  1 bar"),
+        ("foo:\n  , bar"),
+        # comments inside blocks
+        ("foo:\n  # comment\n  bar baz"),
+        ("foo:\n  bar baz\n  # comment"),
+        # blank lines inside blocks
+        ("foo:\n  bar baz\n\n  qux quux"),
+        # keys with quoted commas
+        ('"foo, bar":\n  version "1.0.0"'),
+        ('foo, "foo, bar":\n  version "1.0.0"'),
+        ('foo:\n  "foo, bar":\n    version "1.0.0"'),
     ],
 )
-def test_parser_error(data):
-    lex_wrapper = Wrapper(lex.lex(module=lexer))
-    test_parser = yacc.yacc(module=parser)
+@pytest.mark.parametrize("parse", PARSERS)
+def test_parser_error(data, parse):
     with pytest.raises(ValueError):
-        test_parser.parse(data, lexer=lex_wrapper)
+        parse(data)
 
 
 def test_regressions(all_test_files):
     lex_wrapper = Wrapper(lex.lex(module=lexer))
-    test_parser = yacc.yacc(module=parser)
+    test_parser = yacc.yacc(module=parser, write_tables=False, debug=False)
 
     for test_file in all_test_files:
         with open(test_file, "r") as tf:
             data = tf.read()
-        test_parser.parse(data, lexer=lex_wrapper)
+        result = test_parser.parse(data, lexer=lex_wrapper)
+        assert direct.parse(data) == result
+
+
+@pytest.mark.parametrize("parse", PARSERS)
+def test_parser_member_order(parse):
+    data = "a:\n  dependencies:\n    x y\n    z w\n  version v\n  resolved r\n"
+    result = parse(data)
+    assert list(result["data"]["a"]) == ["dependencies", "version", "resolved"]
+    assert list(result["data"]["a"]["dependencies"]) == ["x", "z"]
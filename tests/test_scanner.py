@@ -0,0 +1,175 @@
+"""
+Copyright (C) 2020  Red Hat, Inc
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import io
+from typing import Any, List, Optional, Tuple
+
+import pytest
+from ply import lex
+
+from pyarn import lexer, lockfile
+from pyarn.engine import ParserEngine
+from pyarn.lexer_wrapper import Wrapper
+from pyarn.scanner import Scanner, Token, tokenize, tokenize_lines
+
+
+def ply_tokens(data):
+    ply_lexer = Wrapper(lex.lex(module=lexer))
+    ply_lexer.input(data)
+    # The extra DEDENTs added by the wrapper do not have a line number
+    return [(t.type, t.value, getattr(t, "lineno", None)) for t in ply_lexer]
+
+
+def scanner_tokens(data):
+    scanner = Scanner()
+    scanner.input(data)
+    tokens: List[Tuple[str, Any, Optional[int]]]
+    tokens = [(t.type, t.value, t.lineno) for t in scanner]
+    for i in range(1, len(tokens)):
+        if tokens[i][0] == tokens[i - 1][0] == "DEDENT":
+            tokens[i] = ("DEDENT", 1, None)
+    return tokens
+
+
+def test_data_files(all_test_files):
+    for test_file in all_test_files:
+        data = test_file.read_text()
+        assert scanner_tokens(data) == ply_tokens(data)
+        crlf_data = data.replace("\n", "\r\n")
+        assert scanner_tokens(crlf_data) == ply_tokens(crlf_data)
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        "",
+        "\n\n",
+        "  foo bar",
+        "foo   bar\n",
+        "foo:\n   bar baz\n",
+        "foo:\n  bar:\n    baz 1\n\n\nqux:\n  a b",
+        "foo:\n  bar:\n    baz 1\n  qux true",
+        "# comment\r\n",
+        "foo:\r\n  bar baz\r\n",
+        'foo "a, b: c"',
+        "123abc 1.0.0",
+        "truefalse true-false",
+        "foo ,:,",
+        "föö bär",
+        "foo:\n  # indented comment\n",
+    ],
+)
+def test_same_tokens(data):
+    assert scanner_tokens(data) == ply_tokens(data)
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        "foo\rbar",
+        "foo bar\r",
+        "foo:\n\tbar",
+        "foo:\n  bar\tbaz\nqux",
+        '"foo bar',
+        "foo:\n    bar baz",
+    ],
+)
+def test_same_errors(data):
+    with pytest.raises((ValueError, SyntaxError)) as ply_exc:
+        ply_tokens(data)
+    with pytest.raises(ply_exc.type) as exc:
+        scanner_tokens(data)
+    assert str(exc.value) == str(ply_exc.value)
+
+
+def test_tokenize():
+    assert list(tokenize("foo:\n  bar:\n    baz 1", split_dedents=False, lineno=10)) == [
+        ("STRING", "foo", 10),
+        ("COLON", ":", 10),
+        ("INDENT", 1, 10),
+        ("STRING", "bar", 11),
+        ("COLON", ":", 11),
+        ("INDENT", 2, 11),
+        ("STRING", "baz", 12),
+        ("NUMBER", 1, 12),
+        ("DEDENT", 2, 12),
+    ]
+
+
+def test_token_fields():
+    scanner = Scanner()
+    scanner.input('foo "bar"')
+    token = scanner.token()
+    assert token == Token("STRING", "foo", 1)
+    assert (token.type, token.value, token.lineno) == ("STRING", "foo", 1)
+    assert scanner.token() == Token("STRING", "bar", 1)
+    assert scanner.token() is None
+
+
+def test_from_str_with_scanner(all_test_files):
+    for test_file in all_test_files:
+        data = test_file.read_text()
+        lock = lockfile.Lockfile.from_str(data, tokenizer="scanner")
+        assert lock.data == lockfile.Lockfile.from_str(data).data
+
+
+def test_parse_error_with_scanner():
+    with pytest.raises(ValueError, match="error parsing Token"):
+        lockfile.Lockfile.from_str('foo:\n  bar:\n  foo "bar"', tokenizer="scanner")
+
+
+def test_unknown_tokenizer():
+    with pytest.raises(ValueError, match="Unknown tokenizer: foo"):
+        lockfile.Lockfile.from_str('foo "bar"', tokenizer="foo")
+    with pytest.raises(ValueError, match="Unknown tokenizer: foo"):
+        ParserEngine().parse('foo "bar"', tokenizer="foo")
+
+
+@pytest.mark.parametrize("data", ["", "\n", "foo:\n  bar baz", "foo:\n  bar baz\n", "# c\r\nfoo 1"])
+def test_tokenize_lines(data):
+    lines = data.splitlines(keepends=True)
+    assert list(tokenize_lines(lines)) == list(tokenize(data))
+
+
+def test_tokenize_skip_block():
+    data = "foo:\n  a b\n  c:\n    d e\n\nbar:\n  f g\n# comment\nbaz 1\n"
+    tokens = list(tokenize(data, skip_block=lambda line: line.startswith("foo")))
+    assert tokens == [
+        ("STRING", "bar", 6),
+        ("COLON", ":", 6),
+        ("INDENT", 1, 6),
+        ("STRING", "f", 7),
+        ("STRING", "g", 7),
+        ("DEDENT", 1, 7),
+        ("COMMENT", "# comment", 8),
+        ("STRING", "baz", 9),
+        ("NUMBER", 1, 9),
+    ]
+    assert list(tokenize_lines(io.StringIO(data), skip_block=lambda line: "foo" in line)) == tokens
+
+
+def test_tokenize_skip_block_closes_blocks():
+    # The block before a skipped one is closed, the skipped one is not tokenized at all
+    data = "foo:\n  a b\nbar:\n  @\n"
+    tokens = list(tokenize(data, skip_block=lambda line: line.startswith("bar")))
+    assert tokens == [
+        ("STRING", "foo", 1),
+        ("COLON", ":", 1),
+        ("INDENT", 1, 1),
+        ("STRING", "a", 2),
+        ("STRING", "b", 2),
+        ("DEDENT", 1, 2),
+    ]
@@ -0,0 +1,137 @@
+"""
+Copyright (C) 2020  Red Hat, Inc
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import struct
+from pathlib import Path
+from typing import Any, Dict, List
+
+import pytest
+
+from pyarn import snapshot
+from pyarn.lockfile import Lockfile
+
+DATA: Dict[str, Any] = {
+    "foo@^1.0.0": {
+        "version": "1.0.0",
+        "dependencies": {"bar": "^2.0.0", "": ""},
+        "optional": True,
+        "bundled": False,
+        "count": 42,
+        "big": -(2**40),
+        "nothing": None,
+    },
+    "bar@^2.0.0": {"version": "2.0.0", "nested": {"a": {"b": {"c": "d"}}, "e": {}}},
+    "é@^1.0.0": {"version": "1.0.0", "description": "ünïcödé\nline"},
+    # A key that is also a substring of other strings
+    "1.0.0": "version",
+    "top": "level",
+}
+
+
+@pytest.fixture
+def snapshot_path(tmp_path: Path) -> Path:
+    path = tmp_path / "yarn.lock.snapshot"
+    snapshot.dump(path, "1", DATA)
+    return path
+
+
+def test_round_trip_all_files(all_test_files: List[Path], tmp_path: Path) -> None:
+    path = tmp_path / "yarn.lock.snapshot"
+    for test_file in all_test_files:
+        lock = Lockfile.from_file(test_file)
+        lock.dump_snapshot(path)
+
+        loaded = Lockfile.load_snapshot(path)
+        assert loaded.version == lock.version
+        assert loaded.data == lock.data
+        assert list(loaded.data) == list(lock.data)
+
+        with snapshot.Snapshot(path) as mapped:
+            assert mapped.version == lock.version
+            assert list(mapped) == list(lock.data)
+            assert mapped.to_dict() == lock.data
+            for key, value in lock.data.items():
+                assert mapped[key] == value
+
+
+def test_round_trip(snapshot_path: Path) -> None:
+    assert snapshot.load(snapshot_path) == ("1", DATA)
+    with snapshot.Snapshot(snapshot_path) as mapped:
+        assert len(mapped) == len(DATA)
+        assert dict(mapped) == DATA
+
+
+def test_strings_are_shared(snapshot_path: Path) -> None:
+    _, data = snapshot.load(snapshot_path)
+    assert data["foo@^1.0.0"]["version"] is data["é@^1.0.0"]["version"]
+
+
+@pytest.mark.parametrize("key", ["1.0.0", "top", "é@^1.0.0", "bar@^2.0.0"])
+def test_snapshot_lookup(snapshot_path: Path, key: str) -> None:
+    with snapshot.Snapshot(snapshot_path) as mapped:
+        assert key in mapped
+        assert mapped[key] == DATA[key]
+
+
+def test_snapshot_missing_keys(snapshot_path: Path) -> None:
+    with snapshot.Snapshot(snapshot_path) as mapped:
+        # Strings of the snapshot that are not keys, and unknown strings
+        for key in ("version", "1.0", "", "qux", 1):
+            assert key not in mapped
+        with pytest.raises(KeyError):
+            mapped["version"]
+        assert mapped.get("qux") is None
+
+
+def test_snapshot_index(snapshot_path: Path) -> None:
+    with snapshot.Snapshot(snapshot_path) as mapped:
+        for _ in range(snapshot.SEARCHES + 2):
+            assert mapped["top"] == "level"
+            assert "qux" not in mapped
+        assert mapped._index is not None
+
+
+def test_empty(tmp_path: Path) -> None:
+    path = tmp_path / "empty.snapshot"
+    snapshot.dump(path, "unknown", {})
+    assert snapshot.load(path) == ("unknown", {})
+    with snapshot.Snapshot(path) as mapped:
+        assert len(mapped) == 0
+        assert "foo" not in mapped
+
+
+def test_unsupported_value(tmp_path: Path) -> None:
+    with pytest.raises(TypeError, match="Cannot store a value of type list"):
+        snapshot.dump(tmp_path / "x.snapshot", "1", {"foo": {"bar": [1, 2]}})
+
+
+def test_invalid_files(snapshot_path: Path, tmp_path: Path) -> None:
+    content = snapshot_path.read_bytes()
+    path = tmp_path / "invalid.snapshot"
+
+    path.write_bytes(b"# yarn lockfile v1\n")
+    with pytest.raises(ValueError, match="Not a pyarn snapshot"):
+        snapshot.load(path)
+
+    path.write_bytes(content[:8] + struct.pack("<I", snapshot.FORMAT_VERSION + 1) + content[12:])
+    with pytest.raises(ValueError, match="Unsupported snapshot format version"):
+        snapshot.load(path)
+    with pytest.raises(ValueError, match="Unsupported snapshot format version"):
+        snapshot.Snapshot(path)
+
+    path.write_bytes(content[:-16])
+    with pytest.raises(ValueError, match="Truncated pyarn snapshot"):
+        snapshot.load(path)
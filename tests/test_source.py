@@ -0,0 +1,121 @@
+"""
+Copyright (C) 2020  Red Hat, Inc
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from pathlib import Path
+from typing import Any, List
+
+from pyarn import direct, lockfile
+from pyarn.source import Source
+
+CONTENT = (
+    "# yarn lockfile v1\n"
+    "\n"
+    "\n"
+    "foo@^1.0.0:\n"
+    '  version "1.0.0"\n'
+    "  dependencies:\n"
+    '    bar "^2.0.0"\n'
+    "\n"
+    "# A comment\n"
+    "bar@^2.0.0:\n"
+    '  version "2.0.0"\n'
+    "\n"
+    'baz "qux"'
+)
+
+
+def serialize(key: str, value: Any) -> str:
+    return lockfile.Lockfile("1", {key: value}).to_str().split("\n\n", 1)[1]
+
+
+def test_parse() -> None:
+    parsed, source = Source.parse(CONTENT)
+    assert parsed == direct.parse(CONTENT)
+    assert [source.text[start:end] for _, start, end in source.blocks] == [
+        "# yarn lockfile v1\n",
+        'foo@^1.0.0:\n  version "1.0.0"\n  dependencies:\n    bar "^2.0.0"\n',
+        "# A comment\n",
+        'bar@^2.0.0:\n  version "2.0.0"\n',
+        'baz "qux"',
+    ]
+    assert [block.key for block in source.blocks] == [
+        None,
+        "foo@^1.0.0",
+        None,
+        "bar@^2.0.0",
+        "baz",
+    ]
+
+
+def test_parse_test_files(all_test_files: List[Path]) -> None:
+    for test_file in all_test_files:
+        text = test_file.read_text()
+        parsed, source = Source.parse(text)
+        assert parsed == direct.parse(text)
+        # The blocks and the text between them make up the whole file
+        end = 0
+        for _, start, block_end in source.blocks:
+            assert text[end:start].strip() == ""
+            end = block_end
+        assert text[end:].strip() == ""
+
+
+def test_update_unchanged() -> None:
+    parsed, source = Source.parse(CONTENT)
+    blocks = source.blocks
+    source.update(parsed["data"], serialize)
+    assert source.text == CONTENT
+    assert source.blocks == blocks
+
+
+def test_update_changes() -> None:
+    parsed, source = Source.parse(CONTENT)
+    data = parsed["data"]
+    data["bar@^2.0.0"]["version"] = "2.0.1"
+    del data["foo@^1.0.0"]
+    data["new@^3.0.0"] = {"version": "3.0.0"}
+
+    source.update(data, serialize)
+    assert source.text == (
+        "# yarn lockfile v1\n"
+        "\n"
+        "# A comment\n"
+        "bar@^2.0.0:\n"
+        '  version "2.0.1"\n'
+        "\n"
+        'baz "qux"\n'
+        "\n"
+        "new@^3.0.0:\n"
+        '  version "3.0.0"\n'
+    )
+    assert direct.parse(source.text)["data"] == data
+    for key, start, end in source.blocks:
+        if key is not None:
+            assert direct.parse(source.text[start:end])["data"] == {key: data[key]}
+
+    # Later changes are compared to the updated source
+    text = source.text
+    data["baz"] = "quux"
+    source.update(data, serialize)
+    assert source.text == text.replace("qux", "quux")
+
+
+def test_update_duplicate_keys() -> None:
+    content = 'foo "bar"\n\nfoo "baz"\n'
+    parsed, source = Source.parse(content)
+    assert parsed["data"] == {"foo": "baz"}
+    source.update(parsed["data"], serialize)
+    assert source.text == 'foo "baz"\n'
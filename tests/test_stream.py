@@ -0,0 +1,171 @@
+"""
+Copyright (C) 2020  Red Hat, Inc
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+import io
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from pyarn import lockfile
+from pyarn.stream import (
+    Comment,
+    Entry,
+    aiter_entries,
+    iter_buffer_lines,
+    iter_entries,
+    mapped_lines,
+)
+
+
+def test_iter_entries(all_test_files):
+    for test_file in all_test_files:
+        expected = lockfile.Lockfile.from_file(test_file)
+        events = list(iter_entries(test_file))
+        assert dict(e for e in events if isinstance(e, Entry)) == expected.data
+        comments = [e.text for e in events if isinstance(e, Comment)]
+        assert (lockfile.V1_VERSION_COMMENT in comments) == (expected.version == "1")
+
+
+def test_iter_entries_file_object():
+    source = io.StringIO('# comment\nfoo:\n  bar "baz"\n\nqux "quux"\n')
+    assert list(iter_entries(source)) == [
+        Comment("# comment"),
+        Entry("foo", {"bar": "baz"}),
+        Entry("qux", "quux"),
+    ]
+
+
+class _Lines:
+    """Lines of a lockfile, recording how far they have been read."""
+
+    def __init__(self, content):
+        self.lines = content.splitlines(keepends=True)
+        self.read = 0
+
+    def __iter__(self):
+        for line in self.lines:
+            self.read += 1
+            yield line
+
+
+def test_iter_entries_incremental():
+    source = _Lines('foo:\n  bar "baz"\n\nqux:\n  a b\n\n@')
+    events = iter_entries(source)  # type: ignore[arg-type]
+    assert next(events) == Entry("foo", {"bar": "baz"})
+    # Reading stops at the line that ends the block
+    assert source.read == 3
+    assert next(events) == Entry("qux", {"a": "b"})
+    assert source.read == 6
+    with pytest.raises(ValueError, match="7: Invalid token @"):
+        next(events)
+
+
+async def _collect(path, **kwargs):
+    return [event async for event in aiter_entries(path, **kwargs)]
+
+
+@pytest.mark.parametrize("batch_size", [1, 2, 256])
+def test_aiter_entries(all_test_files, batch_size):
+    for test_file in all_test_files:
+        events = asyncio.run(_collect(test_file, batch_size=batch_size))
+        assert events == list(iter_entries(test_file))
+
+
+def test_aiter_entries_executor(tmp_path):
+    path = tmp_path / "yarn.lock"
+    path.write_text("# comment\nfoo:\n  bar baz\n")
+    with ThreadPoolExecutor(1) as executor:
+        events = asyncio.run(_collect(path, executor=executor))
+    assert events == [Comment("# comment"), Entry("foo", {"bar": "baz"})]
+
+
+def test_aiter_entries_concurrent(tmp_path):
+    paths = []
+    for i in range(4):
+        paths.append(tmp_path / f"{i}.lock")
+        paths[-1].write_text("".join(f"pkg{i}-{j}:\n  version {j}\n\n" for j in range(20)))
+    order = []
+
+    async def consume(path):
+        async for event in aiter_entries(path, batch_size=5):
+            order.append(path)
+        return event
+
+    async def main():
+        return await asyncio.gather(*(consume(path) for path in paths))
+
+    assert asyncio.run(main()) == [Entry(f"pkg{i}-19", {"version": 19}) for i in range(4)]
+    # Files are parsed in turns, a batch at a time
+    assert order[:20] != [paths[0]] * 20
+
+
+def test_aiter_entries_error(tmp_path):
+    path = tmp_path / "yarn.lock"
+    path.write_text("foo:\n  bar baz\n\n@")
+    with pytest.raises(ValueError, match="4: Invalid token @"):
+        asyncio.run(_collect(path))
+
+
+def test_aiter_entries_cancelled(tmp_path):
+    path = tmp_path / "yarn.lock"
+    path.write_text("".join(f"pkg{i}:\n  version {i}\n\n" for i in range(1000)))
+
+    async def main():
+        task = asyncio.ensure_future(_collect(path, batch_size=1))
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(main())
+
+
+@pytest.mark.parametrize(
+    "content, expected",
+    [
+        ("", ValueError),
+        ("foo:\n  bar", ValueError),
+        ("foo:\n    bar baz", SyntaxError),
+    ],
+)
+def test_iter_entries_errors(content, expected):
+    with pytest.raises(expected):
+        list(iter_entries(io.StringIO(content)))
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        b"",
+        b"foo:\n  bar baz\n",
+        b"foo:\n  bar baz",
+        b"foo:\r\n  bar baz\r\n\r\n",
+        b"foo\rbar\r",
+        b"\r\r\n\n",
+        "caf\u00e9\n\u2028\n".encode(),
+    ],
+)
+def test_iter_buffer_lines(content, tmp_path):
+    expected = list(io.TextIOWrapper(io.BytesIO(content), encoding="utf-8"))
+    assert list(iter_buffer_lines(content, encoding="utf-8")) == expected
+
+    path = tmp_path / "yarn.lock"
+    path.write_bytes(content)
+    with open(path) as f:
+        expected = list(f)
+    with mapped_lines(path) as lines:
+        assert list(lines) == expected
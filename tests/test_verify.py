@@ -0,0 +1,168 @@
+"""
+Copyright (C) 2020  Red Hat, Inc
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import base64
+import hashlib
+from pathlib import Path
+from typing import Optional
+
+import pytest
+
+from pyarn import verify
+from pyarn.lockfile import Package
+
+REGISTRY = "https://registry.yarnpkg.com"
+
+
+def _sri(algorithm: str, content: bytes) -> str:
+    return f"{algorithm}-{base64.b64encode(hashlib.new(algorithm, content).digest()).decode()}"
+
+
+def _package(name: str, url: Optional[str], checksum: Optional[str] = None) -> Package:
+    return Package(name, "1.0.0", url=url, checksum=checksum)
+
+
+@pytest.mark.parametrize(
+    "url, expected",
+    [
+        (f"{REGISTRY}/lodash/-/lodash-4.17.21.tgz#abc", "lodash-4.17.21.tgz"),
+        (f"{REGISTRY}/@babel/core/-/core-7.0.0.tgz", "@babel-core-7.0.0.tgz"),
+        (f"{REGISTRY}/@babel%2fcore/-/core-7.0.0.tgz", "@babel-core-7.0.0.tgz"),
+        (f"{REGISTRY}/@babel/core/-/@babel/core-7.0.0.tgz", "@babel-core-7.0.0.tgz"),
+        ("https://example.com/files/foo-1.0.0.tgz", "foo-1.0.0.tgz"),
+        ("https://example.com/", None),
+        (None, None),
+        # Names that are not files of the mirror directory
+        ("https://x/..%2f..%2f..%2fetc%2fpasswd", None),
+        (f"{REGISTRY}/foo/-/..%2fpasswd#abc", None),
+        (f"{REGISTRY}/@scope/foo/-/..%2f..%2fpasswd", None),
+        ("https://x/files/..", None),
+        ("https://x/files/%2e%2e", None),
+        ("https://x/..%5cfoo.tgz", None),
+        ("https://x/foo%00.tgz", None),
+    ],
+)
+def test_mirror_filename(url: Optional[str], expected: Optional[str]) -> None:
+    assert verify.mirror_filename(_package("foo", url)) == expected
+
+
+def test_expected_digest() -> None:
+    sha1 = _sri("sha1", b"x")
+    sha512 = _sri("sha512", b"x")
+    other = _sri("sha512", b"y")
+
+    expected = verify.expected_digest(_package("foo", "a.tgz", f"{sha1} {sha512}?opt {other}"))
+    assert expected == (
+        "sha512",
+        frozenset([hashlib.sha512(b"x").digest(), hashlib.sha512(b"y").digest()]),
+    )
+    assert verify.expected_digest(_package("foo", "a.tgz", "md5-abc")) is None
+    assert verify.expected_digest(_package("foo", "a.tgz")) is None
+
+
+def test_expected_digest_url_fragment() -> None:
+    digest = hashlib.sha1(b"x").hexdigest()
+    url = f"{REGISTRY}/foo/-/foo-1.0.0.tgz#{digest}"
+    assert verify.expected_digest(_package("foo", url)) == (
+        "sha1",
+        frozenset([bytes.fromhex(digest)]),
+    )
+    # integrity takes precedence over the URL
+    expected = verify.expected_digest(_package("foo", url, _sri("sha256", b"x")))
+    assert expected is not None and expected[0] == "sha256"
+
+
+def test_hash_file(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(verify, "READ_SIZE", 7)
+    content = bytes(range(256)) * 10
+    path = tmp_path / "file.tgz"
+    path.write_bytes(content)
+    assert verify.hash_file(path, "sha512") == (hashlib.sha512(content).digest(), len(content))
+
+
+def test_verify_mirror(tmp_path: Path) -> None:
+    (tmp_path / "good-1.0.0.tgz").write_bytes(b"good")
+    (tmp_path / "legacy-1.0.0.tgz").write_bytes(b"legacy")
+    (tmp_path / "@scope-bad-1.0.0.tgz").write_bytes(b"tampered")
+    sha1 = hashlib.sha1(b"legacy").hexdigest()
+
+    good = _package("good", f"{REGISTRY}/good/-/good-1.0.0.tgz", _sri("sha512", b"good"))
+    alias = _package("alias", f"{REGISTRY}/good/-/good-1.0.0.tgz", _sri("sha512", b"good"))
+    legacy = _package("legacy", f"{REGISTRY}/legacy/-/legacy-1.0.0.tgz#{sha1}")
+    bad = _package("@scope/bad", f"{REGISTRY}/@scope/bad/-/bad-1.0.0.tgz", _sri("sha1", b"bad"))
+    missing = _package("missing", f"{REGISTRY}/missing/-/missing-1.0.0.tgz", _sri("sha1", b""))
+    unchecked = _package("unchecked", f"{REGISTRY}/unchecked/-/unchecked-1.0.0.tgz")
+    local = _package("local", None)
+
+    report = verify.verify_mirror(
+        [good, alias, legacy, bad, missing, unchecked, local], tmp_path, workers=2
+    )
+    assert report.verified == [good, alias, legacy]
+    assert report.mismatched == [
+        verify.Mismatch(
+            bad, tmp_path / "@scope-bad-1.0.0.tgz", _sri("sha1", b"bad"), _sri("sha1", b"tampered")
+        )
+    ]
+    assert report.missing == [(missing, tmp_path / "missing-1.0.0.tgz")]
+    assert report.unchecked == [unchecked, local]
+    assert not report.ok
+    # The tarball shared by good and alias is only hashed once
+    assert report.files == 3
+    assert report.total_bytes == len(b"good" + b"legacy" + b"tampered")
+    assert report.errors == []
+    summary = "3 verified, 1 mismatched, 1 missing, 0 unreadable, 2 unchecked; 3 files"
+    assert summary in report.summary()
+
+
+def test_verify_mirror_filename(tmp_path: Path) -> None:
+    (tmp_path / "foo.tgz").write_bytes(b"foo")
+    package = _package("foo", "https://example.com/foo.tgz", _sri("sha256", b"foo"))
+    report = verify.verify_mirror([package], tmp_path, filename=lambda p: f"{p.name}.tgz")
+    assert report.ok
+    assert report.verified == [package]
+    assert report.throughput >= 0
+
+
+def test_verify_mirror_outside_directory(tmp_path: Path) -> None:
+    mirror = tmp_path / "mirror"
+    mirror.mkdir()
+    (tmp_path / "secret").write_bytes(b"secret")
+    sha1 = hashlib.sha1(b"other").hexdigest()
+    escaping = _package("foo", f"https://x/..%2fsecret#{sha1}")
+    custom = _package("bar", "https://x/bar.tgz", _sri("sha1", b"other"))
+
+    report = verify.verify_mirror([escaping], mirror)
+    assert report.unchecked == [escaping]
+    assert report.files == 0
+    report = verify.verify_mirror([custom], mirror, filename=lambda p: "../secret")
+    assert report.unchecked == [custom]
+    assert report.files == 0
+
+
+def test_verify_mirror_unreadable(tmp_path: Path) -> None:
+    (tmp_path / "foo-1.0.0.tgz").mkdir()
+    (tmp_path / "bar-1.0.0.tgz").write_bytes(b"bar")
+    foo = _package("foo", f"{REGISTRY}/foo/-/foo-1.0.0.tgz", _sri("sha1", b"foo"))
+    bar = _package("bar", f"{REGISTRY}/bar/-/bar-1.0.0.tgz", _sri("sha1", b"bar"))
+
+    report = verify.verify_mirror([foo, bar], tmp_path)
+    assert report.verified == [bar]
+    [(package, path, error)] = report.errors
+    assert (package, path) == (foo, tmp_path / "foo-1.0.0.tgz")
+    assert isinstance(error, IsADirectoryError)
+    assert not report.ok
+    assert report.files == 1
+    assert "1 unreadable" in report.summary()